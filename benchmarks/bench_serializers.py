@@ -0,0 +1,62 @@
+# benchmarks/bench_serializers.py
+"""
+Save/load time and file size of a 100k-reminder store under each storage serializer.
+Usage: python benchmarks/bench_serializers.py [reminder_count]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utility.util_serializers import SERIALIZERS, orjson, read_file, write_file  # noqa: E402
+
+
+def make_data(count):
+    rng = random.Random(42)
+    now = time.time()
+    reminders = []
+    for i in range(count):
+        due_ts = now + rng.randint(60, 30 * 86400)
+        reminders.append({
+            "id": (i << 22) | rng.randint(0, 0x3FFFFF),
+            "user_id": rng.randint(10**17, 10**18),
+            "guild_id": rng.randint(10**17, 10**17 + 500),
+            "message": f"Reminder number {i}: " + "x" * rng.randint(5, 80),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime(due_ts)),
+            "due_ts": due_ts,
+            "delivery": rng.choice(["dm", "channel", "forum", "both"]),
+            "target_mention": f"<@{rng.randint(10**17, 10**18)}>",
+            "channel_id": rng.randint(10**17, 10**18),
+        })
+    guilds = {
+        str(10**17 + g): {"default_delivery": "dm", "admins": [str(rng.randint(10**17, 10**18))], "update_channels": []}
+        for g in range(500)
+    }
+    return {"reminders": reminders, "guilds": guilds}
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    data = make_data(count)
+    print(f"{count} reminders, orjson {'available' if orjson else 'not installed'}\n")
+    print(f"{'serializer':<14}{'save (ms)':>12}{'load (ms)':>12}{'size (KiB)':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, serializer in SERIALIZERS.items():
+            if name == "orjson" and orjson is None:
+                continue
+            path = os.path.join(tmp, f"data.{name}")
+            start = time.perf_counter()
+            write_file(path, data, serializer)
+            save_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            loaded = read_file(path)
+            load_ms = (time.perf_counter() - start) * 1000
+            assert len(loaded["reminders"]) == count
+            print(f"{name:<14}{save_ms:>12.1f}{load_ms:>12.1f}{os.path.getsize(path) / 1024:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
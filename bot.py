@@ -2,13 +2,20 @@ import discord
 from discord.ext import commands
 import asyncio
 import logging
-import json
 import os
 import time
-from storage import load_data, get_due_reminders, remove_reminder
+from datetime import datetime
+from storage import ReminderStore, TIMEZONE, close_storage, reminder_due_ts
+from utility.util_cache import LRUCache
+from utility.util_delivery import DeliveryError, DeliveryPipeline, coalesce, plan_for, post_style, render_batch, render_group
+from utility.util_logbuffer import LogBuffer
+from utility.util_metrics import DeliveryMetrics
+from utility.util_outbox import RetryOutbox
+from utility.util_ratelimit import RateLimiter
 from utility.util_backendlogger import setup_logger
+from utility.util_settings import SETTINGS_FILE, load_settings
 
-logger = setup_logger()
+logger = setup_logger(load_settings().get("log_level", "INFO"))
 logger.info("Bot starting...")
 
 # ============================================================
@@ -26,64 +33,6 @@ logging.basicConfig(
 # ============================================================
 # ------------------- Settings Management --------------------
 # ============================================================
-SETTINGS_FILE = "settings.json"
-
-DEFAULT_SETTINGS = {
-    "token": "YOUR_BOT_TOKEN_HERE",
-    "test_guild_id": None,
-    "backend_guild_id": 1424002405913202700,  # Default backend guild ID
-    "backend_log_channel_id": None,
-    "support_invite": "https://discord.gg/YOUR_DEFAULT_INVITE",
-    "check_interval_seconds": 60,
-    "log_level": "INFO",
-    "auto_restart": True
-}
-
-_last_settings_mtime = None
-_settings_cache = None
-
-
-def load_settings(force=False):
-    """
-    Load or create settings.json with defaults.
-    Auto-fills missing keys and updates cached settings.
-    """
-    global _last_settings_mtime, _settings_cache
-
-    if not os.path.exists(SETTINGS_FILE):
-        with open(SETTINGS_FILE, "w", encoding="utf-8") as f:
-            json.dump(DEFAULT_SETTINGS, f, indent=4)
-        logging.warning(f"No {SETTINGS_FILE} found. Created default settings. Edit token before running.")
-        return DEFAULT_SETTINGS.copy()
-
-    mtime = os.path.getmtime(SETTINGS_FILE)
-    if not force and _last_settings_mtime == mtime and _settings_cache:
-        return _settings_cache
-
-    with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
-        settings = json.load(f)
-
-    # Fill missing keys
-    changed = False
-    for key, value in DEFAULT_SETTINGS.items():
-        if key not in settings:
-            settings[key] = value
-            changed = True
-    if changed:
-        with open(SETTINGS_FILE, "w", encoding="utf-8") as f:
-            json.dump(settings, f, indent=4)
-        logging.info("Updated settings.json with missing default keys.")
-
-    _last_settings_mtime = mtime
-    _settings_cache = settings
-
-    # Update log level dynamically
-    log_level = getattr(logging, settings.get("log_level", "INFO").upper(), logging.INFO)
-    logging.getLogger().setLevel(log_level)
-
-    return settings
-
-
 settings = load_settings()
 
 # ============================================================
@@ -92,88 +41,324 @@ settings = load_settings()
 intents = discord.Intents.default()
 intents.members = True
 bot = commands.Bot(command_prefix="!", intents=intents)
-data = load_data()
+
+# One shared copy of reminders/guild data, injected into every cog via bot.store
+store = ReminderStore()
+bot.store = store
 
 # ============================================================
 # ------------------- Backend Logging ------------------------
 # ============================================================
-async def backend_log(message: str):
-    """Send a message to the backend log channel if configured."""
-    backend_channel_id = settings.get("backend_log_channel_id")
-    if not backend_channel_id:
+async def post_backend_log(content: str = None, embed: discord.Embed = None):
+    """Send one (already batched) post to the backend log channel."""
+    backend_channel_id = load_settings().get("backend_log_channel_id")
+    channel = bot.get_channel(int(backend_channel_id)) if backend_channel_id else None
+    if channel:
+        await limiter.acquire("channel_send", channel.id)
+        await channel.send(content, embed=embed)
+    else:
+        logging.warning(f"Backend log channel {backend_channel_id} not found.")
+
+
+# Merges backend log messages into one post per interval so a burst of errors
+# can't turn into a burst of sends on the loop that is failing
+backend_log_buffer = LogBuffer(
+    post_backend_log,
+    interval=settings.get("backend_log_flush_seconds", 5),
+    max_entries=settings.get("backend_log_max_entries", 50)
+)
+bot.backend_log_buffer = backend_log_buffer
+
+
+async def backend_log(message):
+    """Queue a message (text or embed) for the backend log channel if configured (never waits on Discord)."""
+    if not load_settings().get("backend_log_channel_id"):
         return
-    try:
-        channel = bot.get_channel(int(backend_channel_id))
-        if channel:
-            await channel.send(f"🛰️ **Backend Log:** {message}")
-        else:
-            logging.warning(f"Backend log channel {backend_channel_id} not found.")
-    except Exception as e:
-        logging.error(f"Failed to send backend log: {e}")
+    backend_log_buffer.push(message)
 
 # ============================================================
 # ------------------- Reminder Delivery ----------------------
 # ============================================================
-async def deliver_reminder(r, missed=False):
-    """Deliver a single reminder according to its delivery type."""
+# Paces DM opens, channel sends and thread creation under Discord's route limits
+limiter = RateLimiter()
+bot.limiter = limiter
+
+# Resolved users and their DM channels, so repeat DMs skip fetch_user/create_dm
+user_cache = LRUCache(maxsize=4096, ttl=3600)
+dm_cache = LRUCache(maxsize=4096, ttl=3600)
+bot.user_cache = user_cache
+bot.dm_cache = dm_cache
+
+
+async def get_dm_channel(user_id):
+    """DMChannel for user_id: cache, then the gateway cache, then REST."""
+    dm = dm_cache.get(user_id)
+    if dm:
+        return dm
+
+    user = user_cache.get(user_id) or bot.get_user(user_id)
+    if user is None:
+        await limiter.acquire("global")
+        user = await bot.fetch_user(user_id)
+    user_cache.set(user_id, user)
+
+    dm = user.dm_channel
+    if dm is None:
+        await limiter.acquire("dm_create")
+        dm = await user.create_dm()
+    dm_cache.set(user_id, dm)
+    return dm
+
+
+async def send_chunks(channel, chunks):
+    for content in chunks:
+        await limiter.acquire("channel_send", channel.id)
+        await channel.send(content)
+
+
+def forum_thread_key(r, policy):
+    """Reuse key for forum_thread_policy, or None to open a new thread every time."""
+    if policy == "day":
+        return datetime.now(TIMEZONE).strftime("%Y-%m-%d")
+    if policy == "target":
+        return r.get("target_mention") or str(r["user_id"])
+    if policy == "guild":
+        return "all"
+    return None
+
+
+async def deliver_to_forum(forum, rs, status, chunks):
+    """
+    Post into the thread this forum already uses for the reminder's reuse key
+    (one API call), or create a thread and remember it for next time.
+    """
+    policy = load_settings().get("forum_thread_policy", "day")
+    key = forum_thread_key(rs[0], policy)
+    if key:
+        thread_id = store.get_forum_thread(forum.guild.id, forum.id, key)
+        thread = forum.get_thread(thread_id) if thread_id else None
+        if thread is None and thread_id:
+            # Archived threads aren't in the cache
+            try:
+                await limiter.acquire("global")
+                thread = await bot.fetch_channel(thread_id)
+            except (discord.NotFound, discord.Forbidden):
+                store.set_forum_thread(forum.guild.id, forum.id, key, None)
+        if thread is not None:
+            try:
+                await send_chunks(thread, chunks)
+                return
+            except (discord.NotFound, discord.Forbidden):
+                # Deleted or locked since we last used it: start a new one
+                store.set_forum_thread(forum.guild.id, forum.id, key, None)
+
+    if policy == "day":
+        title = f"Reminders {key}"
+    elif len(rs) == 1:
+        title = f"{status}Reminder: {rs[0]['message'][:50]}"
+    else:
+        title = f"{status}{len(rs)} Reminders"
+    await limiter.acquire("thread_create", forum.id)
+    created = await forum.create_thread(name=title, content=chunks[0])
+    await send_chunks(created.thread, chunks[1:])
+    if key:
+        store.set_forum_thread(forum.guild.id, forum.id, key, created.thread.id)
+
+
+# Lateness/send-time histograms per delivery mode, shown in /backend status
+metrics = DeliveryMetrics(slo_seconds=settings.get("delivery_slo_seconds", 60))
+bot.metrics = metrics
+
+
+def failure_reason(exc):
+    if isinstance(exc, discord.HTTPException):
+        return f"HTTP {exc.status} {type(exc).__name__}"
+    return type(exc).__name__
+
+
+async def deliver_reminder(rs, missed=False, delivered=None):
+    """
+    Deliver a group of reminders that share delivery type, destination and mention
+    (see coalesce) as one message, or as few as Discord's length limit allows.
+    Each leg ("dm", "post") is tried on its own: one that goes out is added to
+    `delivered`, and legs already in it are skipped, so a retry after a partial
+    failure only resends what failed. Failed legs are logged and raised together
+    as a DeliveryError so the caller can queue a retry for just those.
+    """
+    delivered = set() if delivered is None else delivered
+    r = rs[0]
+    status = "MISSED " if missed else ""
+    plan = plan_for(r)
+    # The content rendered at creation covers the common case: one reminder, on time
+    single = len(rs) == 1 and not missed
+    started = time.monotonic()
+    failures = {}  # leg -> exception
+
+    if plan["dm"] and "dm" not in delivered:
+        try:
+            dm = await get_dm_channel(r["user_id"])
+            try:
+                await send_chunks(dm, [plan["dm"]] if single else render_group("dm", rs, missed))
+            except discord.HTTPException:
+                # DMs closed or the user is gone; don't keep a stale channel around
+                dm_cache.pop(r["user_id"])
+                user_cache.pop(r["user_id"])
+                raise
+            delivered.add("dm")
+        except Exception as e:
+            failures["dm"] = e
+
+    # A DM that fails (e.g. closed DMs) doesn't stop the channel post of a "both" reminder
+    if plan["kind"] != "dm" and plan["channel_id"] and "post" not in delivered:
+        try:
+            channel = bot.get_channel(plan["channel_id"])
+            if channel is None:
+                # Archived threads aren't cached; NotFound here means the channel is gone
+                await limiter.acquire("global")
+                channel = await bot.fetch_channel(plan["channel_id"])
+            target_mention = r.get("target_mention") or f"<@{r['user_id']}>"
+            chunks = [plan["post"]] if single else render_group(post_style(plan["kind"]), rs, missed, target_mention)
+            if isinstance(channel, discord.ForumChannel):
+                await deliver_to_forum(channel, rs, status, chunks)
+            else:
+                await send_chunks(channel, chunks)
+            delivered.add("post")
+        except Exception as e:
+            failures["post"] = e
+
+    if failures:
+        for leg, e in failures.items():
+            metrics.record_failure(plan["kind"], failure_reason(e))
+            await backend_log(f"⚠️ Failed to deliver reminder ({leg}): {e}")
+            logging.error(f"[GUILD {r.get('guild_id', '?')}] Failed to deliver the {leg} of {len(rs)} {status.lower()}reminder(s): {e}")
+        raise DeliveryError(failures)
+
+    now = time.time()
+    metrics.record_success(plan["kind"], [now - (reminder_due_ts(x) or now) for x in rs], time.monotonic() - started, missed)
+
+
+def is_permanent_failure(exc):
+    """Missing channels/users and closed DMs won't fix themselves; don't retry them."""
+    if isinstance(exc, DeliveryError):
+        return all(is_permanent_failure(e) for e in exc.failures.values())
+    return isinstance(exc, (discord.Forbidden, discord.NotFound))
+
+
+# Failed groups are retried from outbox.json with backoff, off the reminder tick
+outbox = RetryOutbox(
+    deliver_reminder,
+    max_attempts=settings.get("retry_max_attempts", 5),
+    base_delay=settings.get("retry_base_seconds", 30),
+    max_delay=settings.get("retry_max_seconds", 3600),
+    is_permanent=is_permanent_failure
+)
+bot.outbox = outbox
+
+
+async def deliver_and_remove(rs, missed=False):
+    """Pipeline worker step: send a coalesced group, then drop its reminders (or move recurring ones on)."""
+    delivered = set()
     try:
-        delivery_mode = r.get("delivery", "dm")
-        target_mention = r.get("target_mention", f"<@{r['user_id']}>")
-        status = "MISSED " if missed else ""
-
-        if delivery_mode in ("dm", "both"):
-            user = await bot.fetch_user(r["user_id"])
-            if user:
-                await user.send(f"⏰ {status}Reminder: {r['message']}")
-
-        if delivery_mode in ("channel", "both") and "channel_id" in r:
-            channel = bot.get_channel(r["channel_id"])
-            if channel:
-                await channel.send(f"⏰ {status}Reminder for {target_mention}: {r['message']}")
-
-        if delivery_mode == "forum" and "channel_id" in r:
-            channel = bot.get_channel(r["channel_id"])
-            if isinstance(channel, discord.Thread):
-                await channel.send(f"{target_mention} ⏰ {status}Reminder: {r['message']}")
-            elif isinstance(channel, discord.ForumChannel):
-                thread = await channel.create_thread(
-                    name=f"{status}Reminder: {r['message'][:50]}",
-                    type=discord.ChannelType.public_thread
-                )
-                await thread.send(f"{target_mention} ⏰ {r['message']}")
+        await deliver_reminder(rs, missed, delivered)
     except Exception as e:
-        await backend_log(f"⚠️ Failed to deliver reminder: {e}")
-        logging.error(f"[GUILD {r.get('guild_id', '?')}] Failed to deliver {status.lower()}reminder: {e}")
+        # The outbox is written before the reminders leave the store; legs that
+        # already went out aren't retried, and each failed leg is retried or
+        # dead-lettered on its own
+        outbox.fail(rs, missed, e, delivered)
+    for r in rs:
+        store.finish_reminder(r)
+
+
+# Due reminders are handed to a pool of workers so one slow send can't hold up the tick
+delivery = DeliveryPipeline(deliver_and_remove, workers=settings.get("delivery_workers", 8))
+bot.delivery = delivery
 
 # ============================================================
 # ------------------- Reminder Loop --------------------------
 # ============================================================
 async def reminder_loop():
-    """Background task to check for due reminders."""
+    """Background task that delivers reminders as they come due."""
     await bot.wait_until_ready()
+    interval = 60
     while not bot.is_closed():
         try:
             # Load settings every cycle
             current_settings = load_settings()
             interval = current_settings.get("check_interval_seconds", 60)
 
-            # ✅ Reload data each cycle (fixes "reminders not firing" issue)
-            data = load_data()
-
-            # Get and deliver due reminders
-            due = get_due_reminders(data)
-            print(f"[DEBUG] Reminder loop tick — {len(due)} due reminders found")
+            # Hand due reminders to the delivery workers (the shared store is always current)
+            due = store.pop_due_reminders()
+            if due:
+                logger.debug(f"Reminder loop tick — {len(due)} due reminders found")
 
-            for r in due:
-                await deliver_reminder(r)
-                remove_reminder(data, r)
+            # Reminders for the same target in this tick go out as one message
+            for group in coalesce(due):
+                delivery.submit(group)
 
         except Exception as e:
             await backend_log(f"💥 Reminder loop crashed: {e}")
             logging.exception(f"Error in reminder loop: {e}")
 
-        # Sleep between checks
-        await asyncio.sleep(interval)
+        # Sleep until the next reminder is due (or one is added earlier);
+        # check_interval_seconds only caps the sleep as a safety net
+        await store.scheduler.wait(max_sleep=interval)
+
+# ============================================================
+# ------------------- Missed Reminder Catch-up ---------------
+# ============================================================
+async def send_stale_summary(user_id, rs):
+    """One DM listing the reminders a user missed that are too old to send one by one."""
+    lines = [
+        f"{r['message'][:100]} (was due {datetime.fromisoformat(r['time']).strftime('%Y-%m-%d %H:%M')})"
+        for r in rs[:10]
+    ]
+    if len(rs) > 10:
+        lines.append(f"…and {len(rs) - 10} more")
+    header = f"📭 {len(rs)} of your reminders came due while the bot was offline:"
+    await send_chunks(await get_dm_channel(user_id), render_batch(header, header, lines))
+
+
+async def catch_up_missed(missed):
+    """
+    Deliver reminders that came due while the bot was offline, in the background.
+    Oldest first, fed to the delivery workers at catchup_per_second so on-time
+    reminders and slash commands stay responsive. Reminders older than
+    missed_max_age_hours are summarized in one DM per user, dropped, or
+    delivered anyway, depending on missed_stale_policy.
+    """
+    current_settings = load_settings()
+    rate = max(1, current_settings.get("catchup_per_second", 5))
+    policy = current_settings.get("missed_stale_policy", "summarize")
+    cutoff = time.time() - current_settings.get("missed_max_age_hours", 24) * 3600
+
+    missed.sort(key=lambda r: reminder_due_ts(r) or 0)
+    stale = [] if policy == "deliver" else [r for r in missed if (reminder_due_ts(r) or 0) < cutoff]
+    if stale:
+        if policy == "summarize":
+            by_user = {}
+            for r in stale:
+                by_user.setdefault(r["user_id"], []).append(r)
+            for user_id, rs in by_user.items():
+                try:
+                    await send_stale_summary(user_id, rs)
+                except Exception as e:
+                    logging.warning(f"Failed to send missed-reminder summary to user {user_id}: {e}")
+                await asyncio.sleep(1 / rate)
+        # Stale one-shots leave the store in one write; recurring ones just move to their next occurrence
+        stale_ids = {r["id"] for r in stale}
+        store.remove_reminders(lambda r: r["id"] in stale_ids and not r.get("recurrence"))
+        for r in stale:
+            if r.get("recurrence"):
+                store.advance_recurring(r)
+        missed = [r for r in missed if r["id"] not in stale_ids]
+        await backend_log(f"📭 {len(stale)} stale missed reminders handled with policy '{policy}'.")
+        logging.info(f"Catch-up: {len(stale)} stale missed reminders handled with policy '{policy}'")
+
+    for group in coalesce(missed):
+        delivery.submit(group, missed=True)
+        await asyncio.sleep(len(group) / rate)
+    if missed:
+        logging.info(f"Catch-up: queued {len(missed)} missed reminders for delivery")
 
 # ============================================================
 # ------------------- Settings Watcher -----------------------
@@ -198,21 +383,34 @@ async def settings_watcher():
 # ============================================================
 # ------------------- Bot Events -----------------------------
 # ============================================================
+# on_ready fires again after every reconnect; background tasks and the missed
+# reminder catch-up must only happen on the first one
+_startup_done = False
+
+
 @bot.event
 async def on_ready():
+    global _startup_done
     print(f"✅ Logged in as {bot.user}")
 
-    # Start background loops (only once)
-    if not any(t.get_name() == "reminder_loop" for t in asyncio.all_tasks()):
+    if not _startup_done:
+        _startup_done = True
+
+        # Start background loops
+        backend_log_buffer.start()
+        delivery.start()
+        outbox.start()
         bot.loop.create_task(reminder_loop(), name="reminder_loop")
         print("🔁 Reminder loop started")
+        bot.loop.create_task(settings_watcher(), name="settings_watcher")
 
-    bot.loop.create_task(settings_watcher())
-
-    # Deliver missed reminders
-    for r in get_due_reminders(data):
-        await deliver_reminder(r, missed=True)
-        remove_reminder(data, r)
+        # Missed reminders are taken off the schedule here (before the loop can see them)
+        # and caught up in the background, so command sync isn't held up
+        missed = store.pop_due_reminders()
+        if missed:
+            bot.loop.create_task(catch_up_missed(missed), name="missed_catchup")
+    else:
+        logging.info("Reconnected; background tasks already running")
 
     # Command syncing
     TEST_GUILD_ID = settings.get("test_guild_id")
@@ -249,7 +447,14 @@ async def main():
         if not token or token == "YOUR_BOT_TOKEN_HERE":
             logging.error("❌ Discord token missing in settings.json! Please fill it in before running the bot.")
             return
-        await bot.start(token)
+        try:
+            await bot.start(token)
+        finally:
+            await delivery.stop()
+            await outbox.stop()
+            await backend_log_buffer.stop()
+            # Write out anything still waiting in the storage flush window
+            close_storage()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -7,10 +7,12 @@ import json
 import os
 import traceback
 
-from storage import load_data, save_data, get_guild_default_delivery
-from bot import load_settings
-from . import reminderadmin  # use module import to access reminderadmin.data
-import logging
+from storage import ReminderStore
+from utility.util_settings import SETTINGS_FILE, load_settings
+from utility.util_broadcast import BROADCAST_FILE, Broadcast
+from utility.util_audit import AuditSink
+from utility.util_campaign import DMCampaign
+
 logger = logging.getLogger("bot")
 
 logger.info("Backend command executed")
@@ -19,10 +21,55 @@ logger.error("Something went wrong", exc_info=True)
 
 # Control file name used by the launcher
 LAUNCHER_CONTROL_FILE = "launcher_control.json"
-SETTINGS_FILE = "settings.json"
+
+# Interaction tokens (followup sends and edits) expire after 15 minutes;
+# long broadcasts and DM campaigns move their progress to a DM to whoever ran them before that
+INTERACTION_EDIT_WINDOW = 14 * 60
 
 start_time = time.time()
-logger = logging.getLogger("bot")
+
+
+class ProgressMessage:
+    """
+    Ephemeral progress message for a long backend job, edited in place.
+    Past INTERACTION_EDIT_WINDOW it moves to a DM to whoever ran the command
+    (never the channel it was run in); if that fails, updates stop and the
+    summary only reaches the log.
+    """
+
+    def __init__(self, interaction: discord.Interaction, throttle):
+        self.interaction = interaction
+        self._throttle = throttle  # async callable(route, key=None)
+        self.message = None
+        self.started = time.monotonic()
+        self.moved = False
+
+    async def start(self, content):
+        self.message = await self.interaction.followup.send(content, ephemeral=True, wait=True)
+
+    async def update(self, content):
+        if not self.moved and time.monotonic() - self.started > INTERACTION_EDIT_WINDOW:
+            # The interaction token is about to expire: carry on in a DM
+            self.moved = True
+            try:
+                await self._throttle("dm_create")
+                self.message = await self.interaction.user.send(content)
+            except Exception:
+                self.message = None
+                logger.warning("Backend job outlived its interaction and progress can't be DMed; the summary will be in the log")
+            return
+        if self.message is not None:
+            await self.message.edit(content=content)
+
+    async def finish(self, content, embed=None):
+        try:
+            await self.message.edit(content=content, embed=embed)
+        except Exception:
+            # No progress message left (or it can't be edited anymore): try a fresh followup
+            try:
+                await self.interaction.followup.send(content, embed=embed, ephemeral=True)
+            except Exception:
+                logger.exception("Failed to send backend job summary followup")
 
 
 def read_launcher_control():
@@ -51,9 +98,38 @@ def set_launcher_flag(key: str, value: bool):
 
 
 class BackendControl(commands.Cog):
-    def __init__(self, bot):
+    def __init__(self, bot, store: ReminderStore):
         self.bot = bot
+        self.store = store
         self.settings = load_settings()
+        # Access events are posted to the backend log channel in batches, off the command path
+        self.audit = AuditSink(
+            self._audit_channel,
+            interval=self.settings.get("audit_flush_seconds", 5),
+            throttle=lambda channel_id: self._throttle("channel_send", channel_id)
+        )
+
+    async def cog_load(self):
+        self.audit.start()
+
+    async def cog_unload(self):
+        await self.audit.stop()
+
+    def _audit_channel(self):
+        channel_id = self.settings.get("backend_log_channel_id")
+        return self.bot.get_channel(int(channel_id)) if channel_id else None
+
+    def _backend_log(self, message):
+        """Queue text or an embed for the backend log channel; the bot's buffered writer posts it."""
+        log_buffer = getattr(self.bot, "backend_log_buffer", None)
+        if log_buffer is not None and self.settings.get("backend_log_channel_id"):
+            log_buffer.push(message)
+
+    async def _throttle(self, route, key=None):
+        """Wait on the bot's shared rate limiter (if it is running) before an API call."""
+        limiter = getattr(self.bot, "limiter", None)
+        if limiter:
+            await limiter.acquire(route, key)
 
     # ------------------------------------------------------------
     # Utility: Check if user is developer and in backend guild
@@ -71,7 +147,6 @@ class BackendControl(commands.Cog):
 
         backend_guild_id = self.settings.get("backend_guild_id")
         dev_ids = self.settings.get("dev_ids", [])
-        backend_log_channel_id = self.settings.get("backend_log_channel_id")
 
         user = interaction.user
         command_name = getattr(interaction.command, "qualified_name", "unknown")
@@ -95,19 +170,8 @@ class BackendControl(commands.Cog):
                     await interaction.followup.send("❌ This command is only available in the backend guild.", ephemeral=True)
                 except Exception:
                     logger.exception("Failed to send guild restriction message.")
-            # send log to backend channel if configured
-            if backend_log_channel_id:
-                try:
-                    ch = self.bot.get_channel(int(backend_log_channel_id))
-                    if ch:
-                        embed = discord.Embed(title="🔒 Backend Access Denied", color=discord.Color.red())
-                        embed.add_field(name="User", value=f"{user} (`{user.id}`)", inline=False)
-                        embed.add_field(name="Command", value=command_name, inline=False)
-                        embed.add_field(name="Guild", value=f"{guild_name} (`{interaction.guild_id}`)", inline=False)
-                        embed.add_field(name="Reason", value=reason, inline=False)
-                        await ch.send(embed=embed)
-                except Exception:
-                    logger.exception("Failed to send backend deny log to channel.")
+            # queued for the backend log channel (posted in batches)
+            self.audit.push(False, command_name, f"{user} (`{user.id}`)", f"{guild_name} (`{interaction.guild_id}`)", reason)
             return False
 
         # If user is not developer
@@ -122,34 +186,13 @@ class BackendControl(commands.Cog):
                     await interaction.followup.send("❌ You are not authorized to use backend commands.", ephemeral=True)
                 except Exception:
                     logger.exception("Failed to send unauthorized message.")
-            if backend_log_channel_id:
-                try:
-                    ch = self.bot.get_channel(int(backend_log_channel_id))
-                    if ch:
-                        embed = discord.Embed(title="🔒 Backend Access Denied", color=discord.Color.red())
-                        embed.add_field(name="User", value=f"{user} (`{user.id}`)", inline=False)
-                        embed.add_field(name="Command", value=command_name, inline=False)
-                        embed.add_field(name="Guild", value=f"{guild_name} (`{interaction.guild_id}`)", inline=False)
-                        embed.add_field(name="Reason", value=reason, inline=False)
-                        await ch.send(embed=embed)
-                except Exception:
-                    logger.exception("Failed to send backend deny log to channel.")
+            self.audit.push(False, command_name, f"{user} (`{user.id}`)", f"{guild_name} (`{interaction.guild_id}`)", reason)
             return False
 
         # Allowed
         allow_msg = f"[BACKEND GRANTED] {attempt_msg}"
         logger.info(allow_msg)
-        if backend_log_channel_id:
-            try:
-                ch = self.bot.get_channel(int(backend_log_channel_id))
-                if ch:
-                    embed = discord.Embed(title="✅ Backend Access Granted", color=discord.Color.green())
-                    embed.add_field(name="User", value=f"{user} (`{user.id}`)", inline=False)
-                    embed.add_field(name="Command", value=command_name, inline=False)
-                    embed.add_field(name="Guild", value=f"{guild_name} (`{interaction.guild_id}`)", inline=False)
-                    await ch.send(embed=embed)
-            except Exception:
-                logger.exception("Failed to send backend grant log to channel.")
+        self.audit.push(True, command_name, f"{user} (`{user.id}`)", f"{guild_name} (`{interaction.guild_id}`)")
         return True
 
     # ------------------------------------------------------------
@@ -170,8 +213,7 @@ class BackendControl(commands.Cog):
         uptime = time.time() - start_time
         hours, rem = divmod(uptime, 3600)
         minutes, seconds = divmod(rem, 60)
-        data = load_data()
-        reminder_count = len(data.get("reminders", []))
+        reminder_count = len(self.store.reminders)
 
         embed = discord.Embed(
             title="🛰️ Bot Status",
@@ -179,11 +221,95 @@ class BackendControl(commands.Cog):
         )
         embed.add_field(name="🕒 Uptime", value=f"{int(hours)}h {int(minutes)}m {int(seconds)}s", inline=False)
         embed.add_field(name="⏰ Reminders Stored", value=str(reminder_count), inline=True)
+        delivery = getattr(self.bot, "delivery", None)
+        limiter = getattr(self.bot, "limiter", None)
+        if delivery and limiter:
+            embed.add_field(
+                name="📬 Delivery Queue",
+                value=f"{delivery.pending} queued, {limiter.waiting} waiting on rate limits",
+                inline=True
+            )
+            embed.add_field(
+                name="🚦 Throttled",
+                value=f"{limiter.throttled} sends, {limiter.throttled_seconds:.1f}s total",
+                inline=True
+            )
+        metrics = getattr(self.bot, "metrics", None)
+        if metrics is not None:
+            lines = metrics.summary_lines() or ["No deliveries yet."]
+            lines.append(f"SLO (≤{metrics.slo_seconds:g}s late) breaches: **{metrics.slo_breaches}**")
+            embed.add_field(name="⏱️ Delivery Lateness", value="\n".join(lines)[:1024], inline=False)
+            failures = metrics.top_failures()
+            if failures:
+                embed.add_field(name="💥 Delivery Failures", value="\n".join(failures)[:1024], inline=False)
+        user_cache = getattr(self.bot, "user_cache", None)
+        dm_cache = getattr(self.bot, "dm_cache", None)
+        if user_cache is not None and dm_cache is not None:
+            embed.add_field(
+                name="🗂️ User / DM Cache",
+                value=f"Users: {user_cache.stats()}\nDMs: {dm_cache.stats()}",
+                inline=False
+            )
         embed.add_field(name="🧩 Cogs Loaded", value=", ".join(self.bot.cogs.keys()), inline=False)
         embed.add_field(name="⚙️ Log Level", value=self.settings.get("log_level", "INFO"), inline=True)
 
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
+    # ------------------------------------------------------------
+    # /backend outbox
+    # ------------------------------------------------------------
+    @backend_group.command(name="outbox", description="Inspect or manage the delivery retry outbox (hidden)")
+    @app_commands.describe(action="What to do with the outbox (default: show)")
+    @app_commands.choices(
+        action=[
+            app_commands.Choice(name="Show", value="show"),
+            app_commands.Choice(name="Retry dead letters", value="requeue"),
+            app_commands.Choice(name="Clear dead letters", value="clear"),
+        ]
+    )
+    async def backend_outbox(self, interaction: discord.Interaction, action: app_commands.Choice[str] = None):
+        outbox = getattr(self.bot, "outbox", None)
+        if outbox is None:
+            await interaction.response.send_message("❌ Retry outbox is not running.", ephemeral=True)
+            return
+
+        action = action.value if action else "show"
+        if action == "requeue":
+            count = outbox.requeue_dead()
+            logger.info(f"Outbox: {interaction.user} requeued {count} dead letters")
+            await interaction.response.send_message(f"🔁 Requeued **{count}** dead-lettered deliveries.", ephemeral=True)
+            return
+        if action == "clear":
+            count = outbox.clear_dead()
+            logger.info(f"Outbox: {interaction.user} cleared {count} dead letters")
+            await interaction.response.send_message(f"🗑️ Cleared **{count}** dead-lettered deliveries.", ephemeral=True)
+            return
+
+        embed = discord.Embed(title="📮 Retry Outbox", color=discord.Color.blurple())
+        embed.add_field(name="Pending", value=str(len(outbox.pending)), inline=True)
+        embed.add_field(name="Dead Letters", value=str(len(outbox.dead)), inline=True)
+        embed.add_field(name="Delivered on Retry", value=str(outbox.retried), inline=True)
+
+        def describe(entry, when):
+            ids = ", ".join(str(r.get("id")) for r in entry["reminders"])
+            return f"`{ids}` • {entry['attempts']} attempt(s) • {when}\n↳ {entry['last_error'][:100]}"
+
+        pending = sorted(outbox.pending, key=lambda e: e["next_try"])[:5]
+        if pending:
+            embed.add_field(
+                name="Next Retries",
+                value="\n".join(describe(e, f"next <t:{int(e['next_try'])}:R>") for e in pending)[:1024],
+                inline=False
+            )
+        dead = outbox.dead[-5:]
+        if dead:
+            embed.add_field(
+                name="Latest Dead Letters",
+                value="\n".join(describe(e, f"dead <t:{int(e.get('dead_at', 0))}:R>") for e in reversed(dead))[:1024],
+                inline=False
+            )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
     # ------------------------------------------------------------
     # /backend reload
     # ------------------------------------------------------------
@@ -263,25 +389,19 @@ class BackendControl(commands.Cog):
         logger.info(f"Backend restart by {interaction.user}: {msg}")
 
         # Detailed log in backend channel
-        backend_log_channel_id = self.settings.get("backend_log_channel_id")
-        if backend_log_channel_id:
-            try:
-                log_channel = self.bot.get_channel(int(backend_log_channel_id))
-                if log_channel:
-                    embed = discord.Embed(
-                        title="🛠️ Backend Restart",
-                        description=msg,
-                        color=discord.Color.orange()
-                    )
-                    if failed:
-                        fail_text = "\n\n".join(failed)
-                        if len(fail_text) > 4000:
-                            fail_text = fail_text[:3990] + "\n...(truncated)"
-                        embed.add_field(name="Failed Cogs", value=fail_text, inline=False)
-                    embed.set_footer(text=f"Executed by {interaction.user}")
-                    await log_channel.send(embed=embed)
-            except Exception:
-                logger.exception("Failed to send backend restart log to channel.")
+        embed = discord.Embed(
+            title="🛠️ Backend Restart",
+            description=msg,
+            color=discord.Color.orange()
+        )
+        if failed:
+            fail_text = "\n\n".join(failed)
+            if len(fail_text) > 1024:
+                # Embed field values are capped at 1024 characters
+                fail_text = fail_text[:1000] + "\n...(truncated)"
+            embed.add_field(name="Failed Cogs", value=fail_text, inline=False)
+        embed.set_footer(text=f"Executed by {interaction.user}")
+        self._backend_log(embed)
 
     # ------------------------------------------------------------
     # /backend hardrestart  <-- signals launcher_control file and closes bot process
@@ -303,6 +423,11 @@ class BackendControl(commands.Cog):
                 pass
             return
 
+        try:
+            self.store.flush()
+        except Exception:
+            logger.exception("Failed to flush storage before hardrestart")
+
         try:
             await interaction.followup.send("♻️ Hard restart requested — shutting down now.", ephemeral=True)
             # close the bot to let launcher relaunch it
@@ -318,22 +443,36 @@ class BackendControl(commands.Cog):
     # /backend update
     # ------------------------------------------------------------
     @backend_group.command(name="update", description="Send update message to all guilds (hidden)")
-    @app_commands.describe(message="The message to broadcast to all update channels.")
-    async def backend_update(self, interaction: discord.Interaction, message: str):
+    @app_commands.describe(
+        message="The message to broadcast to all update channels.",
+        resume="Finish an interrupted broadcast instead (its original message is used)",
+        discard="Drop an interrupted broadcast and send this new message"
+    )
+    async def backend_update(self, interaction: discord.Interaction, message: str, resume: bool = False, discard: bool = False):
         await interaction.response.defer(ephemeral=True)
 
-        data = load_data()
+        job = Broadcast.load()
+        if job and resume:
+            message = job.message
+        elif job and not discard:
+            await interaction.followup.send(
+                f"⚠️ A broadcast by {job.author} was interrupted after {len(job.done)} guilds:\n> {job.message[:200]}\n"
+                "Run `/backend update` again with `resume: True` to finish it, or `discard: True` to send your new message instead.",
+                ephemeral=True
+            )
+            return
+        else:
+            if job:
+                job.discard()
+            job = Broadcast(BROADCAST_FILE, message, str(interaction.user))
+
         update_channels = {}
         # Collect all channels properly from per-guild data (storage keeps per-guild lists)
-        for gid, gdata in data.get("guilds", {}).items():
-            for ch in gdata.get("update_channels", []):
-                # if multiple channels exist per guild, keep the first (preserve older behavior)
-                if gid not in update_channels:
-                    update_channels[gid] = ch
-
-        sent = 0
-        failed = 0
-        dmed = 0
+        for gid, ch in self.store.get_all_update_channels():
+            # if multiple channels exist per guild, keep the first (preserve older behavior)
+            if gid not in update_channels:
+                update_channels[gid] = ch
+
         total_guilds = len(self.bot.guilds)
 
         embed_template = discord.Embed(
@@ -341,40 +480,59 @@ class BackendControl(commands.Cog):
             description=message,
             color=discord.Color.gold()
         )
-        embed_template.set_footer(text=f"Sent by {interaction.user}")
+        embed_template.set_footer(text=f"Sent by {job.author}")
 
-        # Send updates
-        for guild in self.bot.guilds:
-            guild_id = str(guild.id)
+        async def send_update(guild_id):
+            guild = self.bot.get_guild(int(guild_id))
+            if guild is None:
+                return "failed"
             channel_id = update_channels.get(guild_id)
 
             if channel_id:
                 channel = self.bot.get_channel(int(channel_id))
                 if channel:
                     try:
-                        embed = embed_template.copy()
-                        await channel.send(embed=embed)
-                        sent += 1
-                        continue
+                        await self._throttle("channel_send", channel.id)
+                        await channel.send(embed=embed_template.copy())
+                        return "sent"
                     except Exception:
-                        failed += 1
                         logger.warning(f"Failed to send update to {guild.name} ({guild_id})")
                 else:
-                    # channel not found (maybe bot lost view) -> treat as failure and fallback to owner DM
-                    failed += 1
+                    # channel not found (maybe bot lost view) -> fall back to owner DM
                     logger.warning(f"Update channel not found for guild {guild.name} ({channel_id})")
 
             # Fallback: DM owner
             if guild.owner:
                 try:
+                    await self._throttle("dm_create")
                     await guild.owner.send(f"📢 **Bot Update for {guild.name}**\n\n{message}")
-                    dmed += 1
+                    return "dmed"
                 except discord.Forbidden:
-                    failed += 1
                     logger.warning(f"Cannot DM owner of {guild.name} (DMs disabled).")
                 except Exception:
-                    failed += 1
                     logger.exception(f"Error DMing owner of {guild.name}")
+            return "failed"
+
+        def progress_text(prefix):
+            counts = job.counts()
+            return (
+                f"{prefix} **{len(job.done)}/{total_guilds}** guilds — "
+                f"✅ {counts['sent']} sent, 📬 {counts['dmed']} DMed, ❌ {counts['failed']} failed"
+            )
+
+        progress = ProgressMessage(interaction, self._throttle)
+        await progress.start(progress_text("📢 Broadcasting…"))
+
+        async def on_progress(_job):
+            await progress.update(progress_text("📢 Broadcasting…"))
+
+        counts = await job.run(
+            [str(guild.id) for guild in self.bot.guilds],
+            send_update,
+            concurrency=self.settings.get("broadcast_concurrency", 10),
+            on_progress=on_progress
+        )
+        sent, dmed, failed = counts["sent"], counts["dmed"], counts["failed"]
 
         # Summary message
         summary = (
@@ -384,28 +542,18 @@ class BackendControl(commands.Cog):
             f"📊 Overall: **{sent + dmed}/{total_guilds} guilds** updated."
         )
 
-        try:
-            await interaction.followup.send(summary, ephemeral=True)
-        except Exception:
-            logger.exception("Failed to send update summary followup")
+        await progress.finish(summary)
 
         logger.info(f"Backend update by {interaction.user}: {summary}")
 
         # also log to backend channel if configured
-        backend_log_channel_id = self.settings.get("backend_log_channel_id")
-        if backend_log_channel_id:
-            try:
-                ch = self.bot.get_channel(int(backend_log_channel_id))
-                if ch:
-                    log_embed = discord.Embed(
-                        title="📢 Backend Update Broadcast",
-                        description=f"{message}\n\n{summary}",
-                        color=discord.Color.orange()
-                    )
-                    log_embed.set_footer(text=f"Executed by {interaction.user}")
-                    await ch.send(embed=log_embed)
-            except Exception:
-                logger.exception("Failed to send backend update log to channel.")
+        log_embed = discord.Embed(
+            title="📢 Backend Update Broadcast",
+            description=f"{message}\n\n{summary}",
+            color=discord.Color.orange()
+        )
+        log_embed.set_footer(text=f"Executed by {interaction.user}")
+        self._backend_log(log_embed)
 
     # ------------------------------------------------------------
     # /backend supportinvite
@@ -414,7 +562,8 @@ class BackendControl(commands.Cog):
         name="supportinvite",
         description="DM all admins and guild owners an invite to the support server (hidden)"
     )
-    async def backend_supportinvite(self, interaction: discord.Interaction):
+    @app_commands.describe(resend="Also DM users who already got the invite from an earlier run")
+    async def backend_supportinvite(self, interaction: discord.Interaction, resend: bool = False):
         await interaction.response.defer(ephemeral=True)
 
         support_invite = self.settings.get("support_invite")
@@ -422,49 +571,69 @@ class BackendControl(commands.Cog):
             await interaction.followup.send("❌ No support server invite is set in settings.", ephemeral=True)
             return
 
-        sent = 0
-        failed = 0
-        messaged_users = set()  # avoid duplicate DMs
-
-        # access reminderadmin.data
-        reminder_data = getattr(reminderadmin, "data", {})
+        campaign = DMCampaign(
+            "supportinvite",
+            concurrency=self.settings.get("dm_campaign_concurrency", 5),
+            # Own low-priority bucket: a long campaign must not hold up reminder DMs
+            throttle=lambda: self._throttle("campaign_dm")
+        )
+        if resend:
+            campaign.reset()
 
+        # Owner plus every listed admin (directly or through an admin role), from the live store
         for guild in self.bot.guilds:
-            guild_id = str(guild.id)
-            gdata = reminder_data.get("guilds", {}).get(guild_id, {})
-            user_ids = set(gdata.get("admins", []))
-            if guild.owner:
-                user_ids.add(str(guild.owner.id))
-
-            for uid in user_ids:
-                if uid in messaged_users:
-                    continue
-                try:
-                    member = guild.get_member(int(uid))
-                except Exception:
-                    member = None
-
+            gdata = self.store.get_guild(guild.id)
+            members = {guild.owner} if guild.owner else set()
+            for uid in gdata.get("admins", []):
+                member = guild.get_member(int(uid))
                 if member:
-                    try:
-                        await member.send(
-                            f"Hello {member.name},\n\n"
-                            f"You are listed as an admin on **{guild.name}**.\n"
-                            f"Join our support server here: {support_invite}"
-                        )
-                        sent += 1
-                        messaged_users.add(uid)
-                    except discord.Forbidden:
-                        failed += 1
-                    except Exception:
-                        failed += 1
-                        logger.exception(f"Failed to DM admin {uid} of guild {guild.name}")
+                    members.add(member)
+            for rid in gdata.get("admin_roles", []):
+                role = guild.get_role(int(rid))
+                if role:
+                    members.update(m for m in role.members if not m.bot)
+            for member in members:
+                campaign.add(guild, member)
+
+        def progress_text():
+            totals = campaign.totals()
+            done = totals["sent"] + totals["failed"] + totals["skipped"]
+            return f"📨 Sending support invites… **{done}/{campaign.total}** — ✅ {totals['sent']} sent, ❌ {totals['failed']} failed"
+
+        progress = ProgressMessage(interaction, self._throttle)
+        await progress.start(progress_text())
+
+        async def on_progress(_campaign):
+            await progress.update(progress_text())
+
+        await campaign.run(lambda member, guild: (
+            f"Hello {member.name},\n\n"
+            f"You are listed as an admin on **{guild.name}**.\n"
+            f"Join our support server here: {support_invite}"
+        ), on_progress=on_progress)
+        totals = campaign.totals()
 
-        try:
-            await interaction.followup.send(f"✅ Support invite sent to {sent} users, failed for {failed}.", ephemeral=True)
-        except Exception:
-            logger.exception("Failed to send supportinvite followup")
+        summary = (
+            f"✅ Support invite sent to {totals['sent']} users, failed for {totals['failed']}"
+            f", skipped {totals['skipped']} already invited."
+        )
+        embed = discord.Embed(
+            title="📨 Support Invite Report",
+            description="\n".join(campaign.report_lines())[:4000] or "No guilds.",
+            color=discord.Color.blurple()
+        )
+        await progress.finish(summary, embed=embed)
 
-        logger.info(f"Backend support invite broadcast by {interaction.user} sent={sent} failed={failed}")
+        # Also in the backend log channel, which outlives the interaction
+        log_embed = discord.Embed(
+            title="📨 Support Invite Campaign",
+            description=f"{summary}\n\n{embed.description}"[:4000],
+            color=discord.Color.blurple()
+        )
+        log_embed.set_footer(text=f"Executed by {interaction.user}")
+        self._backend_log(log_embed)
+
+        logger.info(f"Backend support invite broadcast by {interaction.user} sent={totals['sent']} failed={totals['failed']} skipped={totals['skipped']}")
 
     # ------------------------------------------------------------
     # /backend listadmins
@@ -472,12 +641,9 @@ class BackendControl(commands.Cog):
     @backend_group.command(name="listadmins", description="List all admins and admin roles (hidden)")
     async def backend_listadmins(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
-        reminder_data = getattr(reminderadmin, "data", {})
-
         lines = []
         for guild in self.bot.guilds:
-            guild_id = str(guild.id)
-            gdata = reminder_data.get("guilds", {}).get(guild_id, {})
+            gdata = self.store.get_guild(guild.id)
             users = gdata.get("admins", [])
             roles = gdata.get("admin_roles", [])
 
@@ -497,12 +663,9 @@ class BackendControl(commands.Cog):
     @backend_group.command(name="listusermanagers", description="List all user managers and roles (hidden)")
     async def backend_listusermanagers(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
-        reminder_data = getattr(reminderadmin, "data", {})
-
         lines = []
         for guild in self.bot.guilds:
-            guild_id = str(guild.id)
-            gdata = reminder_data.get("guilds", {}).get(guild_id, {})
+            gdata = self.store.get_guild(guild.id)
             users = gdata.get("user_managers", [])
             roles = gdata.get("user_manager_roles", [])
 
@@ -522,12 +685,9 @@ class BackendControl(commands.Cog):
     @backend_group.command(name="guilddefaults", description="Show default reminder delivery for all guilds")
     async def backend_guilddefaults(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
-        reminder_data = getattr(reminderadmin, "data", {})
-
         lines = []
         for guild in self.bot.guilds:
-            guild_id = str(guild.id)
-            default_delivery = reminder_data.get("guilds", {}).get(guild_id, {}).get("default_delivery", "Not Set")
+            default_delivery = self.store.get_guild_default_delivery(guild.id) or "Not Set"
             lines.append(f"**{guild.name}**: {default_delivery}")
 
         try:
@@ -593,6 +753,11 @@ class BackendControl(commands.Cog):
                 pass
             return
 
+        try:
+            self.store.flush()
+        except Exception:
+            logger.exception("Failed to flush storage before stop")
+
         try:
             await interaction.followup.send("🛑 Stopping bot and launcher...", ephemeral=True)
             await self.bot.close()
@@ -605,4 +770,4 @@ class BackendControl(commands.Cog):
 
 
 async def setup(bot):
-    await bot.add_cog(BackendControl(bot))
+    await bot.add_cog(BackendControl(bot, bot.store))
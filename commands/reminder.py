@@ -4,22 +4,16 @@ from discord.ext import commands
 from datetime import datetime, timedelta
 import logging
 
-from storage import (
-    add_reminder,
-    load_data,
-    get_user_reminders,
-    remove_reminder,
-    get_guild_default_delivery,
-    save_data,
-    TIMEZONE
-)
-
-data = load_data()
+from storage import ReminderStore, TIMEZONE
+from utility.util_delivery import DeliveryPlanError, build_plan, render_plan
+from utility.util_recurrence import describe, first_due, parse_recurrence
+
 logger = logging.getLogger("bot")
 
 class Reminder(commands.Cog):
-    def __init__(self, bot: commands.Bot):
+    def __init__(self, bot: commands.Bot, store: ReminderStore):
         self.bot = bot
+        self.store = store
 
     def resolve_target(self, interaction: discord.Interaction, target: str):
         """Resolve target string to member or role mention."""
@@ -55,12 +49,23 @@ class Reminder(commands.Cog):
 
         return None
 
+    def get_own_reminder(self, interaction: discord.Interaction, reminder_id: str):
+        """Look up a reminder by ID, only if it belongs to the invoking user in this guild."""
+        try:
+            reminder = self.store.get_reminder(int(reminder_id))
+        except ValueError:
+            return None
+        if not reminder or reminder["guild_id"] != interaction.guild_id or reminder["user_id"] != interaction.user.id:
+            return None
+        return reminder
+
     @app_commands.command(name="reminder", description="Set a reminder")
     @app_commands.describe(
-        minutes="Minutes until the reminder",
+        minutes="Minutes until the reminder (ignored for cron repeats)",
         message="Reminder text",
         delivery="Delivery: dm / channel / forum / both",
-        target="Optional: user, role, or 'everyone'"
+        target="Optional: user, role, or 'everyone'",
+        repeat="Optional: repeat e.g. 30m, 2h, daily, weekly, or cron 0 9 * * 1-5"
     )
     @app_commands.choices(
         delivery=[
@@ -76,13 +81,14 @@ class Reminder(commands.Cog):
         minutes: int,
         message: str,
         delivery: app_commands.Choice[str] = None,
-        target: str = None
+        target: str = None,
+        repeat: str = None
     ):
         try:
             guild_id = interaction.guild_id
             user = interaction.user
 
-            delivery_mode = delivery.value if delivery else get_guild_default_delivery(data, guild_id)
+            delivery_mode = delivery.value if delivery else self.store.get_guild_default_delivery(guild_id)
             if not delivery_mode:
                 await interaction.response.send_message("❌ Please specify a delivery mode or set a guild default.")
                 return
@@ -92,7 +98,13 @@ class Reminder(commands.Cog):
                 await interaction.response.send_message(f"❌ Target `{target}` not found or you lack permissions.")
                 return
 
-            when = datetime.now(TIMEZONE) + timedelta(minutes=minutes)
+            try:
+                recurrence = parse_recurrence(repeat) if repeat else None
+            except ValueError as e:
+                await interaction.response.send_message(f"❌ {e}")
+                return
+
+            when = first_due(recurrence, minutes, datetime.now(TIMEZONE), TIMEZONE)
 
             # Thread-aware: store actual channel/thread ID
             if delivery_mode in ("channel", "forum", "both"):
@@ -100,19 +112,22 @@ class Reminder(commands.Cog):
             else:
                 channel_id = None
 
-            reminder_obj = add_reminder(data, user.id, guild_id, message, when)
-            reminder_obj["delivery"] = delivery_mode
-            reminder_obj["target_mention"] = mention_text
-            if channel_id:
-                reminder_obj["channel_id"] = channel_id
-
-            # Save time as ISO string to avoid datetime issues
-            reminder_obj["time"] = when.isoformat()
+            try:
+                plan = build_plan(delivery_mode, interaction.channel if channel_id else None, message, mention_text)
+            except DeliveryPlanError as e:
+                await interaction.response.send_message(f"❌ {e}")
+                return
 
-            save_data(data)
+            reminder_obj = self.store.add_reminder(
+                user.id, guild_id, message, when,
+                delivery=delivery_mode, target_mention=mention_text, channel_id=channel_id, plan=plan,
+                recurrence=recurrence
+            )
 
+            repeat_text = f", repeats {describe(recurrence)}" if recurrence else ""
             await interaction.response.send_message(
-                f"⏰ Reminder set for {mention_text} at {when.strftime('%Y-%m-%d %H:%M:%S %Z')} (Delivery: {delivery_mode})"
+                f"⏰ Reminder set for {mention_text} at {when.strftime('%Y-%m-%d %H:%M:%S %Z')} "
+                f"(Delivery: {delivery_mode}{repeat_text}, ID: `{reminder_obj['id']}`)"
             )
             logger.info(
                 f"[GUILD {interaction.guild.name} ({guild_id})] {user} set reminder '{message}' for '{mention_text}' "
@@ -123,25 +138,72 @@ class Reminder(commands.Cog):
             await interaction.response.send_message("❌ An error occurred while setting the reminder.")
 
     @app_commands.command(name="cancelreminder", description="Cancel your own reminders")
-    async def cancelreminder(self, interaction: discord.Interaction):
+    @app_commands.describe(reminder_id="Optional: ID of a single reminder to cancel (default: all of yours)")
+    async def cancelreminder(self, interaction: discord.Interaction, reminder_id: str = None):
         try:
             guild_id = interaction.guild_id
             user_id = interaction.user.id
-            reminders = get_user_reminders(data, guild_id, user_id)
+            if reminder_id:
+                reminder_obj = self.get_own_reminder(interaction, reminder_id)
+                if not reminder_obj:
+                    await interaction.response.send_message(f"❌ No reminder of yours with ID `{reminder_id}`.")
+                    return
+                self.store.remove_reminder(reminder_obj)
+                await interaction.response.send_message(f"✅ Canceled reminder `{reminder_id}`: {reminder_obj['message']}")
+                logger.info(f"[GUILD {interaction.guild.name} ({guild_id})] {interaction.user} canceled reminder {reminder_id}.")
+                return
+
+            reminders = self.store.remove_reminders(lambda r: r["guild_id"] == guild_id and r["user_id"] == user_id)
             if not reminders:
                 await interaction.response.send_message("You have no active reminders.")
                 return
 
-            for r in reminders:
-                remove_reminder(data, r)
-            save_data(data)
-
             await interaction.response.send_message(f"✅ Canceled {len(reminders)} of your reminders.")
             logger.info(f"[GUILD {interaction.guild.name} ({guild_id})] {interaction.user} canceled {len(reminders)} reminders.")
         except Exception as e:
             logger.exception(f"Error in cancelreminder command by {interaction.user}: {e}")
             await interaction.response.send_message("❌ An error occurred while canceling your reminders.")
 
+    @app_commands.command(name="editreminder", description="Edit one of your reminders")
+    @app_commands.describe(
+        reminder_id="ID of the reminder to edit",
+        message="Optional: new reminder text",
+        minutes="Optional: new time, in minutes from now"
+    )
+    async def editreminder(self, interaction: discord.Interaction, reminder_id: str, message: str = None, minutes: int = None):
+        try:
+            reminder_obj = self.get_own_reminder(interaction, reminder_id)
+            if not reminder_obj:
+                await interaction.response.send_message(f"❌ No reminder of yours with ID `{reminder_id}`.")
+                return
+            if message is None and minutes is None:
+                await interaction.response.send_message("❌ Give a new message and/or a new time.")
+                return
+            if self.store.is_in_flight(reminder_obj["id"]):
+                # Delivery would remove (or advance) it afterwards and the edit would be lost
+                await interaction.response.send_message(
+                    f"❌ Reminder `{reminder_id}` is being delivered right now and can't be edited."
+                )
+                return
+
+            changes = {}
+            if message is not None:
+                changes["message"] = message
+                if reminder_obj.get("plan"):
+                    changes["plan"] = render_plan(dict(reminder_obj["plan"]), message, reminder_obj["target_mention"])
+            if minutes is not None:
+                changes["time"] = datetime.now(TIMEZONE) + timedelta(minutes=minutes)
+            reminder_obj = self.store.update_reminder(reminder_obj["id"], **changes)
+
+            await interaction.response.send_message(
+                f"✏️ Reminder `{reminder_id}` updated: {reminder_obj['message']} "
+                f"(at {datetime.fromisoformat(reminder_obj['time']).strftime('%Y-%m-%d %H:%M:%S %Z')})"
+            )
+            logger.info(f"[GUILD {interaction.guild.name} ({interaction.guild_id})] {interaction.user} edited reminder {reminder_id}: {changes}")
+        except Exception as e:
+            logger.exception(f"Error in editreminder command by {interaction.user}: {e}")
+            await interaction.response.send_message("❌ An error occurred while editing the reminder.")
+
 
 async def setup(bot: commands.Bot):
-    await bot.add_cog(Reminder(bot))
+    await bot.add_cog(Reminder(bot, bot.store))
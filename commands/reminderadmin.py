@@ -1,35 +1,28 @@
+import asyncio
 import discord
 from discord import app_commands
 from discord.ext import commands
 from typing import Union
-from datetime import datetime, timedelta
+from datetime import datetime
 import logging
 
-from storage import (
-    load_data,
-    save_data,
-    is_reminder_admin,
-    is_user_manager,
-    set_guild_default_delivery,
-    add_reminder,
-    get_user_reminders,
-    remove_reminder,
-    get_guild_default_delivery,
-    TIMEZONE
-)
-
-data = load_data()
+from storage import ReminderStore, TIMEZONE
+from utility.util_campaign import DMCampaign
+from utility.util_delivery import DeliveryPlanError, build_plan
+from utility.util_recurrence import describe, first_due, parse_recurrence
+
 logger = logging.getLogger("bot")  # Central logger, set up in main bot file
 
 class ReminderAdmin(commands.Cog):
-    def __init__(self, bot: commands.Bot):
+    def __init__(self, bot: commands.Bot, store: ReminderStore):
         self.bot = bot
+        self.store = store
 
     # --- Helpers ---
     def check_admin_permission(self, member: discord.Member, guild_id: int):
         if member.id == member.guild.owner_id:
             return True
-        if is_reminder_admin(data, guild_id, member) or is_user_manager(data, guild_id, member):
+        if self.store.is_reminder_admin(guild_id, member) or self.store.is_user_manager(guild_id, member):
             return True
         return any(role.permissions.administrator or role.permissions.manage_guild for role in member.roles)
 
@@ -82,31 +75,69 @@ class ReminderAdmin(commands.Cog):
         return None
 
     # --- Guild Join DM ---
+    WELCOME_TEMPLATE = (
+        "Hello {user_name},\n\n"
+        "Thanks for adding me to **{guild_name}**!\n\n"
+        "To set up the bot, please:\n"
+        "1. Set default reminder delivery with `/setdefaultdelivery`.\n"
+        "2. Add Admins with `/addadmin` and User Managers with `/addusermanager`.\n"
+        "3. Use `/reminderfor` to set reminders for others.\n\n"
+        "For help, go to the support discord server.\n"
+        "Support server: https://discord.gg/5W7tU6A49P"
+    )
+
+    async def cog_load(self):
+        # Welcome DMs are sent one guild at a time by a background worker
+        self._welcome_queue = asyncio.Queue()
+        self._welcome_task = asyncio.create_task(self._welcome_worker(), name="welcome_dms")
+
+    async def cog_unload(self):
+        self._welcome_task.cancel()
+
     @commands.Cog.listener()
     async def on_guild_join(self, guild: discord.Guild):
-        message_template = (
-            "Hello {user_name},\n\n"
-            "Thanks for adding me to **{guild_name}**!\n\n"
-            "To set up the bot, please:\n"
-            "1. Set default reminder delivery with `/setdefaultdelivery`.\n"
-            "2. Add Admins with `/addadmin` and User Managers with `/addusermanager`.\n"
-            "3. Use `/reminderfor` to set reminders for others.\n\n"
-            "For help, go to the support discord server.\n"
-            "Support server: https://discord.gg/5W7tU6A49P"
+        # Return straight away; discovery and DMs happen in the background
+        self._welcome_queue.put_nowait(guild)
+
+    @staticmethod
+    def admin_roles(guild: discord.Guild):
+        """Roles granting administrator or manage_guild (not @everyone, not bot integration roles)."""
+        return [
+            role for role in guild.roles
+            if (role.permissions.administrator or role.permissions.manage_guild)
+            and not role.is_default() and not role.managed
+        ]
+
+    async def find_guild_admins(self, guild: discord.Guild):
+        """Owner plus the (non-bot) members of each admin role, without walking the whole member list."""
+        admins = {guild.owner.id: guild.owner} if guild.owner else {}
+        for role in self.admin_roles(guild):
+            for member in role.members:
+                if not member.bot:
+                    admins.setdefault(member.id, member)
+            await asyncio.sleep(0)  # yield between roles on very large guilds
+        return list(admins.values())
+
+    async def _welcome_worker(self):
+        while True:
+            guild = await self._welcome_queue.get()
+            try:
+                await self.send_welcome(guild)
+            except Exception:
+                logger.exception(f"Failed to send welcome DMs for guild {guild.name} ({guild.id})")
+
+    async def send_welcome(self, guild: discord.Guild):
+        # Same DM primitive as /backend supportinvite; not persisted, so a re-invite welcomes again
+        limiter = getattr(self.bot, "limiter", None)
+        campaign = DMCampaign(
+            f"welcome:{guild.id}", path=None, concurrency=2,
+            throttle=(lambda: limiter.acquire("campaign_dm")) if limiter else None
         )
+        for member in await self.find_guild_admins(guild):
+            campaign.add(guild, member)
 
-        try:
-            if guild.owner:
-                await guild.owner.send(message_template.format(user_name=guild.owner.name, guild_name=guild.name))
-        except Exception:
-            logger.warning(f"Could not DM guild owner {guild.owner} of {guild.name}")
-
-        for member in guild.members:
-            if member.guild_permissions.administrator and member != guild.owner:
-                try:
-                    await member.send(message_template.format(user_name=member.name, guild_name=guild.name))
-                except Exception:
-                    logger.warning(f"Could not DM admin {member} of {guild.name}")
+        await campaign.run(lambda user, g: self.WELCOME_TEMPLATE.format(user_name=user.name, guild_name=g.name))
+        logger.info(f"[GUILD {guild.name} ({guild.id})] Welcome DMs: {', '.join(campaign.report_lines())}")
 
     # --- Admin Commands ---
     @app_commands.command(name="addadmin", description="Add a user or role as Admin Manager")
@@ -117,16 +148,7 @@ class ReminderAdmin(commands.Cog):
                 logger.warning(f"Unauthorized addadmin attempt by {interaction.user} in guild {interaction.guild_id}")
                 return
 
-            guild = data["guilds"].setdefault(str(interaction.guild_id), {})
-            if isinstance(target, discord.User):
-                guild.setdefault("admins", [])
-                if str(target.id) not in guild["admins"]:
-                    guild["admins"].append(str(target.id))
-            else:
-                guild.setdefault("admin_roles", [])
-                if str(target.id) not in guild["admin_roles"]:
-                    guild["admin_roles"].append(str(target.id))
-            save_data(data)
+            self.store.add_admin(interaction.guild_id, target.id, is_role=isinstance(target, discord.Role))
             await interaction.response.send_message(f"✅ {target} added as Admin.")
             logger.info(f"AM {interaction.user} added admin {target} in guild {interaction.guild_id}")
         except Exception as e:
@@ -141,14 +163,7 @@ class ReminderAdmin(commands.Cog):
                 logger.warning(f"Unauthorized removeadmin attempt by {interaction.user} in guild {interaction.guild_id}")
                 return
 
-            guild = data["guilds"].setdefault(str(interaction.guild_id), {})
-            if isinstance(target, discord.User):
-                if str(target.id) in guild.get("admins", []):
-                    guild["admins"].remove(str(target.id))
-            else:
-                if str(target.id) in guild.get("admin_roles", []):
-                    guild["admin_roles"].remove(str(target.id))
-            save_data(data)
+            self.store.remove_admin(interaction.guild_id, target.id, is_role=isinstance(target, discord.Role))
             await interaction.response.send_message(f"✅ {target} removed from Admins.")
             logger.info(f"AM {interaction.user} removed admin {target} in guild {interaction.guild_id}")
         except Exception as e:
@@ -158,7 +173,7 @@ class ReminderAdmin(commands.Cog):
     @app_commands.command(name="listadmins", description="List all Admins and Admin roles")
     async def listadmins(self, interaction: discord.Interaction):
         try:
-            guild = data["guilds"].get(str(interaction.guild_id), {})
+            guild = self.store.get_guild(interaction.guild_id)
             users = guild.get("admins", [])
             roles = guild.get("admin_roles", [])
 
@@ -181,16 +196,7 @@ class ReminderAdmin(commands.Cog):
                 logger.warning(f"Unauthorized addusermanager attempt by {interaction.user} in guild {interaction.guild_id}")
                 return
 
-            guild = data["guilds"].setdefault(str(interaction.guild_id), {})
-            if isinstance(target, discord.User):
-                guild.setdefault("user_managers", [])
-                if str(target.id) not in guild["user_managers"]:
-                    guild["user_managers"].append(str(target.id))
-            else:
-                guild.setdefault("user_manager_roles", [])
-                if str(target.id) not in guild["user_manager_roles"]:
-                    guild["user_manager_roles"].append(str(target.id))
-            save_data(data)
+            self.store.add_user_manager(interaction.guild_id, target.id, is_role=isinstance(target, discord.Role))
             await interaction.response.send_message(f"✅ {target} added as User Manager.")
             logger.info(f"AM {interaction.user} added user manager {target} in guild {interaction.guild_id}")
         except Exception as e:
@@ -205,14 +211,7 @@ class ReminderAdmin(commands.Cog):
                 logger.warning(f"Unauthorized removeusermanager attempt by {interaction.user} in guild {interaction.guild_id}")
                 return
 
-            guild = data["guilds"].setdefault(str(interaction.guild_id), {})
-            if isinstance(target, discord.User):
-                if str(target.id) in guild.get("user_managers", []):
-                    guild["user_managers"].remove(str(target.id))
-            else:
-                if str(target.id) in guild.get("user_manager_roles", []):
-                    guild["user_manager_roles"].remove(str(target.id))
-            save_data(data)
+            self.store.remove_user_manager(interaction.guild_id, target.id, is_role=isinstance(target, discord.Role))
             await interaction.response.send_message(f"✅ {target} removed from User Managers.")
             logger.info(f"AM {interaction.user} removed user manager {target} in guild {interaction.guild_id}")
         except Exception as e:
@@ -222,7 +221,7 @@ class ReminderAdmin(commands.Cog):
     @app_commands.command(name="listusermanagers", description="List all User Managers and roles")
     async def listusermanagers(self, interaction: discord.Interaction):
         try:
-            guild = data["guilds"].get(str(interaction.guild_id), {})
+            guild = self.store.get_guild(interaction.guild_id)
             users = guild.get("user_managers", [])
             roles = guild.get("user_manager_roles", [])
 
@@ -253,8 +252,7 @@ class ReminderAdmin(commands.Cog):
                 logger.warning(f"Unauthorized setdefaultdelivery attempt by {interaction.user} in guild {interaction.guild_id}")
                 return
 
-            set_guild_default_delivery(data, interaction.guild_id, delivery.value)
-            save_data(data)
+            self.store.set_guild_default_delivery(interaction.guild_id, delivery.value)
             await interaction.response.send_message(f"✅ Default delivery set to **{delivery.name}**.")
             logger.info(f"UM {interaction.user} set default delivery to {delivery.value} in guild {interaction.guild_id}")
         except Exception as e:
@@ -263,7 +261,7 @@ class ReminderAdmin(commands.Cog):
 
     # --- Reminder Control for Others ---
     @app_commands.command(name="reminderfor", description="Set a reminder for another user or role")
-    @app_commands.describe(minutes="Minutes until the reminder", message="Reminder text", delivery="Delivery: dm / channel / forum / both", target="User, role, or 'everyone'")
+    @app_commands.describe(minutes="Minutes until the reminder (ignored for cron repeats)", message="Reminder text", delivery="Delivery: dm / channel / forum / both", target="User, role, or 'everyone'", repeat="Optional: repeat e.g. 30m, 2h, daily, weekly, or cron 0 9 * * 1-5")
     @app_commands.choices(
         delivery=[
             app_commands.Choice(name="DM only", value="dm"),
@@ -272,7 +270,7 @@ class ReminderAdmin(commands.Cog):
             app_commands.Choice(name="DM + Channel", value="both"),
         ]
     )
-    async def reminderfor(self, interaction: discord.Interaction, minutes: int, message: str, delivery: app_commands.Choice[str] = None, target: str = None):
+    async def reminderfor(self, interaction: discord.Interaction, minutes: int, message: str, delivery: app_commands.Choice[str] = None, target: str = None, repeat: str = None):
         try:
             guild_id = interaction.guild_id
             if not self.check_user_manager_permission(interaction.user, guild_id):
@@ -280,7 +278,7 @@ class ReminderAdmin(commands.Cog):
                 logger.warning(f"Unauthorized reminderfor attempt by {interaction.user} in guild {guild_id}")
                 return
 
-            delivery_mode = delivery.value if delivery else get_guild_default_delivery(data, guild_id)
+            delivery_mode = delivery.value if delivery else self.store.get_guild_default_delivery(guild_id)
             if not delivery_mode:
                 await interaction.response.send_message("❌ Specify a delivery mode or set guild default.")
                 return
@@ -290,18 +288,30 @@ class ReminderAdmin(commands.Cog):
                 await interaction.response.send_message(f"❌ Target `{target}` not found or you lack permissions.")
                 return
 
-            when = datetime.now(TIMEZONE) + timedelta(minutes=minutes)
+            try:
+                recurrence = parse_recurrence(repeat) if repeat else None
+            except ValueError as e:
+                await interaction.response.send_message(f"❌ {e}")
+                return
+
+            when = first_due(recurrence, minutes, datetime.now(TIMEZONE), TIMEZONE)
             channel_id = self.get_delivery_channel(interaction, delivery_mode)
 
-            reminder_obj = add_reminder(data, interaction.user.id, guild_id, message, when)
-            reminder_obj["delivery"] = delivery_mode
-            reminder_obj["target_mention"] = mention_text
-            if channel_id:
-                reminder_obj["channel_id"] = channel_id
+            try:
+                plan = build_plan(delivery_mode, interaction.channel if channel_id else None, message, mention_text)
+            except DeliveryPlanError as e:
+                await interaction.response.send_message(f"❌ {e}")
+                return
 
-            save_data(data)
+            reminder_obj = self.store.add_reminder(
+                interaction.user.id, guild_id, message, when,
+                delivery=delivery_mode, target_mention=mention_text, channel_id=channel_id, plan=plan,
+                recurrence=recurrence
+            )
+            repeat_text = f", repeats {describe(recurrence)}" if recurrence else ""
             await interaction.response.send_message(
-                f"⏰ Reminder set for {mention_text} at {when.strftime('%Y-%m-%d %H:%M:%S %Z')} (Delivery: {delivery_mode})"
+                f"⏰ Reminder set for {mention_text} at {when.strftime('%Y-%m-%d %H:%M:%S %Z')} "
+                f"(Delivery: {delivery_mode}{repeat_text}, ID: `{reminder_obj['id']}`)"
             )
             logger.info(f"UM {interaction.user} set reminder for {mention_text} in guild {guild_id} message='{message}' at {when}")
         except Exception as e:
@@ -323,13 +333,17 @@ class ReminderAdmin(commands.Cog):
                 await interaction.response.send_message(f"❌ Target `{target}` not found or you lack permissions.")
                 return
 
-            all_reminders = get_user_reminders(data, guild_id)
+            all_reminders = self.store.get_user_reminders(guild_id)
             filtered = [r for r in all_reminders if r.get("target_mention") == mention_text]
             if not filtered:
                 await interaction.response.send_message("No reminders found for this target.")
                 return
 
-            text = "\n".join([f"- {r['message']} (at {r['time']})" for r in filtered])
+            text = "\n".join([
+                f"- `{r['id']}` {r['message']} (at {r['time']}"
+                + (f", repeats {describe(r['recurrence'])})" if r.get("recurrence") else ")")
+                for r in filtered
+            ])
             await interaction.response.send_message(f"Reminders for {target}:\n{text}")
             logger.info(f"UM {interaction.user} listed reminders for {mention_text} in guild {guild_id}")
         except Exception as e:
@@ -351,14 +365,10 @@ class ReminderAdmin(commands.Cog):
                 await interaction.response.send_message(f"❌ Target `{target}` not found or you lack permissions.")
                 return
 
-            all_reminders = get_user_reminders(data, guild_id)
-            canceled_count = 0
-            for r in all_reminders:
-                if r.get("target_mention") == mention_text:
-                    remove_reminder(data, r)
-                    canceled_count += 1
-
-            save_data(data)
+            canceled = self.store.remove_reminders(
+                lambda r: r["guild_id"] == guild_id and r.get("target_mention") == mention_text
+            )
+            canceled_count = len(canceled)
             await interaction.response.send_message(f"✅ Canceled {canceled_count} reminders for {target}.")
             logger.info(f"UM {interaction.user} canceled {canceled_count} reminders for {mention_text} in guild {guild_id}")
         except Exception as e:
@@ -375,11 +385,7 @@ class ReminderAdmin(commands.Cog):
                 logger.warning(f"Unauthorized setupdatechannel attempt by {interaction.user} in guild {interaction.guild_id}")
                 return
 
-            guild = data["guilds"].setdefault(str(interaction.guild_id), {})
-            guild.setdefault("update_channels", [])
-            if str(channel.id) not in guild["update_channels"]:
-                guild["update_channels"].append(str(channel.id))
-            save_data(data)
+            self.store.add_update_channel(interaction.guild_id, channel.id)
             await interaction.response.send_message(f"✅ Channel {channel.mention} added as update channel.")
             logger.info(f"AM {interaction.user} set update channel {channel} in guild {interaction.guild_id}")
         except Exception as e:
@@ -395,10 +401,7 @@ class ReminderAdmin(commands.Cog):
                 logger.warning(f"Unauthorized removeupdatechannel attempt by {interaction.user} in guild {interaction.guild_id}")
                 return
 
-            guild = data["guilds"].setdefault(str(interaction.guild_id), {})
-            if str(channel.id) in guild.get("update_channels", []):
-                guild["update_channels"].remove(str(channel.id))
-            save_data(data)
+            self.store.remove_update_channel(interaction.guild_id, channel.id)
             await interaction.response.send_message(f"✅ Channel {channel.mention} removed from update channels.")
             logger.info(f"AM {interaction.user} removed update channel {channel} in guild {interaction.guild_id}")
         except Exception as e:
@@ -408,7 +411,7 @@ class ReminderAdmin(commands.Cog):
     @app_commands.command(name="listupdatechannels", description="List all update channels in the guild")
     async def listupdatechannels(self, interaction: discord.Interaction):
         try:
-            guild = data["guilds"].get(str(interaction.guild_id), {})
+            guild = self.store.get_guild(interaction.guild_id)
             channels = guild.get("update_channels", [])
 
             if not channels:
@@ -424,4 +427,4 @@ class ReminderAdmin(commands.Cog):
 
 
 async def setup(bot: commands.Bot):
-    await bot.add_cog(ReminderAdmin(bot))
+    await bot.add_cog(ReminderAdmin(bot, bot.store))
@@ -3,10 +3,17 @@ from datetime import datetime
 import pytz
 import os
 import logging
+import asyncio
+
+from utility.util_recurrence import next_occurrence
+from utility.util_scheduler import ReminderScheduler
+from utility.util_serializers import get_serializer
 
 # ------------------- Constants -------------------
 TIMEZONE = pytz.timezone("Europe/Amsterdam")
 DATA_FILE = "data.json"
+DB_FILE = "data.db"
+SHARD_DIR = "data"
 SETTINGS_FILE = "settings.json"
 LOG_FILE = "actions.log"
 
@@ -22,24 +29,11 @@ if not logger.handlers:
 def log_action(action: str):
     logger.info(action)
 
-# ------------------- Initialize Data Files -------------------
-if not os.path.exists(DATA_FILE):
-    with open(DATA_FILE, "w") as f:
-        json.dump({"reminders": [], "guilds": {}}, f, indent=4)
-
+# ------------------- Initialize Settings File -------------------
 if not os.path.exists(SETTINGS_FILE):
     with open(SETTINGS_FILE, "w") as f:
         json.dump({"backend_guild": None}, f, indent=4)
 
-# ------------------- Data Load/Save -------------------
-def load_data():
-    with open(DATA_FILE, "r") as f:
-        return json.load(f)
-
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4, default=str)
-
 def load_settings():
     with open(SETTINGS_FILE, "r") as f:
         return json.load(f)
@@ -48,27 +42,177 @@ def save_settings(settings):
     with open(SETTINGS_FILE, "w") as f:
         json.dump(settings, f, indent=4)
 
+# ------------------- Storage Engine -------------------
+# Selected with "storage_engine" in settings.json: "journal" (default), "json", "sqlite" or "sharded"
+_engine = None
+
+def _fold_journal(serializer):
+    """Merge ops left behind by the journal engine into data.json before another engine reads it."""
+    if os.path.exists(f"{DATA_FILE}.journal"):
+        from utility.util_storage_journal import JournalEngine
+        journal = JournalEngine(DATA_FILE, serializer=serializer)
+        journal.save(journal.load())
+        journal.close()
+        os.remove(journal.journal_path)
+
+def create_engine(name: str, settings=None):
+    settings = settings or {}
+    # File format for snapshots/shards ("json", "json-compact", "orjson" or "zlib"); reads auto-detect it
+    serializer = get_serializer(settings.get("storage_serializer", "json-compact"))
+    if name == "journal":
+        from utility.util_storage_journal import JournalEngine
+        return JournalEngine(
+            DATA_FILE,
+            max_ops=settings.get("journal_max_ops", 1000),
+            max_bytes=settings.get("journal_max_bytes", 1024 * 1024),
+            serializer=serializer
+        )
+    if name == "sqlite":
+        from utility.util_storage_sqlite import SqliteEngine, migrate_json
+        if not os.path.exists(DB_FILE) and os.path.exists(DATA_FILE):
+            _fold_journal(serializer)
+            migrate_json(DATA_FILE, DB_FILE)
+            log_action(f"Migrated {DATA_FILE} into {DB_FILE}")
+        return SqliteEngine(DB_FILE)
+    if name == "sharded":
+        from utility.util_storage_sharded import ShardedEngine, migrate_json
+        if not os.path.isdir(SHARD_DIR) and os.path.exists(DATA_FILE):
+            _fold_journal(serializer)
+            migrate_json(DATA_FILE, SHARD_DIR, serializer)
+            log_action(f"Split {DATA_FILE} into per-guild shards under {SHARD_DIR}/")
+        return ShardedEngine(SHARD_DIR, serializer)
+    if name == "json":
+        from utility.util_storage_json import JsonEngine
+        _fold_journal(serializer)
+        return JsonEngine(DATA_FILE, serializer)
+    raise ValueError(f"Unknown storage engine: {name}")
+
+def get_engine():
+    global _engine, _flush_window
+    if _engine is None:
+        settings = load_settings()
+        _flush_window = settings.get("storage_flush_window_ms", 250) / 1000
+        _engine = create_engine(settings.get("storage_engine", "journal"), settings)
+    return _engine
+
+# ------------------- Group Commit -------------------
+# Mutations queue their ops; a timer on the event loop hands them to the engine
+# at most once per flush window. Without a running loop (scripts) writes go straight through.
+_flush_window = 0.25
+_pending_ops = []
+_pending_data = None
+_flush_handle = None
+
+def _persist(data, *ops):
+    global _pending_data, _flush_handle
+    _pending_ops.extend(ops)
+    _pending_data = data
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        flush()
+        return
+    if _flush_handle is None:
+        get_engine()  # make sure _flush_window reflects settings
+        _flush_handle = loop.call_later(_flush_window, flush)
+
+def flush():
+    """Write every queued op to the engine in one batch. Safe to call at any time."""
+    global _flush_handle
+    if _flush_handle is not None:
+        _flush_handle.cancel()
+        _flush_handle = None
+    if not _pending_ops:
+        return
+    ops = list(_pending_ops)
+    _pending_ops.clear()
+    try:
+        get_engine().write(_pending_data, ops)
+    except Exception as e:
+        # Keep the ops so the next flush retries them instead of silently dropping changes
+        _pending_ops[:0] = ops
+        log_action(f"[ERROR] Failed to flush {len(ops)} storage ops: {e}")
+        raise
+
+def close_storage():
+    """Flush pending writes and release the engine (call on shutdown)."""
+    global _engine
+    flush()
+    if _engine is not None:
+        _engine.close()
+        _engine = None
+
+# ------------------- Data Load/Save -------------------
+def load_data():
+    engine = get_engine()
+    data = engine.load()
+    migrated_times = migrate_reminder_times(data)
+    migrated_ids = migrate_reminder_ids(data)
+    if migrated_times or migrated_ids:
+        # Persist once so later ops (matched on the full reminder) line up with what's on disk
+        engine.save(data)
+        log_action(f"Migrated legacy reminders: {migrated_times} to epoch due times, {migrated_ids} given IDs")
+    return data
+
+def save_data(data):
+    global _flush_handle
+    # A full save already contains every queued change
+    _pending_ops.clear()
+    if _flush_handle is not None:
+        _flush_handle.cancel()
+        _flush_handle = None
+    get_engine().save(data)
+
 # ------------------- Reminders -------------------
-def add_reminder(data, user_id, guild_id, message, time: datetime, delivery=None, target_mention=None, channel_id=None):
+# Snowflake-style 64-bit IDs: milliseconds since REMINDER_ID_EPOCH_MS << 22 | per-millisecond sequence
+REMINDER_ID_EPOCH_MS = 1735689600000  # 2025-01-01T00:00:00Z
+_last_id_ms = 0
+_id_seq = 0
+
+def new_reminder_id():
+    global _last_id_ms, _id_seq
+    now_ms = max(int(datetime.now(TIMEZONE).timestamp() * 1000) - REMINDER_ID_EPOCH_MS, _last_id_ms)
+    if now_ms == _last_id_ms:
+        _id_seq = (_id_seq + 1) & 0x3FFFFF
+        if _id_seq == 0:
+            now_ms += 1  # sequence exhausted: borrow the next millisecond
+    else:
+        _id_seq = 0
+    _last_id_ms = now_ms
+    return (now_ms << 22) | _id_seq
+
+def add_reminder(data, user_id, guild_id, message, time: datetime, delivery=None, target_mention=None, channel_id=None, plan=None, recurrence=None):
     reminder = {
+        "id": new_reminder_id(),
         "user_id": user_id,
         "guild_id": guild_id,
         "message": message,
-        "time": time.isoformat(),
+        "time": time.isoformat(),  # display only; scheduling uses due_ts
+        "due_ts": time.timestamp(),
         "delivery": delivery,
         "target_mention": target_mention,
         "channel_id": channel_id
     }
+    if plan:
+        reminder["plan"] = plan  # pre-resolved destination and content (see util_delivery.build_plan)
+    if recurrence:
+        reminder["recurrence"] = recurrence  # one stored rule per series (see util_recurrence)
     data.setdefault("reminders", []).append(reminder)
-    save_data(data)
+    _persist(data, {"op": "add_reminder", "reminder": reminder})
     log_action(f"[GUILD {guild_id}] User {user_id} added reminder: '{message}' for {reminder['time']}")
     return reminder
 
-def remove_reminder(data, reminder):
-    if reminder in data.get("reminders", []):
-        data["reminders"].remove(reminder)
-        save_data(data)
-        log_action(f"[GUILD {reminder['guild_id']}] Removed reminder for user {reminder['user_id']}: '{reminder['message']}'")
+def remove_reminders(data, predicate):
+    """Remove every reminder matching `predicate` in one pass with a single persist. Returns the removed reminders."""
+    reminders = data.get("reminders", [])
+    kept, removed = [], []
+    for r in reminders:
+        (removed if predicate(r) else kept).append(r)
+    if removed:
+        reminders[:] = kept
+        _persist(data, *({"op": "remove_reminder", "reminder": r} for r in removed))
+        log_action(f"Removed {len(removed)} reminders in bulk")
+    return removed
 
 def get_all_reminders(data, guild_id):
     return [r for r in data.get("reminders", []) if r["guild_id"] == guild_id]
@@ -78,19 +222,40 @@ def get_user_reminders(data, guild_id, user_id=None):
         return [r for r in data.get("reminders", []) if r["guild_id"] == guild_id and r["user_id"] == user_id]
     return [r for r in data.get("reminders", []) if r["guild_id"] == guild_id]
 
-def get_due_reminders(data):
-    now = datetime.now(TIMEZONE)
-    due = []
+def reminder_due_ts(reminder):
+    """UTC epoch seconds a reminder is due at, or None if its time can't be parsed."""
+    if reminder.get("due_ts") is not None:
+        return reminder["due_ts"]
+    # Legacy reminder from before due_ts existed: fall back to the ISO string
+    try:
+        r_time = datetime.fromisoformat(reminder["time"])
+        if r_time.tzinfo is None:
+            r_time = TIMEZONE.localize(r_time)
+        return r_time.timestamp()
+    except Exception as e:
+        log_action(f"[ERROR] Failed to parse reminder time: {reminder['time']} ({e})")
+        return None
+
+def migrate_reminder_ids(data):
+    """Give an ID to reminders stored before IDs existed. Returns how many were updated."""
+    migrated = 0
     for r in data.get("reminders", []):
-        try:
-            r_time = datetime.fromisoformat(r["time"])
-            if r_time.tzinfo is None:
-                r_time = TIMEZONE.localize(r_time)
-            if r_time <= now:
-                due.append(r)
-        except Exception as e:
-            log_action(f"[ERROR] Failed to parse reminder time: {r['time']} ({e})")
-    return due
+        if r.get("id") is None:
+            r["id"] = new_reminder_id()
+            migrated += 1
+    return migrated
+
+def migrate_reminder_times(data):
+    """Fill in due_ts for reminders stored before it existed. Returns how many were updated."""
+    migrated = 0
+    for r in data.get("reminders", []):
+        if "due_ts" in r:
+            continue
+        due_ts = reminder_due_ts(r)
+        if due_ts is not None:
+            r["due_ts"] = due_ts
+            migrated += 1
+    return migrated
 
 # ------------------- Guild Defaults -------------------
 def get_guild_default_delivery(data, guild_id):
@@ -100,7 +265,7 @@ def get_guild_default_delivery(data, guild_id):
 def set_guild_default_delivery(data, guild_id, delivery):
     guild = data.setdefault("guilds", {}).setdefault(str(guild_id), {})
     guild["default_delivery"] = delivery
-    save_data(data)
+    _persist(data, {"op": "set_guild_field", "guild_id": str(guild_id), "key": "default_delivery", "value": delivery})
     log_action(f"[GUILD {guild_id}] Default delivery set to {delivery}")
 
 # ------------------- Admin / User Manager -------------------
@@ -110,7 +275,7 @@ def add_admin(data, guild_id: int, user_or_role_id: int, is_role=False):
     items = guild.setdefault(key, [])
     if str(user_or_role_id) not in items:
         items.append(str(user_or_role_id))
-        save_data(data)
+        _persist(data, {"op": "add_guild_item", "guild_id": str(guild_id), "key": key, "value": str(user_or_role_id)})
         log_action(f"[GUILD {guild_id}] Added {'role' if is_role else 'user'} {user_or_role_id} as Admin")
 
 def remove_admin(data, guild_id: int, user_or_role_id: int, is_role=False):
@@ -119,7 +284,7 @@ def remove_admin(data, guild_id: int, user_or_role_id: int, is_role=False):
     items = guild.setdefault(key, [])
     if str(user_or_role_id) in items:
         items.remove(str(user_or_role_id))
-        save_data(data)
+        _persist(data, {"op": "remove_guild_item", "guild_id": str(guild_id), "key": key, "value": str(user_or_role_id)})
         log_action(f"[GUILD {guild_id}] Removed {'role' if is_role else 'user'} {user_or_role_id} from Admins")
 
 def add_user_manager(data, guild_id: int, user_or_role_id: int, is_role=False):
@@ -128,7 +293,7 @@ def add_user_manager(data, guild_id: int, user_or_role_id: int, is_role=False):
     items = guild.setdefault(key, [])
     if str(user_or_role_id) not in items:
         items.append(str(user_or_role_id))
-        save_data(data)
+        _persist(data, {"op": "add_guild_item", "guild_id": str(guild_id), "key": key, "value": str(user_or_role_id)})
         log_action(f"[GUILD {guild_id}] Added {'role' if is_role else 'user'} {user_or_role_id} as User Manager")
 
 def remove_user_manager(data, guild_id: int, user_or_role_id: int, is_role=False):
@@ -137,7 +302,7 @@ def remove_user_manager(data, guild_id: int, user_or_role_id: int, is_role=False
     items = guild.setdefault(key, [])
     if str(user_or_role_id) in items:
         items.remove(str(user_or_role_id))
-        save_data(data)
+        _persist(data, {"op": "remove_guild_item", "guild_id": str(guild_id), "key": key, "value": str(user_or_role_id)})
         log_action(f"[GUILD {guild_id}] Removed {'role' if is_role else 'user'} {user_or_role_id} from User Managers")
 
 def is_reminder_admin(data, guild_id, user):
@@ -166,7 +331,7 @@ def add_update_channel(data, guild_id, channel_id):
     channels = guild.setdefault("update_channels", [])
     if str(channel_id) not in channels:
         channels.append(str(channel_id))
-        save_data(data)
+        _persist(data, {"op": "add_guild_item", "guild_id": str(guild_id), "key": "update_channels", "value": str(channel_id)})
         log_action(f"[GUILD {guild_id}] Added update channel {channel_id}")
 
 def remove_update_channel(data, guild_id, channel_id):
@@ -174,7 +339,7 @@ def remove_update_channel(data, guild_id, channel_id):
     channels = guild.setdefault("update_channels", [])
     if str(channel_id) in channels:
         channels.remove(str(channel_id))
-        save_data(data)
+        _persist(data, {"op": "remove_guild_item", "guild_id": str(guild_id), "key": "update_channels", "value": str(channel_id)})
         log_action(f"[GUILD {guild_id}] Removed update channel {channel_id}")
 
 def get_all_update_channels(data):
@@ -183,3 +348,206 @@ def get_all_update_channels(data):
         for ch in gdata.get("update_channels", []):
             channels.append((gid, ch))
     return channels
+
+# ------------------- Forum Threads -------------------
+# Threads reused for forum-mode reminders, per guild: "<forum_id>:<reuse key>" -> thread_id
+MAX_FORUM_THREADS = 100
+
+def get_forum_thread(data, guild_id, forum_id, key):
+    guild = data.get("guilds", {}).get(str(guild_id), {})
+    threads = guild.get("forum_threads", {})
+    thread_id = threads.get(f"{forum_id}:{key}")
+    if thread_id is not None and next(reversed(threads)) != f"{forum_id}:{key}":
+        # Mark it most recently used so the cap prunes threads nobody posts to anymore
+        set_forum_thread(data, guild_id, forum_id, key, thread_id)
+    return thread_id
+
+def set_forum_thread(data, guild_id, forum_id, key, thread_id):
+    """Remember (or forget, with thread_id=None) the thread used for forum_id + key."""
+    guild = data.setdefault("guilds", {}).setdefault(str(guild_id), {})
+    threads = dict(guild.get("forum_threads", {}))
+    threads.pop(f"{forum_id}:{key}", None)
+    if thread_id is not None:
+        # Kept in least- to most-recently-used order; the least recently used fall off first
+        threads[f"{forum_id}:{key}"] = thread_id
+        for old_key in list(threads)[:-MAX_FORUM_THREADS]:
+            del threads[old_key]
+    guild["forum_threads"] = threads
+    _persist(data, {"op": "set_guild_field", "guild_id": str(guild_id), "key": "forum_threads", "value": threads})
+
+# ------------------- Reminder Store -------------------
+class ReminderStore:
+    """
+    The single in-memory copy of reminders and guild settings for the process.
+    Created once in bot.py and handed to every cog; all reads and writes go through it.
+    """
+
+    def __init__(self, data=None):
+        self.data = data if data is not None else load_data()
+        self.scheduler = ReminderScheduler()
+        self._by_id = {}  # reminder id -> reminder
+        self._pos = {}  # reminder id -> index in self.reminders
+        self._in_flight = set()  # ids popped for delivery and not finished yet
+        self._reindex()
+        for r in self.reminders:
+            self._schedule(r)
+
+    def _reindex(self):
+        self._by_id = {r["id"]: r for r in self.reminders}
+        self._pos = {r["id"]: i for i, r in enumerate(self.reminders)}
+
+    def _unlink(self, reminder):
+        """Swap-remove a reminder from the list in O(1); list order carries no meaning."""
+        reminders = self.reminders
+        pos = self._pos.pop(reminder["id"])
+        last = reminders.pop()
+        if last is not reminder:
+            reminders[pos] = last
+            self._pos[last["id"]] = pos
+
+    def _schedule(self, reminder):
+        due_ts = reminder_due_ts(reminder)
+        if due_ts is not None:
+            self.scheduler.push(reminder, due_ts)
+
+    @property
+    def reminders(self):
+        return self.data.setdefault("reminders", [])
+
+    @property
+    def guilds(self):
+        return self.data.setdefault("guilds", {})
+
+    def get_guild(self, guild_id):
+        return self.guilds.get(str(guild_id), {})
+
+    def save(self):
+        save_data(self.data)
+
+    def flush(self):
+        flush()
+
+    # --- Reminders ---
+    def add_reminder(self, user_id, guild_id, message, time: datetime, delivery=None, target_mention=None, channel_id=None, plan=None, recurrence=None):
+        reminder = add_reminder(self.data, user_id, guild_id, message, time, delivery, target_mention, channel_id, plan, recurrence)
+        self._by_id[reminder["id"]] = reminder
+        self._pos[reminder["id"]] = len(self.reminders) - 1
+        self._schedule(reminder)
+        return reminder
+
+    def get_reminder(self, reminder_id):
+        return self._by_id.get(reminder_id)
+
+    def remove_reminder(self, reminder):
+        reminder = self._by_id.pop(reminder["id"], None)
+        if reminder is None:
+            return
+        self._unlink(reminder)
+        self.scheduler.discard(reminder)
+        self._in_flight.discard(reminder["id"])
+        _persist(self.data, {"op": "remove_reminder", "reminder": reminder})
+        log_action(f"[GUILD {reminder['guild_id']}] Removed reminder for user {reminder['user_id']}: '{reminder['message']}'")
+
+    def remove_reminders(self, predicate):
+        removed = remove_reminders(self.data, predicate)
+        if removed:
+            self._reindex()
+            for r in removed:
+                self.scheduler.discard(r)
+                self._in_flight.discard(r["id"])
+        return removed
+
+    def update_reminder(self, reminder_id, time: datetime = None, **changes):
+        """Edit a reminder in place; a new `time` also reschedules it. Returns the reminder or None."""
+        reminder = self._by_id.get(reminder_id)
+        if reminder is None:
+            return None
+        if time is not None:
+            reminder["time"] = time.isoformat()
+            reminder["due_ts"] = time.timestamp()
+        reminder.update(changes)
+        self._schedule(reminder)
+        _persist(self.data, {"op": "update_reminder", "reminder": reminder})
+        log_action(f"[GUILD {reminder['guild_id']}] Updated reminder {reminder_id}: '{reminder['message']}' for {reminder['time']}")
+        return reminder
+
+    def advance_recurring(self, reminder):
+        """Move a recurring reminder to its next occurrence in place (same record and ID)."""
+        self._in_flight.discard(reminder["id"])
+        previous = datetime.fromtimestamp(reminder_due_ts(reminder) or datetime.now(TIMEZONE).timestamp(), TIMEZONE)
+        try:
+            upcoming = next_occurrence(reminder["recurrence"], previous, datetime.now(TIMEZONE), TIMEZONE)
+        except ValueError as e:
+            log_action(f"[ERROR] Recurring reminder {reminder['id']} has no next occurrence ({e}); removing it")
+            self.remove_reminder(reminder)
+            return None
+        return self.update_reminder(reminder["id"], time=upcoming)
+
+    def finish_reminder(self, reminder):
+        """Called once a reminder has fired: recurring ones move on, one-shots are removed."""
+        if reminder.get("recurrence"):
+            return self.advance_recurring(reminder)
+        self.remove_reminder(reminder)
+        return None
+
+    def get_all_reminders(self, guild_id):
+        return get_all_reminders(self.data, guild_id)
+
+    def get_user_reminders(self, guild_id, user_id=None):
+        return get_user_reminders(self.data, guild_id, user_id)
+
+    def pop_due_reminders(self):
+        """
+        Take every reminder that is due off the schedule. They stay stored, and count
+        as in flight, until finish_reminder (or a removal) is called for them.
+        """
+        due = self.scheduler.pop_due()
+        self._in_flight.update(r["id"] for r in due)
+        return due
+
+    def is_in_flight(self, reminder_id):
+        """True from the moment a reminder is popped for delivery until it is finished."""
+        return reminder_id in self._in_flight
+
+    # --- Guild Defaults ---
+    def get_guild_default_delivery(self, guild_id):
+        return get_guild_default_delivery(self.data, guild_id)
+
+    def set_guild_default_delivery(self, guild_id, delivery):
+        set_guild_default_delivery(self.data, guild_id, delivery)
+
+    # --- Admin / User Manager ---
+    def add_admin(self, guild_id, user_or_role_id, is_role=False):
+        add_admin(self.data, guild_id, user_or_role_id, is_role)
+
+    def remove_admin(self, guild_id, user_or_role_id, is_role=False):
+        remove_admin(self.data, guild_id, user_or_role_id, is_role)
+
+    def add_user_manager(self, guild_id, user_or_role_id, is_role=False):
+        add_user_manager(self.data, guild_id, user_or_role_id, is_role)
+
+    def remove_user_manager(self, guild_id, user_or_role_id, is_role=False):
+        remove_user_manager(self.data, guild_id, user_or_role_id, is_role)
+
+    def is_reminder_admin(self, guild_id, user):
+        return is_reminder_admin(self.data, guild_id, user)
+
+    def is_user_manager(self, guild_id, user):
+        return is_user_manager(self.data, guild_id, user)
+
+    # --- Update Channels ---
+    def add_update_channel(self, guild_id, channel_id):
+        add_update_channel(self.data, guild_id, channel_id)
+
+    def remove_update_channel(self, guild_id, channel_id):
+        remove_update_channel(self.data, guild_id, channel_id)
+
+    def get_all_update_channels(self):
+        return get_all_update_channels(self.data)
+
+    # --- Forum Threads ---
+    def get_forum_thread(self, guild_id, forum_id, key):
+        return get_forum_thread(self.data, guild_id, forum_id, key)
+
+    def set_forum_thread(self, guild_id, forum_id, key, thread_id):
+        set_forum_thread(self.data, guild_id, forum_id, key, thread_id)
@@ -0,0 +1,19 @@
+import json
+import os
+import sys
+
+import pytest
+
+# Tests import modules the same way bot.py does (from the repo root)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def storage_module(tmp_path, monkeypatch):
+    """storage.py working in an empty temp directory with the JSON engine."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "settings.json").write_text(json.dumps({"storage_engine": "json"}))
+    import storage
+    monkeypatch.setattr(storage, "_engine", None)
+    yield storage
+    storage.close_storage()
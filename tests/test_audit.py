@@ -0,0 +1,69 @@
+import asyncio
+
+from utility.util_audit import AuditSink
+
+
+class FakeChannel:
+    id = 99
+
+    def __init__(self):
+        self.embeds = []
+
+    async def send(self, embed=None):
+        self.embeds.append(embed)
+
+
+def test_flush_posts_batches_of_batch_size():
+    channel = FakeChannel()
+    sink = AuditSink(lambda: channel, batch_size=3)
+    for i in range(7):
+        sink.push(i != 6, f"/backend cmd{i}", "user", "guild", None if i != 6 else "not allowed")
+    asyncio.run(sink.flush())
+
+    assert [len(e.fields) for e in channel.embeds] == [3, 3, 1]
+    assert channel.embeds[0].title == "🛡️ Backend Access (3 granted, 0 denied)"
+    assert channel.embeds[2].title == "🛡️ Backend Access (0 granted, 1 denied)"
+    assert "Reason: not allowed" in channel.embeds[2].fields[0].value
+
+
+def test_full_queue_drops_oldest_and_reports_it():
+    channel = FakeChannel()
+    sink = AuditSink(lambda: channel, batch_size=10, max_pending=3)
+    for i in range(5):
+        sink.push(True, f"cmd{i}", "user", "guild")
+    asyncio.run(sink.flush())
+
+    (embed,) = channel.embeds
+    assert [f.name for f in embed.fields] == ["✅ cmd2", "✅ cmd3", "✅ cmd4"]
+    assert embed.footer.text == "2 events dropped (queue full)"
+    assert sink.dropped == 0
+
+
+def test_no_channel_discards_queue():
+    sink = AuditSink(lambda: None)
+    sink.push(True, "cmd", "user", "guild")
+    asyncio.run(sink.flush())
+    assert not sink._pending
+
+
+def test_background_task_flushes_when_batch_is_full():
+    channel = FakeChannel()
+    throttled = []
+
+    async def throttle(channel_id):
+        throttled.append(channel_id)
+
+    async def run():
+        sink = AuditSink(lambda: channel, interval=60, batch_size=2, throttle=throttle)
+        sink.start()
+        sink.push(True, "a", "user", "guild")
+        sink.push(True, "b", "user", "guild")
+        await asyncio.sleep(0.05)
+        posted = len(channel.embeds)
+        sink.push(True, "c", "user", "guild")
+        await sink.stop()
+        return posted
+
+    assert asyncio.run(run()) == 1
+    assert len(channel.embeds) == 2
+    assert throttled == [99, 99]
@@ -0,0 +1,85 @@
+import asyncio
+import os
+
+from utility import util_broadcast
+from utility.util_broadcast import Broadcast
+
+
+def test_run_records_outcomes_and_removes_checkpoint(tmp_path):
+    path = str(tmp_path / "broadcast.json")
+
+    async def send(target):
+        if target == "3":
+            raise RuntimeError("boom")
+        return "dmed" if target == "2" else "sent"
+
+    job = Broadcast(path, "hello", "owner")
+    counts = asyncio.run(job.run(["1", "2", "3", "4"], send))
+
+    assert counts == {"sent": 2, "dmed": 1, "failed": 1}
+    assert job.done == {"1": "sent", "2": "dmed", "3": "failed", "4": "sent"}
+    assert not os.path.exists(path)
+
+
+def test_interrupted_run_resumes_without_resending(tmp_path, monkeypatch):
+    monkeypatch.setattr(util_broadcast, "SAVE_EVERY", 1)
+    path = str(tmp_path / "broadcast.json")
+    sent = []
+
+    async def send_then_hang(target):
+        if target == "3":
+            await asyncio.Event().wait()  # the bot restarts here
+        sent.append(target)
+        return "sent"
+
+    async def interrupted():
+        job = Broadcast(path, "hello", "owner")
+        task = asyncio.create_task(job.run(["1", "2", "3", "4"], send_then_hang, concurrency=1))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(interrupted())
+    job = Broadcast.load(path)
+    assert (job.message, job.author) == ("hello", "owner")
+    assert job.done == {"1": "sent", "2": "sent"}
+
+    async def send(target):
+        sent.append(target)
+        return "sent"
+
+    counts = asyncio.run(job.run(["1", "2", "3", "4"], send))
+    assert sent == ["1", "2", "3", "4"]
+    assert counts["sent"] == 4
+    assert Broadcast.load(path) is None
+
+
+def test_run_respects_concurrency(tmp_path):
+    running = []
+    peak = []
+
+    async def send(target):
+        running.append(target)
+        peak.append(len(running))
+        await asyncio.sleep(0.02)
+        running.remove(target)
+        return "sent"
+
+    job = Broadcast(str(tmp_path / "broadcast.json"), "hello", "owner")
+    asyncio.run(job.run([str(i) for i in range(10)], send, concurrency=3))
+    assert max(peak) == 3
+
+
+def test_progress_is_reported_while_running(tmp_path):
+    reports = []
+
+    async def send(target):
+        await asyncio.sleep(0.03)
+        return "sent"
+
+    async def on_progress(job):
+        reports.append(len(job.done))
+
+    job = Broadcast(str(tmp_path / "broadcast.json"), "hello", "owner")
+    asyncio.run(job.run([str(i) for i in range(5)], send, concurrency=1, on_progress=on_progress, progress_interval=0.04))
+    assert reports and reports == sorted(reports)
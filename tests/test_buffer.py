@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from utility.util_buffer import DROP_NEWEST, DROP_OLDEST, BufferedSink
+
+
+def make_sink(**kwargs):
+    writes = []
+
+    async def write(batch, dropped):
+        writes.append((batch, dropped))
+
+    return BufferedSink(write, **kwargs), writes
+
+
+def test_drop_oldest_keeps_the_latest_items():
+    sink, writes = make_sink(max_pending=3, drop=DROP_OLDEST)
+    assert all(sink.push(i) for i in range(5))
+    asyncio.run(sink.flush())
+    assert writes == [([2, 3, 4], 2)]
+
+
+def test_drop_newest_refuses_new_items():
+    sink, writes = make_sink(max_pending=3, drop=DROP_NEWEST)
+    assert [sink.push(i) for i in range(5)] == [True, True, True, False, False]
+    assert sink.pending == 3
+    asyncio.run(sink.flush())
+    assert writes == [([0, 1, 2], 2)]
+
+
+def test_flush_splits_into_batches_and_reports_drops_once():
+    sink, writes = make_sink(batch_size=2, max_pending=5)
+    for i in range(6):
+        sink.push(i)
+    asyncio.run(sink.flush())
+    assert writes == [([1, 2], 1), ([3, 4], 0), ([5], 0)]
+
+    asyncio.run(sink.flush())
+    assert len(writes) == 3
+
+
+def test_unknown_drop_policy():
+    with pytest.raises(ValueError):
+        make_sink(drop="random")
+
+
+def test_background_task_writes_once_a_batch_is_waiting():
+    sink, writes = make_sink(interval=60, batch_size=2)
+
+    async def run():
+        sink.start()
+        sink.push("a")
+        await asyncio.sleep(0.02)
+        assert writes == []
+        sink.push("b")
+        await asyncio.sleep(0.02)
+        assert writes == [(["a", "b"], 0)]
+        sink.push("c")
+        await sink.stop()  # drains what is left
+
+    asyncio.run(run())
+    assert writes == [(["a", "b"], 0), (["c"], 0)]
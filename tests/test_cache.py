@@ -0,0 +1,37 @@
+from utility import util_cache
+from utility.util_cache import LRUCache
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now the oldest
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert len(cache) == 2
+
+
+def test_expired_entries_miss_and_are_dropped(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(util_cache.time, "monotonic", lambda: now[0])
+    cache = LRUCache(ttl=60)
+    cache.set("a", 1)
+
+    now[0] += 59
+    assert cache.get("a") == 1
+    now[0] += 2
+    assert cache.get("a", "gone") == "gone"
+    assert len(cache) == 0
+
+
+def test_pop_and_stats():
+    cache = LRUCache()
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.pop("a") == 1
+    assert cache.get("a") is None
+    assert cache.pop("a", "missing") == "missing"
+    assert cache.stats() == "1 hits / 1 misses (50%)"
@@ -0,0 +1,98 @@
+import asyncio
+from types import SimpleNamespace
+
+import discord
+
+from utility.util_campaign import DMCampaign
+
+
+class FakeUser:
+    def __init__(self, user_id, fail=None):
+        self.id = user_id
+        self.fail = fail
+        self.inbox = []
+
+    async def send(self, content):
+        if self.fail:
+            raise self.fail
+        self.inbox.append(content)
+
+
+def guild(guild_id):
+    return SimpleNamespace(id=guild_id, name=f"g{guild_id}")
+
+
+def render(user, g):
+    return f"hi from {g.name}"
+
+
+def test_user_in_several_guilds_is_messaged_once(tmp_path):
+    alice, bob = FakeUser(1), FakeUser(2)
+    campaign = DMCampaign("invite", str(tmp_path / "campaigns.json"))
+    campaign.add(guild(10), alice)
+    campaign.add(guild(10), bob)
+    campaign.add(guild(20), alice)
+    assert len(campaign) == 2
+
+    report = asyncio.run(campaign.run(render))
+    assert alice.inbox == ["hi from g10"] and bob.inbox == ["hi from g10"]
+    assert report[10]["sent"] == 2
+    assert report[20]["duplicate"] == 1
+    assert campaign.totals() == {"sent": 2, "duplicate": 1}
+
+
+def test_rerun_skips_users_already_messaged(tmp_path):
+    path = str(tmp_path / "campaigns.json")
+    alice, blocked = FakeUser(1), FakeUser(2, fail=discord.Forbidden(SimpleNamespace(status=403, reason="Forbidden"), "no"))
+    first = DMCampaign("invite", path)
+    first.add(guild(10), alice)
+    first.add(guild(10), blocked)
+    asyncio.run(first.run(render))
+    assert first.report[10] == {"sent": 1, "failed": 1}
+
+    # Failed users are retried on the next run; the other campaign name is independent
+    blocked.fail = None
+    second = DMCampaign("invite", path)
+    second.add(guild(10), alice)
+    second.add(guild(10), blocked)
+    asyncio.run(second.run(render))
+    assert second.report[10] == {"skipped": 1, "sent": 1}
+    assert alice.inbox == ["hi from g10"]
+    assert DMCampaign("other", path).messaged == set()
+
+    second.reset()
+    assert DMCampaign("invite", path).messaged == set()
+
+
+def test_sends_wait_on_the_throttle(tmp_path):
+    throttled = []
+
+    async def throttle():
+        throttled.append(True)
+
+    campaign = DMCampaign("invite", path=None, concurrency=2, throttle=throttle)
+    for uid in range(5):
+        campaign.add(guild(10), FakeUser(uid))
+    asyncio.run(campaign.run(render))
+    assert len(throttled) == 5
+    assert campaign.report_lines() == ["**g10**: 5 sent"]
+
+
+def test_progress_is_reported_while_running(tmp_path):
+    seen = []
+
+    async def throttle():
+        await asyncio.sleep(0.02)
+
+    async def on_progress(campaign):
+        seen.append((sum(campaign.totals().values()), campaign.total))
+
+    campaign = DMCampaign("invite", path=None, concurrency=1, throttle=throttle)
+    for uid in range(5):
+        campaign.add(guild(10), FakeUser(uid))
+    campaign.add(guild(20), FakeUser(0))  # duplicate, not counted in total
+    assert campaign.total == 5
+
+    asyncio.run(campaign.run(render, on_progress=on_progress, progress_interval=0.03))
+    assert seen and all(total == 5 for _, total in seen)
+    assert [done for done, _ in seen] == sorted(done for done, _ in seen)
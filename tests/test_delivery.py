@@ -0,0 +1,174 @@
+import asyncio
+from types import SimpleNamespace
+
+import discord
+import pytest
+
+from utility.util_delivery import (
+    DeliveryPipeline, DeliveryPlanError, build_plan, coalesce, delivery_key, plan_for, render_batch
+)
+
+
+def reminder(reminder_id, user_id=1, channel_id=None, delivery="dm"):
+    return {"id": reminder_id, "user_id": user_id, "channel_id": channel_id, "delivery": delivery, "message": f"m{reminder_id}"}
+
+
+async def drain(pipeline, count):
+    while pipeline.delivered + pipeline.failed < count:
+        await asyncio.sleep(0.01)
+    await pipeline.stop()
+
+
+def test_delivery_key_prefers_channel():
+    assert delivery_key(reminder(1, channel_id=5, delivery="channel")) == ("channel", 5)
+    assert delivery_key(reminder(1, channel_id=5, delivery="dm")) == ("user", 1)
+
+
+def test_coalesce_groups_by_target_in_due_order():
+    a1, a2 = reminder(1, user_id=1), reminder(2, user_id=1)
+    b = reminder(3, user_id=2)
+    channel = reminder(4, user_id=1, channel_id=9, delivery="channel")
+    pinged = dict(reminder(5, user_id=2, channel_id=9, delivery="channel"), target_mention="<@7>")
+    channel_other_author = reminder(6, user_id=3, channel_id=9, delivery="channel")
+
+    groups = coalesce([a1, b, channel, a2, pinged, channel_other_author])
+    assert groups == [[a1, a2], [b], [channel, channel_other_author], [pinged]]
+
+
+def test_render_batch_single_and_bullets():
+    assert render_batch("⏰ Reminder:", "⏰ Reminders:", ["tea"]) == ["⏰ Reminder: tea"]
+    assert render_batch("⏰ Reminder:", "⏰ Reminders:", ["tea", "cake"]) == ["⏰ Reminders:\n• tea\n• cake"]
+
+
+def test_render_batch_splits_at_the_limit():
+    messages = ["x" * 40 for _ in range(5)]
+    chunks = render_batch("One:", "Many:", messages, limit=100)
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert all(chunk.startswith("Many:") for chunk in chunks)
+    assert sum(chunk.count("• ") for chunk in chunks) == 5
+    assert len(chunks) == 3
+
+
+def fake_channel(cls=discord.TextChannel, **perms):
+    """Stand-in for a discord channel: passes isinstance checks, with the given bot permissions."""
+    channel = type(f"Fake{cls.__name__}", (cls,), {"__init__": lambda self: None, "mention": "<#42>"})()
+    channel.id = 42
+    channel.guild = SimpleNamespace(me=object())
+    channel.permissions_for = lambda member: SimpleNamespace(**perms)
+    return channel
+
+
+def test_build_plan_renders_content_up_front():
+    plan = build_plan("both", fake_channel(send_messages=True), "stand up", "<@7>")
+    assert plan == {
+        "kind": "both",
+        "channel_id": 42,
+        "dm": "⏰ Reminder: stand up",
+        "post": "⏰ Reminder for <@7>: stand up",
+    }
+    assert build_plan("dm", None, "tea", "<@7>") == {"kind": "dm", "channel_id": None, "dm": "⏰ Reminder: tea", "post": None}
+
+
+def test_build_plan_forum_inside_a_post_becomes_thread():
+    thread = fake_channel(discord.Thread, send_messages_in_threads=True)
+    plan = build_plan("forum", thread, "ship it", "<@7>")
+    assert plan["kind"] == "thread"
+    assert plan["post"] == "<@7> ⏰ Reminder: ship it"
+
+
+@pytest.mark.parametrize("delivery, channel", [
+    ("channel", None),
+    ("forum", fake_channel(send_messages=True)),
+    ("channel", fake_channel(send_messages=False)),
+    ("forum", fake_channel(discord.ForumChannel, create_public_threads=False, send_messages=True)),
+])
+def test_build_plan_rejects_undeliverable(delivery, channel):
+    with pytest.raises(DeliveryPlanError):
+        build_plan(delivery, channel, "nope", "<@7>")
+
+
+def test_plan_for_legacy_reminder():
+    legacy = dict(reminder(1, channel_id=9, delivery="channel"), target_mention=None)
+    assert plan_for(legacy)["post"] == "⏰ Reminder for <@1>: m1"
+    stored = {"kind": "dm", "channel_id": None, "dm": "stored", "post": None}
+    assert plan_for(dict(legacy, plan=stored)) is stored
+
+
+def test_same_key_is_delivered_in_fifo_order():
+    order = []
+
+    async def deliver(group, missed):
+        (r,) = group
+        # Later reminders finish faster; FIFO must still hold within a key
+        await asyncio.sleep(0.05 if r["id"] % 2 else 0.01)
+        order.append(r["id"])
+
+    async def run():
+        pipeline = DeliveryPipeline(deliver, workers=4)
+        pipeline.start()
+        for i in range(6):
+            pipeline.submit([reminder(i, channel_id=9, delivery="channel")])
+        await drain(pipeline, 6)
+        return pipeline
+
+    pipeline = asyncio.run(run())
+    assert order == list(range(6))
+    assert pipeline.delivered == 6
+
+
+def test_different_keys_are_delivered_concurrently():
+    running = []
+    peak = []
+
+    async def deliver(group, missed):
+        (r,) = group
+        running.append(r["id"])
+        peak.append(len(running))
+        await asyncio.sleep(0.05)
+        running.remove(r["id"])
+
+    async def run():
+        pipeline = DeliveryPipeline(deliver, workers=3)
+        pipeline.start()
+        for i in range(6):
+            pipeline.submit([reminder(i, user_id=i)])
+        await drain(pipeline, 6)
+
+    asyncio.run(run())
+    assert max(peak) == 3
+
+
+def test_failure_is_counted_and_the_key_keeps_going():
+    seen = []
+
+    async def deliver(group, missed):
+        (r,) = group
+        seen.append((r["id"], missed))
+        if r["id"] == 1:
+            raise RuntimeError("boom")
+
+    async def run():
+        pipeline = DeliveryPipeline(deliver, workers=2)
+        pipeline.start()
+        pipeline.submit([reminder(1)], missed=True)
+        pipeline.submit([reminder(2)])
+        await drain(pipeline, 2)
+        return pipeline
+
+    pipeline = asyncio.run(run())
+    assert seen == [(1, True), (2, False)]
+    assert (pipeline.delivered, pipeline.failed) == (1, 1)
+
+
+def test_group_counts_every_reminder():
+    async def deliver(group, missed):
+        pass
+
+    async def run():
+        pipeline = DeliveryPipeline(deliver)
+        pipeline.start()
+        pipeline.submit([reminder(1), reminder(2), reminder(3)])
+        await drain(pipeline, 3)
+        return pipeline
+
+    assert asyncio.run(run()).delivered == 3
@@ -0,0 +1,122 @@
+import json
+import os
+
+from utility.util_storage_journal import JournalEngine, apply_op, read_snapshot, replay_journal
+
+
+def reminder(reminder_id, message="hello"):
+    return {"id": reminder_id, "guild_id": 1, "user_id": 2, "message": message, "time": "2030-01-01T09:00:00+01:00"}
+
+
+def add(reminder_id, message="hello"):
+    return {"op": "add_reminder", "reminder": reminder(reminder_id, message)}
+
+
+def remove(reminder_id):
+    return {"op": "remove_reminder", "reminder": reminder(reminder_id)}
+
+
+def ids(data):
+    return sorted(r["id"] for r in data["reminders"])
+
+
+def test_replay_applies_ops_after_restart(tmp_path):
+    path = str(tmp_path / "data.json")
+    engine = JournalEngine(path)
+    engine.load()
+    engine.write({}, [add(1), add(2), add(3)])
+    engine.write({}, [remove(2), {"op": "update_reminder", "reminder": reminder(3, "edited")}])
+    engine.write({}, [{"op": "add_guild_item", "guild_id": "1", "key": "admins", "value": "10"}])
+    engine.close()
+
+    data = JournalEngine(path).load()
+    assert ids(data) == [1, 3]
+    assert [r["message"] for r in data["reminders"] if r["id"] == 3] == ["edited"]
+    assert data["guilds"]["1"]["admins"] == ["10"]
+
+
+def test_replay_skips_ops_already_in_snapshot(tmp_path):
+    path = str(tmp_path / "data.json")
+    engine = JournalEngine(path)
+    engine.load()
+    engine.write({}, [add(1)])
+    data = engine.load()
+    engine.save(data)
+    engine.write({}, [add(2)])
+    engine.close()
+
+    snapshot, seq = read_snapshot(path)
+    assert ids(snapshot) == [1]
+    assert seq == 1
+    assert ids(JournalEngine(path).load()) == [1, 2]
+
+
+def test_replay_tolerates_torn_last_line(tmp_path):
+    path = str(tmp_path / "data.json")
+    engine = JournalEngine(path)
+    engine.load()
+    engine.write({}, [add(1), add(2)])
+    engine.close()
+    with open(f"{path}.journal", "a") as f:
+        f.write('{"seq": 3, "op": "add_rem')
+
+    assert ids(JournalEngine(path).load()) == [1, 2]
+
+
+def test_replay_removes_many_reminders_by_id(tmp_path):
+    journal = tmp_path / "ops.journal"
+    removed = set(range(0, 1000, 3))
+    with open(journal, "w") as f:
+        for seq, reminder_id in enumerate(sorted(removed), start=1):
+            f.write(json.dumps({"seq": seq, **remove(reminder_id)}) + "\n")
+    data = {"reminders": [reminder(i) for i in range(1000)]}
+
+    assert replay_journal(str(journal), data, 0) == len(removed)
+    assert ids(data) == sorted(set(range(1000)) - removed)
+
+
+def test_apply_op_matches_legacy_reminders_without_id():
+    legacy = {"guild_id": 1, "user_id": 2, "message": "old", "time": "2024-01-01T09:00:00"}
+    data = {"reminders": [reminder(1), dict(legacy)]}
+    apply_op(data, {"op": "remove_reminder", "reminder": legacy})
+    assert data["reminders"] == [reminder(1)]
+
+
+def test_compaction_folds_journal_into_snapshot(tmp_path):
+    path = str(tmp_path / "data.json")
+    engine = JournalEngine(path, max_ops=3)
+    engine.load()
+    engine.write({}, [add(1), add(2)])
+    engine.write({}, [remove(1)])  # crosses max_ops
+    engine._wait_for_compaction()
+
+    snapshot, seq = read_snapshot(path)
+    assert ids(snapshot) == [2]
+    assert seq == 3
+    assert not os.path.exists(engine.compacting_path)
+
+    engine.write({}, [add(4)])
+    engine.close()
+    assert ids(JournalEngine(path).load()) == [2, 4]
+
+
+def test_leftover_compacting_journal_is_folded_first(tmp_path):
+    path = str(tmp_path / "data.json")
+    engine = JournalEngine(path, max_ops=2)
+    engine.load()
+    engine.close()
+    # A compaction interrupted by a crash left its rotated journal behind
+    with open(f"{path}.journal.compacting", "w") as f:
+        f.write(json.dumps({"seq": 1, **add(1)}) + "\n")
+
+    engine = JournalEngine(path, max_ops=2)
+    assert ids(engine.load()) == [1]
+    engine.write({}, [add(2), add(3)])  # compacts the leftover only
+    engine._wait_for_compaction()
+    assert ids(read_snapshot(path)[0]) == [1]
+
+    engine.write({}, [add(5)])  # rotates the live journal now that the leftover is gone
+    engine._wait_for_compaction()
+    engine.close()
+    assert ids(read_snapshot(path)[0]) == [1, 2, 3, 5]
+    assert ids(JournalEngine(path).load()) == [1, 2, 3, 5]
@@ -0,0 +1,67 @@
+import asyncio
+
+import discord
+
+from utility.util_logbuffer import LogBuffer
+
+
+def make_buffer(**kwargs):
+    posts = []
+
+    async def send(content=None, embed=None):
+        posts.append(content or embed)
+
+    return LogBuffer(send, prefix="Log:", **kwargs), posts
+
+
+def test_repeats_collapse_into_one_line_with_a_count():
+    buffer, posts = make_buffer()
+    for message in ["a", "b", "a", "a"]:
+        buffer.push(message)
+    asyncio.run(buffer.flush())
+    assert posts == ["Log:\n• a ×3\n• b"]
+
+
+def test_messages_past_capacity_are_dropped_and_reported():
+    buffer, posts = make_buffer(max_entries=2)
+    for message in ["a", "b", "c", "d"]:
+        buffer.push(message)
+    asyncio.run(buffer.flush())
+    assert posts == ["Log:\n• a\n• b\n• ⚠️ 2 more messages dropped (log buffer full)"]
+
+    asyncio.run(buffer.flush())
+    assert len(posts) == 1  # nothing left to send
+
+
+def test_repeats_do_not_use_up_capacity():
+    buffer, posts = make_buffer(max_entries=2)
+    for message in ["a", "b", "a", "c", "a", "d", "b"]:
+        buffer.push(message)
+    assert buffer.pending == 2
+    asyncio.run(buffer.flush())
+    assert posts == ["Log:\n• a ×3\n• b ×2\n• ⚠️ 2 more messages dropped (log buffer full)"]
+
+    buffer.push("a")  # counted afresh once the earlier post went out
+    asyncio.run(buffer.flush())
+    assert posts[-1] == "Log: a"
+
+
+def test_embeds_are_posted_separately():
+    buffer, posts = make_buffer()
+    embed = discord.Embed(title="Restarted")
+    buffer.push("note")
+    buffer.push(embed)
+    asyncio.run(buffer.flush())
+    assert posts == ["Log: note", embed]
+
+
+def test_stop_drains_the_buffer():
+    buffer, posts = make_buffer(interval=60)
+
+    async def run():
+        buffer.start()
+        buffer.push("shutting down")
+        await buffer.stop()
+
+    asyncio.run(run())
+    assert posts == ["Log: shutting down"]
@@ -0,0 +1,57 @@
+import math
+
+from utility.util_metrics import LAG_BUCKETS, DeliveryMetrics, Histogram, format_bound
+
+
+def test_percentile_is_the_upper_bound_of_its_bucket():
+    hist = Histogram((1, 5, 10, math.inf))
+    for value in [0.2] * 50 + [3] * 45 + [7] * 4 + [100]:
+        hist.observe(value)
+
+    assert hist.percentile(0.5) == 1
+    assert hist.percentile(0.95) == 5
+    assert hist.percentile(0.99) == 10
+    assert hist.percentile(1.0) == math.inf
+
+
+def test_value_on_a_bound_falls_in_that_bucket():
+    hist = Histogram((1, 5, math.inf))
+    hist.observe(5)
+    assert hist.counts == [0, 1, 0]
+
+
+def test_empty_histogram_has_no_percentile():
+    assert Histogram(LAG_BUCKETS).percentile(0.5) is None
+    assert format_bound(None) == "-"
+    assert format_bound(math.inf) == ">3600s"
+
+
+def test_record_success_counts_slo_breaches_per_reminder():
+    metrics = DeliveryMetrics(slo_seconds=60)
+    metrics.record_success("dm", [-2, 10, 61, 300], 0.2)
+
+    assert metrics.slo_breaches == 2
+    assert metrics.lag["dm"].total == 4
+    assert metrics.send["dm"].total == 1
+    assert metrics.lag["dm"].counts[0] == 1  # early sends count as zero lag
+    assert metrics.summary_lines()[0].startswith("**dm** p50 ≤10s")
+
+
+def test_top_failures():
+    metrics = DeliveryMetrics()
+    metrics.record_failure("dm", "Forbidden")
+    metrics.record_failure("dm", "Forbidden")
+    metrics.record_failure("channel", "NotFound")
+    assert metrics.top_failures() == ["dm: Forbidden ×2", "channel: NotFound ×1"]
+
+
+def test_missed_deliveries_are_kept_out_of_lateness_and_slo():
+    metrics = DeliveryMetrics(slo_seconds=60)
+    metrics.record_success("dm", [5], 0.1)
+    metrics.record_success("dm", [7200, 9000], 0.1, missed=True)
+
+    assert metrics.lag["dm"].total == 1
+    assert metrics.slo_breaches == 0
+    assert metrics.catchup.total == 2
+    assert metrics.send["dm"].total == 2
+    assert metrics.summary_lines()[-1] == "**missed (catch-up)** p50 >3600s · p95 >3600s (n=2)"
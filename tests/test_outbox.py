@@ -0,0 +1,146 @@
+import asyncio
+import time
+
+import pytest
+
+from utility.util_delivery import DeliveryError
+from utility.util_outbox import RetryOutbox
+
+
+class PermanentError(Exception):
+    pass
+
+
+def is_permanent(exc):
+    if isinstance(exc, DeliveryError):
+        return all(is_permanent(e) for e in exc.failures.values())
+    return isinstance(exc, PermanentError)
+
+
+def make_outbox(tmp_path, deliver=None, **kwargs):
+    async def never_called(reminders, missed, delivered):
+        raise AssertionError("unexpected delivery")
+
+    kwargs.setdefault("is_permanent", is_permanent)
+    return RetryOutbox(deliver or never_called, path=str(tmp_path / "outbox.json"), **kwargs)
+
+
+async def run_for(outbox, seconds):
+    outbox.start()
+    await asyncio.sleep(seconds)
+    await outbox.stop()
+
+
+@pytest.mark.parametrize("attempts, ceiling", [(1, 30), (2, 60), (3, 120), (10, 3600)])
+def test_backoff_is_capped_exponential_with_jitter(tmp_path, attempts, ceiling):
+    outbox = make_outbox(tmp_path, base_delay=30, max_delay=3600)
+    for _ in range(50):
+        assert ceiling * 0.5 <= outbox.backoff(attempts) <= ceiling
+
+
+def test_fail_schedules_retry_and_persists(tmp_path):
+    outbox = make_outbox(tmp_path, base_delay=30)
+    reminder = {"id": 1, "message": "hi"}
+    before = time.time()
+    outbox.fail([reminder], False, RuntimeError("boom"), {"dm"})
+    reminder["message"] = "changed later"
+
+    (entry,) = outbox.pending
+    assert entry["attempts"] == 1
+    assert entry["delivered"] == ["dm"]
+    assert entry["reminders"][0]["message"] == "hi"
+    assert before + 15 <= entry["next_try"] <= time.time() + 30
+    assert entry["last_error"] == "RuntimeError: boom"
+
+    reloaded = make_outbox(tmp_path)
+    assert reloaded.pending == outbox.pending
+
+
+def test_permanent_failure_is_dead_lettered(tmp_path):
+    outbox = make_outbox(tmp_path)
+    outbox.fail([{"id": 1}], False, PermanentError("gone"))
+    assert outbox.pending == []
+    assert len(outbox.dead) == 1
+    assert "dead_at" in outbox.dead[0]
+
+
+def test_dead_letter_after_max_attempts(tmp_path):
+    calls = []
+
+    async def deliver(reminders, missed, delivered):
+        calls.append(reminders[0]["id"])
+        raise RuntimeError("still failing")
+
+    outbox = make_outbox(tmp_path, deliver, max_attempts=3, base_delay=0.01, max_delay=0.01)
+    outbox.fail([{"id": 7}], False, RuntimeError("first"))
+    asyncio.run(run_for(outbox, 0.3))
+
+    assert calls == [7, 7]
+    assert outbox.pending == []
+    assert outbox.dead[0]["attempts"] == 3
+    assert outbox.dead[0]["last_error"] == "RuntimeError: still failing"
+
+
+def test_requeue_dead_retries_again(tmp_path):
+    delivered_ids = []
+
+    async def deliver(reminders, missed, delivered):
+        delivered_ids.append(reminders[0]["id"])
+
+    outbox = make_outbox(tmp_path, deliver)
+    outbox.fail([{"id": 3}], True, PermanentError("gone"))
+    assert outbox.requeue_dead() == 1
+    asyncio.run(run_for(outbox, 0.1))
+
+    assert delivered_ids == [3]
+    assert outbox.dead == [] and outbox.pending == []
+    assert outbox.retried == 1
+
+
+def test_retry_skips_legs_that_already_went_out(tmp_path):
+    sent = []
+
+    async def deliver(reminders, missed, delivered):
+        for leg in ("dm", "post"):
+            if leg not in delivered:
+                sent.append(leg)
+                delivered.add(leg)
+
+    outbox = make_outbox(tmp_path, deliver, base_delay=0.01, max_delay=0.01)
+    outbox.fail([{"id": 1}], False, RuntimeError("post failed"), {"dm"})
+    asyncio.run(run_for(outbox, 0.2))
+
+    assert sent == ["post"]
+    assert outbox.retried == 1
+
+
+def test_failed_legs_are_retried_or_dead_lettered_on_their_own(tmp_path):
+    sent = []
+
+    async def deliver(reminders, missed, delivered):
+        for leg in ("dm", "post"):
+            if leg not in delivered:
+                sent.append(leg)
+                delivered.add(leg)
+
+    outbox = make_outbox(tmp_path, deliver, base_delay=0.01, max_delay=0.01)
+    failures = {"dm": PermanentError("DMs closed"), "post": RuntimeError("503")}
+    outbox.fail([{"id": 1}], False, DeliveryError(failures))
+
+    (dead,) = outbox.dead
+    assert dead["delivered"] == ["post"]
+    assert dead["last_error"] == "DeliveryError: dm: PermanentError: DMs closed"
+    (pending,) = outbox.pending
+    assert pending["delivered"] == ["dm"]
+
+    asyncio.run(run_for(outbox, 0.2))
+    assert sent == ["post"]
+    assert outbox.pending == [] and len(outbox.dead) == 1
+
+
+def test_clear_dead(tmp_path):
+    outbox = make_outbox(tmp_path)
+    outbox.fail([{"id": 1}], False, PermanentError("gone"))
+    outbox.fail([{"id": 2}], False, PermanentError("gone"))
+    assert outbox.clear_dead() == 2
+    assert make_outbox(tmp_path).dead == []
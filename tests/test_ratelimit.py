@@ -0,0 +1,67 @@
+import asyncio
+import time
+
+import pytest
+
+from utility.util_ratelimit import RateLimiter, TokenBucket
+
+
+def test_token_bucket_refills_continuously():
+    bucket = TokenBucket(2, 1.0)
+    now = bucket.updated
+    bucket.take()
+    bucket.take()
+    assert bucket.delay(now) == pytest.approx(0.5)
+    assert bucket.delay(now + 0.25) == pytest.approx(0.25)
+    assert bucket.delay(now + 0.5) == 0
+    assert not bucket.idle(now + 0.5)
+    assert bucket.idle(now + 10)
+    assert bucket.tokens == 2  # never refills past capacity
+
+
+def test_acquire_paces_a_burst_past_capacity():
+    limiter = RateLimiter({"global": (100, 1.0), "channel_send": (2, 0.2)})
+
+    async def burst():
+        started = time.monotonic()
+        await asyncio.gather(*(limiter.acquire("channel_send", 1) for _ in range(4)))
+        return time.monotonic() - started
+
+    elapsed = asyncio.run(burst())
+    # Two go straight through, the other two wait for one refill each (0.1s apart)
+    assert 0.15 <= elapsed < 0.5
+    assert limiter.throttled == 2
+    assert limiter.waiting == 0
+
+
+def test_keys_have_separate_buckets_but_share_global():
+    limiter = RateLimiter({"global": (3, 10.0), "channel_send": (2, 10.0)})
+
+    async def run():
+        await limiter.acquire("channel_send", 1)
+        await limiter.acquire("channel_send", 1)
+        await limiter.acquire("channel_send", 2)  # own bucket: no wait
+        assert limiter.throttled == 0
+        with pytest.raises(asyncio.TimeoutError):
+            # Channel 3 has tokens, but the global bucket is empty
+            await asyncio.wait_for(limiter.acquire("channel_send", 3), 0.1)
+
+    asyncio.run(run())
+
+
+def test_low_priority_route_leaves_reserve_for_the_shared_route():
+    limiter = RateLimiter(
+        {"global": (100, 1.0), "dm_create": (3, 10.0), "campaign_dm": (10, 10.0)},
+        low_priority={"campaign_dm": ("dm_create", 2)},
+    )
+
+    async def run():
+        await limiter.acquire("campaign_dm")  # 3 -> 2 dm_create tokens left
+        with pytest.raises(asyncio.TimeoutError):
+            # Another campaign DM would dip into the reserve
+            await asyncio.wait_for(limiter.acquire("campaign_dm"), 0.1)
+        # Reminder DMs still go straight through on the reserved tokens
+        await asyncio.wait_for(limiter.acquire("dm_create"), 0.01)
+        await asyncio.wait_for(limiter.acquire("dm_create"), 0.01)
+
+    asyncio.run(run())
@@ -0,0 +1,91 @@
+from datetime import datetime
+
+import pytest
+import pytz
+
+from utility.util_recurrence import describe, first_due, next_occurrence, parse_cron, parse_recurrence
+
+TZ = pytz.timezone("Europe/Amsterdam")
+
+
+def local(*args):
+    return TZ.localize(datetime(*args))
+
+
+@pytest.mark.parametrize("text, rule", [
+    ("daily", {"every": 86400}),
+    ("1h30m", {"every": 5400}),
+    ("2d", {"every": 172800}),
+    ("cron 0 9 * * 1-5", {"cron": "0 9 * * 1-5"}),
+])
+def test_parse_recurrence(text, rule):
+    assert parse_recurrence(text) == rule
+
+
+@pytest.mark.parametrize("text", ["1m", "soon", "cron 0 9 * *", "cron 61 * * * *", "cron 0 0 31 2 *"])
+def test_parse_recurrence_rejects(text):
+    with pytest.raises(ValueError):
+        parse_recurrence(text)
+
+
+def test_parse_cron_fields():
+    minutes, hours, days, months, weekdays = parse_cron("*/15 9-10 1,15 * 7")
+    assert minutes == {0, 15, 30, 45}
+    assert hours == {9, 10}
+    assert days == {1, 15}
+    assert months == set(range(1, 13))
+    assert weekdays == {0}
+
+
+def test_describe():
+    assert describe({"every": 7 * 86400}) == "every 1w"
+    assert describe({"every": 5400}) == "every 90m"
+    assert describe({"cron": "0 9 * * 1"}) == "cron `0 9 * * 1`"
+
+
+def test_cron_next_weekday_match():
+    # Wednesday 2026-10-14 12:00 -> next Monday 09:00
+    wednesday = local(2026, 10, 14, 12, 0)
+    assert next_occurrence({"cron": "0 9 * * 1"}, wednesday, wednesday, TZ) == local(2026, 10, 19, 9, 0)
+
+
+def test_cron_is_strictly_after_previous():
+    nine = local(2026, 10, 14, 9, 0)
+    assert next_occurrence({"cron": "0 9 * * *"}, nine, nine, TZ) == local(2026, 10, 15, 9, 0)
+
+
+def test_cron_day_of_month_or_weekday():
+    # Both day fields restricted: either may match (standard cron)
+    start = local(2026, 10, 14, 12, 0)
+    assert next_occurrence({"cron": "0 8 1 * 5"}, start, start, TZ) == local(2026, 10, 16, 8, 0)
+
+
+def test_cron_skips_missed_occurrences():
+    previous = local(2026, 10, 1, 9, 0)
+    now = local(2026, 10, 14, 12, 0)
+    assert next_occurrence({"cron": "0 9 * * *"}, previous, now, TZ) == local(2026, 10, 15, 9, 0)
+
+
+def test_interval_keeps_wall_clock_across_dst():
+    # Clocks go back on 2026-10-25 in Amsterdam; daily stays at 09:00 local
+    previous = local(2026, 10, 24, 9, 0)
+    upcoming = next_occurrence({"every": 86400}, previous, previous, TZ)
+    assert upcoming == local(2026, 10, 25, 9, 0)
+    assert upcoming.utcoffset() != previous.utcoffset()
+
+
+def test_interval_skips_missed_occurrences():
+    previous = local(2026, 10, 14, 9, 0)
+    now = local(2026, 10, 14, 12, 30)
+    assert next_occurrence({"every": 3600}, previous, now, TZ) == local(2026, 10, 14, 13, 0)
+
+
+def test_first_due_cron_ignores_minutes():
+    now = local(2026, 10, 14, 12, 0)
+    assert first_due({"cron": "0 9 * * 1"}, 5, now, TZ) == local(2026, 10, 19, 9, 0)
+
+
+def test_first_due_interval_and_one_shot_use_minutes():
+    now = local(2026, 10, 14, 12, 0)
+    assert first_due({"every": 86400}, 5, now, TZ) == local(2026, 10, 14, 12, 5)
+    assert first_due(None, 5, now, TZ) == local(2026, 10, 14, 12, 5)
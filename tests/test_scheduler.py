@@ -0,0 +1,76 @@
+import asyncio
+import time
+
+from utility.util_scheduler import ReminderScheduler
+
+
+def reminder(reminder_id):
+    return {"id": reminder_id}
+
+
+def test_pop_due_returns_due_reminders_in_due_order():
+    scheduler = ReminderScheduler()
+    now = 1000.0
+    reminders = {i: reminder(i) for i in range(5)}
+    for i, due in [(0, 30), (1, 10), (2, 20), (3, 5), (4, 500)]:
+        scheduler.push(reminders[i], now + due)
+
+    assert [r["id"] for r in scheduler.pop_due(now + 30)] == [3, 1, 2, 0]
+    assert scheduler.pop_due(now + 30) == []
+    assert scheduler.next_due() == now + 500
+    assert len(scheduler) == 1
+
+
+def test_discard_and_reschedule():
+    scheduler = ReminderScheduler()
+    first, second = reminder(1), reminder(2)
+    scheduler.push(first, 10)
+    scheduler.push(second, 20)
+    scheduler.discard(first)
+    assert scheduler.next_due() == 20
+
+    # Pushing again moves a reminder instead of scheduling it twice
+    scheduler.push(second, 5)
+    assert [r["id"] for r in scheduler.pop_due(100)] == [2]
+    assert len(scheduler) == 0
+    assert scheduler.next_due() is None
+
+
+def test_wait_sleeps_until_next_due():
+    async def run():
+        scheduler = ReminderScheduler()
+        scheduler.push(reminder(1), time.time() + 0.05)
+        started = time.monotonic()
+        await scheduler.wait(max_sleep=5)
+        return time.monotonic() - started
+
+    assert 0.04 <= asyncio.run(run()) < 1
+
+
+def test_earlier_push_wakes_the_waiter():
+    async def run():
+        scheduler = ReminderScheduler()
+        scheduler.push(reminder(1), time.time() + 60)
+        waiter = asyncio.create_task(scheduler.wait(max_sleep=60))
+        await asyncio.sleep(0.01)
+        started = time.monotonic()
+        scheduler.push(reminder(2), time.time())
+        await asyncio.wait_for(waiter, timeout=1)
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) < 0.5
+
+
+def test_later_push_does_not_wake_the_waiter():
+    async def run():
+        scheduler = ReminderScheduler()
+        scheduler.push(reminder(1), time.time() + 60)
+        waiter = asyncio.create_task(scheduler.wait(max_sleep=0.2))
+        await asyncio.sleep(0.01)
+        scheduler.push(reminder(2), time.time() + 120)
+        await asyncio.sleep(0.05)
+        woke_early = waiter.done()
+        await waiter
+        return woke_early
+
+    assert asyncio.run(run()) is False
@@ -0,0 +1,36 @@
+import json
+import logging
+
+import pytest
+
+from utility import util_settings
+
+
+@pytest.fixture
+def settings_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(util_settings, "_settings_cache", None)
+    monkeypatch.setattr(util_settings, "_last_settings_mtime", None)
+    levels = {name: logging.getLogger(name).level for name in ("", "bot")}
+    yield tmp_path / util_settings.SETTINGS_FILE
+    for name, level in levels.items():
+        logging.getLogger(name).setLevel(level)
+
+
+def test_missing_keys_are_filled_with_defaults(settings_file):
+    settings_file.write_text(json.dumps({"token": "abc"}))
+    settings = util_settings.load_settings()
+
+    assert settings["token"] == "abc"
+    assert settings["storage_engine"] == util_settings.DEFAULT_SETTINGS["storage_engine"]
+    assert json.loads(settings_file.read_text()) == settings
+
+
+def test_log_level_applies_to_the_bot_logger(settings_file):
+    settings_file.write_text(json.dumps({"log_level": "debug"}))
+    util_settings.load_settings()
+    assert logging.getLogger("bot").level == logging.DEBUG
+
+    settings_file.write_text(json.dumps({"log_level": "WARNING"}))
+    util_settings.load_settings(force=True)
+    assert logging.getLogger("bot").level == logging.WARNING
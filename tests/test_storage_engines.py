@@ -0,0 +1,138 @@
+import pytest
+
+from utility.util_serializers import ZLIB_MAGIC, get_serializer, read_file
+from utility.util_storage_journal import JournalEngine
+from utility.util_storage_json import JsonEngine
+from utility.util_storage_sharded import ShardedEngine
+from utility.util_storage_sqlite import SqliteEngine
+
+
+def make_reminder(reminder_id, guild_id=1, message="hello"):
+    return {
+        "id": reminder_id,
+        "user_id": 100 + reminder_id,
+        "guild_id": guild_id,
+        "message": message,
+        "time": "2030-01-01T09:00:00+01:00",
+        "due_ts": 1893484800.0 + reminder_id,
+        "delivery": "dm",
+        "target_mention": None,
+        "channel_id": None,
+    }
+
+
+def make_data():
+    return {
+        "reminders": [make_reminder(1), make_reminder(2, guild_id=2), make_reminder(3)],
+        "guilds": {
+            "1": {"admins": ["10", "11"], "default_delivery": "dm", "update_channels": ["500"]},
+            "2": {"user_manager_roles": ["20"], "default_delivery": "channel"},
+        },
+    }
+
+
+def open_engine(kind, tmp_path):
+    if kind == "json":
+        return JsonEngine(str(tmp_path / "data.json"))
+    if kind == "journal":
+        return JournalEngine(str(tmp_path / "data.json"))
+    if kind == "sqlite":
+        return SqliteEngine(str(tmp_path / "data.db"))
+    return ShardedEngine(str(tmp_path / "data"))
+
+
+def normalize(data):
+    reminders = sorted(data["reminders"], key=lambda r: r["id"])
+    guilds = {gid: dict(g) for gid, g in data["guilds"].items() if g}
+    return reminders, guilds
+
+
+ENGINES = ["json", "journal", "sqlite", "sharded"]
+
+
+@pytest.mark.parametrize("kind", ENGINES)
+def test_save_load_round_trip(kind, tmp_path):
+    engine = open_engine(kind, tmp_path)
+    engine.save(make_data())
+    engine.close()
+
+    engine = open_engine(kind, tmp_path)
+    assert normalize(engine.load()) == normalize(make_data())
+    engine.close()
+
+
+@pytest.mark.parametrize("kind", ENGINES)
+def test_ops_round_trip(kind, tmp_path):
+    engine = open_engine(kind, tmp_path)
+    data = engine.load()
+    data.update(make_data())
+    engine.save(data)
+
+    added = make_reminder(4, guild_id=2)
+    updated = dict(data["reminders"][0], message="edited")
+    removed = data["reminders"][1]
+    data["reminders"] = [updated, data["reminders"][2], added]
+    data["guilds"]["1"]["admins"].remove("10")
+    data["guilds"]["2"]["default_delivery"] = "both"
+    engine.write(data, [
+        {"op": "add_reminder", "reminder": added},
+        {"op": "update_reminder", "reminder": updated},
+        {"op": "remove_reminder", "reminder": removed},
+        {"op": "remove_guild_item", "guild_id": "1", "key": "admins", "value": "10"},
+        {"op": "set_guild_field", "guild_id": "2", "key": "default_delivery", "value": "both"},
+    ])
+    engine.close()
+
+    engine = open_engine(kind, tmp_path)
+    reminders, guilds = normalize(engine.load())
+    engine.close()
+    assert [r["id"] for r in reminders] == [1, 3, 4]
+    assert reminders[0]["message"] == "edited"
+    assert guilds["1"]["admins"] == ["11"]
+    assert guilds["2"]["default_delivery"] == "both"
+
+
+def test_sqlite_migrates_json_file(tmp_path):
+    from utility.util_storage_sqlite import migrate_json
+
+    JsonEngine(str(tmp_path / "data.json")).save(make_data())
+    assert migrate_json(str(tmp_path / "data.json"), str(tmp_path / "data.db")) == 3
+    assert normalize(open_engine("sqlite", tmp_path).load()) == normalize(make_data())
+
+
+@pytest.mark.parametrize("serializer", ["json", "json-compact", "zlib"])
+def test_json_engine_serializers_round_trip(serializer, tmp_path):
+    engine = JsonEngine(str(tmp_path / "data.json"), get_serializer(serializer))
+    engine.save(make_data())
+    assert normalize(JsonEngine(str(tmp_path / "data.json")).load()) == normalize(make_data())
+
+
+def test_read_file_detects_zlib_snapshots(tmp_path):
+    path = str(tmp_path / "data.json")
+    JsonEngine(path, get_serializer("zlib")).save(make_data())
+    with open(path, "rb") as f:
+        assert f.read(len(ZLIB_MAGIC)) == ZLIB_MAGIC
+    assert normalize(read_file(path)) == normalize(make_data())
+
+
+def test_sharded_engine_loads_guild_shards_lazily(tmp_path):
+    ShardedEngine(str(tmp_path / "data")).save(make_data())
+
+    guilds = ShardedEngine(str(tmp_path / "data")).load()["guilds"]
+    assert "1" in guilds
+    assert dict(guilds.loaded_items()) == {}
+    assert guilds["1"]["default_delivery"] == "dm"
+    assert list(dict(guilds.loaded_items())) == ["1"]
+
+
+def test_sqlite_engine_drops_legacy_time_index(tmp_path):
+    path = str(tmp_path / "data.db")
+    engine = SqliteEngine(path)
+    engine.conn.execute("CREATE INDEX idx_reminders_time ON reminders (time)")
+    engine.conn.commit()
+    engine.close()
+
+    engine = SqliteEngine(path)
+    indexes = {name for (name,) in engine.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    engine.close()
+    assert "idx_reminders_time" not in indexes
@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+
+TZ = pytz.timezone("Europe/Amsterdam")
+
+
+@pytest.fixture
+def store(storage_module):
+    return storage_module.ReminderStore({"reminders": [], "guilds": {}})
+
+
+def add(store, message, minutes=5):
+    return store.add_reminder(1, 10, message, datetime.now(TZ) + timedelta(minutes=minutes))
+
+
+def assert_index_consistent(store):
+    assert set(store._by_id) == set(store._pos) == {r["id"] for r in store.reminders}
+    for reminder_id, pos in store._pos.items():
+        assert store.reminders[pos] is store._by_id[reminder_id]
+
+
+def test_new_reminder_ids_are_unique_and_increasing(storage_module):
+    ids = [storage_module.new_reminder_id() for _ in range(5000)]
+    assert ids == sorted(set(ids))
+    assert all(0 < i < 2 ** 63 for i in ids)
+
+
+def test_remove_swaps_last_reminder_into_the_gap(store):
+    first, middle, last = add(store, "a"), add(store, "b"), add(store, "c")
+    store.remove_reminder(first)
+
+    assert store.reminders == [last, middle]
+    assert store._pos[last["id"]] == 0
+    assert store.get_reminder(first["id"]) is None
+    assert_index_consistent(store)
+
+    store.remove_reminder(middle)  # removing the tail element itself
+    assert store.reminders == [last]
+    assert_index_consistent(store)
+
+
+def test_remove_reminders_reindexes_and_unschedules(store):
+    reminders = [add(store, f"r{i}", minutes=-1) for i in range(6)]
+    removed = store.remove_reminders(lambda r: int(r["message"][1:]) % 2 == 0)
+
+    assert removed == reminders[0::2]
+    assert_index_consistent(store)
+    assert {r["id"] for r in store.pop_due_reminders()} == {r["id"] for r in reminders[1::2]}
+
+
+def test_update_reminder_reschedules(store):
+    reminder = add(store, "later", minutes=60)
+    assert store.pop_due_reminders() == []
+
+    updated = store.update_reminder(reminder["id"], time=datetime.now(TZ) - timedelta(minutes=1), message="now")
+    assert updated is reminder and reminder["message"] == "now"
+    assert store.pop_due_reminders() == [reminder]
+    assert store.update_reminder(12345, message="missing") is None
+
+
+def test_finish_removes_one_shot_and_advances_recurring(store):
+    one_shot = add(store, "once", minutes=-1)
+    hourly = store.add_reminder(1, 10, "stretch", datetime.now(TZ) - timedelta(minutes=1), recurrence={"every": 3600})
+    due_ts = hourly["due_ts"]
+
+    assert store.finish_reminder(one_shot) is None
+    assert store.get_reminder(one_shot["id"]) is None
+
+    assert store.finish_reminder(hourly) is hourly
+    assert store.get_reminder(hourly["id"]) is hourly
+    assert hourly["due_ts"] == pytest.approx(due_ts + 3600)
+    assert store.pop_due_reminders() == []
+
+
+def test_popped_reminders_stay_in_flight_until_finished(store):
+    once = add(store, "once", minutes=-1)
+    hourly = store.add_reminder(1, 10, "stretch", datetime.now(TZ) - timedelta(minutes=1), recurrence={"every": 3600})
+    assert not store.is_in_flight(once["id"])
+
+    assert store.pop_due_reminders() == [once, hourly]
+    assert store.is_in_flight(once["id"]) and store.is_in_flight(hourly["id"])
+
+    store.finish_reminder(once)
+    store.finish_reminder(hourly)
+    assert not store.is_in_flight(once["id"])
+    assert not store.is_in_flight(hourly["id"])
+
+
+def test_forum_thread_cap_prunes_least_recently_used(store, storage_module, monkeypatch):
+    monkeypatch.setattr(storage_module, "MAX_FORUM_THREADS", 3)
+    for day in ("mon", "tue", "wed"):
+        store.set_forum_thread(10, 500, day, hash(day))
+
+    assert store.get_forum_thread(10, 500, "mon") == hash("mon")  # used again: now most recent
+    store.set_forum_thread(10, 500, "thu", hash("thu"))
+
+    assert store.get_forum_thread(10, 500, "tue") is None
+    assert list(store.get_guild(10)["forum_threads"]) == ["500:wed", "500:mon", "500:thu"]
+
+    store.set_forum_thread(10, 500, "wed", None)
+    assert store.get_forum_thread(10, 500, "wed") is None
@@ -0,0 +1,51 @@
+# utility/util_audit.py
+import time
+
+import discord
+
+from utility.util_buffer import DROP_OLDEST, BufferedSink
+
+# Embeds allow 25 fields; keep batches well under that and the 6000-character total
+BATCH_SIZE = 10
+
+
+class AuditSink(BufferedSink):
+    """
+    Backend access events, posted to the backend log channel as one multi-field
+    embed every `interval` seconds, or sooner once `batch_size` events are waiting.
+    When the buffer is full the oldest events are dropped and counted.
+    """
+
+    def __init__(self, resolve_channel, interval: float = 5.0, batch_size: int = BATCH_SIZE,
+                 max_pending: int = 500, throttle=None):
+        super().__init__(self._post, interval=interval, batch_size=batch_size, max_pending=max_pending,
+                         drop=DROP_OLDEST, name="audit_sink")
+        self._resolve_channel = resolve_channel  # () -> channel or None
+        self._throttle = throttle
+
+    def push(self, granted: bool, command: str, user: str, guild: str, reason: str = None):
+        return super().push((time.time(), granted, command, user, guild, reason))
+
+    def _build_embed(self, batch, dropped):
+        denied = sum(1 for event in batch if not event[1])
+        embed = discord.Embed(
+            title=f"🛡️ Backend Access ({len(batch) - denied} granted, {denied} denied)",
+            color=discord.Color.red() if denied else discord.Color.green()
+        )
+        for ts, granted, command, user, guild, reason in batch:
+            value = f"User: {user}\nGuild: {guild}\n<t:{int(ts)}:T>"
+            if reason:
+                value += f"\nReason: {reason}"
+            embed.add_field(name=f"{'✅' if granted else '🔒'} {command}"[:256], value=value[:1024], inline=False)
+        if dropped:
+            embed.set_footer(text=f"{dropped} events dropped (queue full)")
+        return embed
+
+    async def _post(self, batch, dropped):
+        channel = self._resolve_channel()
+        if channel is None:
+            # No log channel configured: the events are already in the log file
+            return
+        if self._throttle:
+            await self._throttle(channel.id)
+        await channel.send(embed=self._build_embed(batch, dropped))
@@ -4,15 +4,15 @@ import os
 from logging.handlers import RotatingFileHandler
 from datetime import datetime
 
-def setup_logger():
-    """Sets up a rotating logger for the bot and returns it."""
+def setup_logger(level="INFO"):
+    """Sets up a rotating logger for the bot at `level` (a name like "DEBUG") and returns it."""
     log_dir = os.path.join(os.path.dirname(__file__), "..", "logs")
     os.makedirs(log_dir, exist_ok=True)
 
     log_file = os.path.join(log_dir, "bot.log")
 
     logger = logging.getLogger("bot")
-    logger.setLevel(logging.INFO)
+    logger.setLevel(getattr(logging, str(level).upper(), logging.INFO))
 
     if logger.hasHandlers():
         return logger  # Prevent double initialization
@@ -0,0 +1,112 @@
+# utility/util_broadcast.py
+import asyncio
+import logging
+import os
+import time
+from collections import Counter
+
+from utility.util_serializers import get_serializer, read_file, write_file
+
+logger = logging.getLogger("bot")
+
+BROADCAST_FILE = "broadcast_checkpoint.json"
+
+# Checkpoint after this many finished targets (and always at the end)
+SAVE_EVERY = 25
+
+
+class Broadcast:
+    """
+    Checkpointed fan-out of one message to many targets (guild IDs).
+    Each target's outcome is recorded in `done` and flushed to disk as the run
+    goes, so a broadcast interrupted by a restart can be resumed without
+    re-sending to targets that already got it.
+    """
+
+    def __init__(self, path: str, message: str, author: str, done=None, started=None):
+        self.path = path
+        self.message = message
+        self.author = author
+        self.done = done or {}  # target -> "sent" / "dmed" / "failed"
+        self.started = started or time.time()
+        self.total = 0
+        self._unsaved = 0
+
+    @classmethod
+    def load(cls, path: str = BROADCAST_FILE):
+        """The interrupted broadcast recorded at `path`, or None."""
+        if not os.path.exists(path):
+            return None
+        try:
+            data = read_file(path)
+        except Exception:
+            logger.exception(f"Failed to read broadcast checkpoint {path}")
+            return None
+        return cls(path, data["message"], data.get("author", "?"), data.get("done", {}), data.get("started"))
+
+    def save(self):
+        state = {"message": self.message, "author": self.author, "started": self.started, "done": self.done}
+        try:
+            write_file(self.path, state, get_serializer("json-compact"))
+        except Exception:
+            logger.exception(f"Failed to write broadcast checkpoint {self.path}")
+        self._unsaved = 0
+
+    def discard(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def counts(self):
+        return Counter(self.done.values())
+
+    async def run(self, targets, send, concurrency: int = 10, on_progress=None, progress_interval: float = 3.0):
+        """
+        Call `await send(target)` (returning an outcome string) for every target
+        not already done, at most `concurrency` at a time. `on_progress(self)`
+        is awaited every progress_interval seconds while the run is going.
+        The checkpoint is removed once every target has an outcome.
+        """
+        self.total = len(targets)
+        queue = asyncio.Queue()
+        for target in targets:
+            if target not in self.done:
+                queue.put_nowait(target)
+
+        async def worker():
+            while True:
+                try:
+                    target = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    outcome = await send(target)
+                except Exception:
+                    logger.exception(f"Broadcast to {target} failed")
+                    outcome = "failed"
+                self.done[target] = outcome
+                self._unsaved += 1
+                if self._unsaved >= SAVE_EVERY:
+                    self.save()
+
+        async def report():
+            failures = 0
+            while True:
+                await asyncio.sleep(progress_interval)
+                try:
+                    await on_progress(self)
+                except Exception:
+                    # Surface the first failure; repeats of it every few seconds only go to debug
+                    failures += 1
+                    log = logger.warning if failures == 1 else logger.debug
+                    log("Broadcast progress update failed; progress may stop updating", exc_info=True)
+
+        self.save()
+        reporter = asyncio.create_task(report()) if on_progress else None
+        try:
+            await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+        finally:
+            if reporter:
+                reporter.cancel()
+            self.save()
+        self.discard()
+        return self.counts()
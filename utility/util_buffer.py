@@ -0,0 +1,85 @@
+# utility/util_buffer.py
+import asyncio
+import logging
+from collections import deque
+
+logger = logging.getLogger("bot")
+
+# What push() gives up once max_pending items are waiting
+DROP_OLDEST = "oldest"  # keep the most recent items
+DROP_NEWEST = "newest"  # keep the first items, refuse new ones
+
+
+class BufferedSink:
+    """
+    Bounded in-process buffer drained by a background task, for writes that
+    must never hold up the caller. push() only appends; the task hands waiting
+    items to `write(batch, dropped)` every `interval` seconds, or sooner once
+    `batch_size` are waiting. When the buffer is full the drop policy decides
+    which item goes, and `dropped` counts them for the next write.
+    """
+
+    def __init__(self, write, interval: float = 5.0, batch_size: int = None, max_pending: int = 500,
+                 drop: str = DROP_OLDEST, name: str = "buffered_sink"):
+        if drop not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"Unknown drop policy: {drop}")
+        self._write = write  # async callable(batch, dropped)
+        self.interval = interval
+        self.batch_size = batch_size  # None: everything waiting goes in one batch
+        self.max_pending = max_pending
+        self.drop = drop
+        self.name = name
+        self._pending = deque()
+        self._ready = asyncio.Event()
+        self._task = None
+        self.dropped = 0
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    def push(self, item) -> bool:
+        """Queue an item without waiting. Returns False if the drop policy refused it."""
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            if self.drop == DROP_NEWEST:
+                return False
+            self._pending.popleft()
+        self._pending.append(item)
+        if self.batch_size and len(self._pending) >= self.batch_size:
+            self._ready.set()
+        return True
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def stop(self):
+        """Cancel the background task and write whatever is still buffered."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception(f"Failed to flush {self.name} on shutdown")
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._ready.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception(f"Failed to flush {self.name}")
+
+    async def flush(self):
+        while self._pending or self.dropped:
+            size = min(self.batch_size or len(self._pending), len(self._pending))
+            batch = [self._pending.popleft() for _ in range(size)]
+            dropped, self.dropped = self.dropped, 0
+            await self._write(batch, dropped)
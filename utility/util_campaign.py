@@ -0,0 +1,150 @@
+# utility/util_campaign.py
+import asyncio
+import logging
+import os
+from collections import Counter, deque
+
+import discord
+
+from utility.util_serializers import get_serializer, read_file, write_file
+
+logger = logging.getLogger("bot")
+
+# {campaign name: [user ids already messaged]}
+CAMPAIGN_FILE = "dm_campaigns.json"
+
+# Persist the messaged set after this many sends (and always at the end)
+SAVE_EVERY = 25
+
+
+class DMCampaign:
+    """
+    Send one DM per unique user across many guilds.
+    Recipients are added per guild; a user listed in several guilds is messaged
+    once. With a `path`, users messaged by earlier runs of the same campaign are
+    skipped, so an interrupted or repeated run doesn't DM anyone twice.
+    Sends run `concurrency` at a time, each after `throttle()` (the shared rate
+    limiter, on its low-priority campaign route). `report` holds per-guild counts
+    of sent/failed/skipped/duplicate.
+    """
+
+    def __init__(self, name: str, path: str = CAMPAIGN_FILE, concurrency: int = 5, throttle=None):
+        self.name = name
+        self.path = path
+        self.concurrency = max(1, concurrency)
+        self._throttle = throttle
+        self._recipients = {}  # user id -> (user, guild) that first listed them
+        self.guild_names = {}
+        self.report = {}  # guild id -> Counter
+        self.total = 0  # recipients queued for the next run (progress is counted against this)
+        self.messaged = self._load()
+        self._unsaved = 0
+
+    # ------------------- Persistence -------------------
+    def _read_all(self):
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            return read_file(self.path)
+        except Exception:
+            logger.exception(f"Failed to read DM campaign file {self.path}")
+            return {}
+
+    def _load(self):
+        return set(self._read_all().get(self.name, []))
+
+    def save(self):
+        self._unsaved = 0
+        if not self.path:
+            return
+        campaigns = self._read_all()
+        campaigns[self.name] = sorted(self.messaged)
+        try:
+            write_file(self.path, campaigns, get_serializer("json-compact"))
+        except Exception:
+            logger.exception(f"Failed to write DM campaign file {self.path}")
+
+    def reset(self):
+        """Forget who this campaign has already messaged."""
+        self.messaged = set()
+        self.save()
+
+    # ------------------- Recipients -------------------
+    def add(self, guild, user):
+        uid = str(user.id)
+        self.guild_names[guild.id] = guild.name
+        counts = self.report.setdefault(guild.id, Counter())
+        if uid in self.messaged:
+            counts["skipped"] += 1
+        elif uid in self._recipients:
+            counts["duplicate"] += 1
+        else:
+            self._recipients[uid] = (user, guild)
+            self.total += 1
+
+    def __len__(self):
+        return len(self._recipients)
+
+    # ------------------- Sending -------------------
+    async def _send(self, uid, user, guild, render):
+        counts = self.report[guild.id]
+        try:
+            if self._throttle:
+                await self._throttle()
+            await user.send(render(user, guild))
+        except discord.Forbidden:
+            counts["failed"] += 1
+            logger.info(f"[{self.name}] Cannot DM {user} from {guild.name} (DMs disabled)")
+            return
+        except Exception:
+            counts["failed"] += 1
+            logger.exception(f"[{self.name}] Failed to DM {user} from {guild.name}")
+            return
+        counts["sent"] += 1
+        self.messaged.add(uid)
+        self._unsaved += 1
+        if self._unsaved >= SAVE_EVERY:
+            self.save()
+
+    async def run(self, render, on_progress=None, progress_interval: float = 3.0):
+        """
+        DM every pending recipient `render(user, guild)`; returns the per-guild report.
+        `on_progress(self)` is awaited every progress_interval seconds while the run is going.
+        """
+        pending = deque(self._recipients.items())
+        self._recipients = {}
+
+        async def worker():
+            while pending:
+                uid, (user, guild) = pending.popleft()
+                await self._send(uid, user, guild, render)
+
+        async def report():
+            while True:
+                await asyncio.sleep(progress_interval)
+                try:
+                    await on_progress(self)
+                except Exception:
+                    logger.debug(f"[{self.name}] Progress update failed", exc_info=True)
+
+        reporter = asyncio.create_task(report()) if on_progress else None
+        try:
+            await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        finally:
+            if reporter:
+                reporter.cancel()
+            self.save()
+        return self.report
+
+    def totals(self):
+        total = Counter()
+        for counts in self.report.values():
+            total.update(counts)
+        return total
+
+    def report_lines(self):
+        lines = []
+        for guild_id, counts in self.report.items():
+            parts = [f"{counts[k]} {k}" for k in ("sent", "failed", "skipped", "duplicate") if counts[k]]
+            lines.append(f"**{self.guild_names.get(guild_id, guild_id)}**: {', '.join(parts) or 'nobody to message'}")
+        return lines
@@ -0,0 +1,209 @@
+# utility/util_delivery.py
+import asyncio
+import logging
+from collections import deque
+
+import discord
+
+logger = logging.getLogger("bot")
+
+# Discord's cap on message content length
+MESSAGE_LIMIT = 2000
+
+
+# Message headers per destination style: (one reminder, several reminders)
+HEADERS = {
+    "dm": ("⏰ {status}Reminder:", "⏰ {status}Reminders:"),
+    "channel": ("⏰ {status}Reminder for {mention}:", "⏰ {status}Reminders for {mention}:"),
+    "thread": ("{mention} ⏰ {status}Reminder:", "{mention} ⏰ {status}Reminders:"),
+}
+
+
+class DeliveryPlanError(Exception):
+    """The reminder can't be delivered as requested; shown to the user when it is created."""
+
+
+class DeliveryError(Exception):
+    """One or more legs ("dm", "post") of a delivery failed; `failures` maps each failed leg to its exception."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        super().__init__("; ".join(f"{leg}: {type(exc).__name__}: {exc}" for leg, exc in failures.items()))
+
+
+def post_style(kind):
+    return "channel" if kind in ("channel", "both") else "thread"
+
+
+def render_plan(plan, message, target_mention):
+    """Fill in the ready-to-send content of a plan for an on-time, single delivery."""
+    plan["dm"] = f"{HEADERS['dm'][0].format(status='')} {message}" if plan["kind"] in ("dm", "both") else None
+    if plan["kind"] == "dm":
+        plan["post"] = None
+    else:
+        single = HEADERS[post_style(plan["kind"])][0]
+        plan["post"] = f"{single.format(status='', mention=target_mention)} {message}"
+    return plan
+
+
+def build_plan(delivery, channel, message, target_mention):
+    """
+    Resolve where and how a new reminder will be sent, so the delivery path only
+    has to look up the channel and send. Raises DeliveryPlanError for anything
+    that would otherwise only fail when the reminder fires.
+    kind: dm / channel / both / thread (existing thread or forum post) / forum (new thread per reuse policy)
+    """
+    kind = delivery or "dm"
+    if kind != "dm":
+        if channel is None:
+            raise DeliveryPlanError("This delivery mode needs a channel, but none was found.")
+        if kind == "forum":
+            if isinstance(channel, discord.Thread):
+                kind = "thread"
+            elif not isinstance(channel, discord.ForumChannel):
+                raise DeliveryPlanError("Forum delivery only works from a forum channel or one of its posts.")
+
+        perms = channel.permissions_for(channel.guild.me)
+        if kind == "thread" or isinstance(channel, discord.Thread):
+            allowed = perms.send_messages_in_threads
+        elif kind == "forum":
+            allowed = perms.create_public_threads and perms.send_messages
+        else:
+            allowed = perms.send_messages
+        if not allowed:
+            raise DeliveryPlanError(f"I don't have permission to post in {channel.mention}.")
+
+    plan = {"kind": kind, "channel_id": channel.id if kind != "dm" else None}
+    return render_plan(plan, message, target_mention)
+
+
+def plan_for(reminder):
+    """The stored plan, or one derived from the raw fields for reminders created before plans existed."""
+    plan = reminder.get("plan")
+    if plan:
+        return plan
+    plan = {"kind": reminder.get("delivery") or "dm", "channel_id": reminder.get("channel_id")}
+    return render_plan(plan, reminder["message"], reminder.get("target_mention") or f"<@{reminder['user_id']}>")
+
+
+def render_group(style, reminders, missed, target_mention=None):
+    """Message chunks for a coalesced group in the given HEADERS style."""
+    status = "MISSED " if missed else ""
+    single, multi = (h.format(status=status, mention=target_mention) for h in HEADERS[style])
+    return render_batch(single, multi, [r["message"] for r in reminders])
+
+
+def delivery_key(reminder):
+    """Ordering key: reminders sharing a channel (or a DM recipient) are sent one after another."""
+    if reminder.get("delivery") in ("channel", "forum", "both") and reminder.get("channel_id"):
+        return ("channel", reminder["channel_id"])
+    return ("user", reminder["user_id"])
+
+
+def coalesce_key(reminder):
+    """Reminders with the same key land in the same place with the same ping and can share one message."""
+    mode = reminder.get("delivery", "dm")
+    return (
+        mode,
+        reminder["user_id"] if mode in ("dm", "both") else None,
+        reminder.get("channel_id") if mode != "dm" else None,
+        reminder.get("target_mention"),
+    )
+
+
+def coalesce(reminders):
+    """Group reminders due in the same tick by coalesce_key, keeping due order inside each group."""
+    groups = {}
+    for r in reminders:
+        groups.setdefault(coalesce_key(r), []).append(r)
+    return list(groups.values())
+
+
+def render_batch(single: str, multi: str, messages, limit: int = MESSAGE_LIMIT):
+    """
+    Message contents for a group: "<single> msg" for one reminder, otherwise
+    "<multi>" followed by one bullet per reminder, split so no chunk exceeds `limit`.
+    """
+    if len(messages) == 1:
+        return [f"{single} {messages[0]}"]
+    chunks = []
+    current = multi
+    for message in messages:
+        line = f"\n• {message}"
+        if current != multi and len(current) + len(line) > limit:
+            chunks.append(current)
+            current = multi
+        current += line
+    chunks.append(current)
+    return chunks
+
+
+class DeliveryPipeline:
+    """
+    Bounded pool of async workers fed from a queue of due reminder groups
+    (see coalesce). submit() returns immediately; different channels are delivered concurrently,
+    while each channel/recipient keeps strict FIFO order because only one
+    worker holds a key at a time.
+    """
+
+    def __init__(self, deliver, workers: int = 8):
+        self._deliver = deliver  # async callable(reminders, missed)
+        self.worker_count = max(1, workers)
+        self._queues = {}  # key -> deque of (reminders, missed); present while queued or in flight
+        self._ready = asyncio.Queue()  # keys with work and no worker holding them
+        self._workers = []
+        self.delivered = 0
+        self.failed = 0
+
+    @property
+    def started(self):
+        return bool(self._workers)
+
+    @property
+    def pending(self):
+        return sum(len(group) for q in self._queues.values() for group, _ in q)
+
+    def start(self):
+        if self.started:
+            return
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"delivery_worker_{i}")
+            for i in range(self.worker_count)
+        ]
+
+    async def stop(self):
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, reminders, missed=False):
+        """Queue one coalesced group (all sharing a delivery_key)."""
+        key = delivery_key(reminders[0])
+        queue = self._queues.get(key)
+        if queue is None:
+            self._queues[key] = deque([(reminders, missed)])
+            self._ready.put_nowait(key)
+        else:
+            # Key is already queued or held by a worker; it will get to this item in order
+            queue.append((reminders, missed))
+
+    async def _worker(self):
+        while True:
+            key = await self._ready.get()
+            queue = self._queues[key]
+            reminders, missed = queue.popleft()
+            try:
+                await self._deliver(reminders, missed)
+                self.delivered += len(reminders)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.failed += len(reminders)
+                ids = ", ".join(str(r.get("id")) for r in reminders)
+                logger.exception(f"Delivery worker failed on reminder(s) {ids}")
+            # Hand the key back so one busy channel can't monopolise a worker
+            if queue:
+                self._ready.put_nowait(key)
+            else:
+                del self._queues[key]
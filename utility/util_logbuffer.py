@@ -0,0 +1,51 @@
+# utility/util_logbuffer.py
+import discord
+
+from utility.util_buffer import DROP_NEWEST, BufferedSink
+from utility.util_delivery import render_batch
+
+
+class LogBuffer(BufferedSink):
+    """
+    Buffer in front of the backend log channel. Text queued during an interval
+    goes out as one post; a message already waiting is only counted again and
+    shows as one "×N" line, so repeats don't use up the buffer. Embeds (e.g.
+    restart or broadcast reports) are posted one per message. Once
+    `max_entries` distinct items are waiting, new ones are dropped and counted,
+    so the first messages of a burst (usually the cause) are the ones kept.
+    """
+
+    def __init__(self, send, interval: float = 5.0, max_entries: int = 50, prefix: str = "🛰️ **Backend Log:**"):
+        super().__init__(self._post, interval=interval, max_pending=max_entries,
+                         drop=DROP_NEWEST, name="backend_log_writer")
+        self._send = send  # async callable(content=None, embed=None)
+        self.prefix = prefix
+        self._counts = {}  # waiting message -> times pushed
+
+    def push(self, item) -> bool:
+        if isinstance(item, discord.Embed):
+            return super().push(item)
+        if item in self._counts:
+            self._counts[item] += 1
+            return True
+        if not super().push(item):
+            return False
+        self._counts[item] = 1
+        return True
+
+    async def _post(self, batch, dropped):
+        lines = []
+        embeds = []
+        for item in batch:
+            if isinstance(item, discord.Embed):
+                embeds.append(item)
+            else:
+                count = self._counts.pop(item, 1)
+                lines.append(f"{item} ×{count}" if count > 1 else item)
+        if dropped:
+            lines.append(f"⚠️ {dropped} more messages dropped (log buffer full)")
+        if lines:
+            for content in render_batch(self.prefix, self.prefix, lines):
+                await self._send(content=content)
+        for embed in embeds:
+            await self._send(embed=embed)
@@ -0,0 +1,94 @@
+# utility/util_metrics.py
+import bisect
+import math
+from collections import Counter
+
+# Upper bounds (seconds) of the histogram buckets; the last bucket is open-ended
+LAG_BUCKETS = (0.5, 1, 2, 5, 10, 30, 60, 120, 300, 900, 3600, math.inf)
+SEND_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, math.inf)
+
+
+class Histogram:
+    """Fixed-bucket histogram; percentiles are reported as the upper bound of the bucket they fall in."""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.total = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += 1
+
+    def percentile(self, q: float):
+        if not self.total:
+            return None
+        rank = q * self.total
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.bounds[-1]
+
+
+def format_bound(bound, bounds=LAG_BUCKETS):
+    if bound is None:
+        return "-"
+    if bound == math.inf:
+        return f">{bounds[-2]:g}s"
+    return f"≤{bound:g}s"
+
+
+class DeliveryMetrics:
+    """
+    Per-delivery-mode lateness (due time -> send finished) and send-duration
+    histograms, failure reasons, and a counter of deliveries later than the SLO.
+    Catch-up deliveries of reminders missed while the bot was offline are late by
+    design; their lateness goes into a separate histogram and never counts
+    against the SLO.
+    """
+
+    def __init__(self, slo_seconds: float = 60):
+        self.slo_seconds = slo_seconds
+        self.lag = {}  # mode -> Histogram
+        self.send = {}  # mode -> Histogram
+        self.catchup = Histogram(LAG_BUCKETS)  # lateness of missed (catch-up) deliveries, all modes
+        self.failures = Counter()  # (mode, reason) -> count
+        self.slo_breaches = 0
+
+    def record_success(self, mode, lags, duration: float, missed: bool = False):
+        self.send.setdefault(mode, Histogram(SEND_BUCKETS)).observe(duration)
+        if missed:
+            for lag in lags:
+                self.catchup.observe(max(0.0, lag))
+            return
+        lag_hist = self.lag.setdefault(mode, Histogram(LAG_BUCKETS))
+        for lag in lags:
+            lag_hist.observe(max(0.0, lag))
+            if lag > self.slo_seconds:
+                self.slo_breaches += 1
+
+    def record_failure(self, mode, reason: str):
+        self.failures[(mode, reason)] += 1
+
+    def summary_lines(self):
+        """One line per delivery mode: lateness p50/p95/p99 and send p95; catch-up lateness last."""
+        lines = []
+        for mode in sorted(self.lag):
+            lag = self.lag[mode]
+            lines.append(
+                f"**{mode}** p50 {format_bound(lag.percentile(0.5))} · "
+                f"p95 {format_bound(lag.percentile(0.95))} · "
+                f"p99 {format_bound(lag.percentile(0.99))} "
+                f"(send p95 {format_bound(self.send[mode].percentile(0.95), SEND_BUCKETS)}, n={lag.total})"
+            )
+        if self.catchup.total:
+            lines.append(
+                f"**missed (catch-up)** p50 {format_bound(self.catchup.percentile(0.5))} · "
+                f"p95 {format_bound(self.catchup.percentile(0.95))} (n={self.catchup.total})"
+            )
+        return lines
+
+    def top_failures(self, limit: int = 5):
+        return [f"{mode}: {reason} ×{count}" for (mode, reason), count in self.failures.most_common(limit)]
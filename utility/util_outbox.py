@@ -0,0 +1,161 @@
+# utility/util_outbox.py
+import asyncio
+import logging
+import os
+import random
+import time
+
+from utility.util_delivery import DeliveryError
+from utility.util_serializers import get_serializer, read_file, write_file
+
+logger = logging.getLogger("bot")
+
+OUTBOX_FILE = "outbox.json"
+
+# Dead letters kept for inspection; the oldest are dropped past this
+MAX_DEAD_LETTERS = 200
+
+
+class RetryOutbox:
+    """
+    Durable retry queue for reminder groups whose delivery failed.
+    Entries are retried with exponential backoff plus jitter by their own task
+    (never the reminder tick). After max_attempts, or on a permanent error,
+    an entry moves to the dead-letter list. Each entry remembers which legs
+    of the delivery already went out, so only the failed ones are retried,
+    and legs that failed together are split into one entry each so a leg
+    that can never succeed doesn't hold back the others.
+    Everything lives in one file, rewritten atomically on every change, so
+    retries survive a restart.
+    """
+
+    def __init__(self, deliver, path: str = OUTBOX_FILE, max_attempts: int = 5,
+                 base_delay: float = 30, max_delay: float = 3600, is_permanent=None):
+        self._deliver = deliver  # async callable(reminders, missed, delivered legs); raises on failure
+        self.path = path
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._is_permanent = is_permanent or (lambda exc: False)
+        self.serializer = get_serializer("json")
+        self.pending = []  # {"reminders", "missed", "delivered", "attempts", "next_try", "last_error"}
+        self.dead = []
+        self.retried = 0
+        self._wake = asyncio.Event()
+        self._task = None
+        self._load()
+
+    # ------------------- Persistence -------------------
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            data = read_file(self.path)
+        except Exception:
+            logger.exception(f"Failed to read retry outbox {self.path}; starting empty")
+            return
+        self.pending = data.get("pending", [])
+        self.dead = data.get("dead", [])
+        if self.pending or self.dead:
+            logger.info(f"Retry outbox loaded: {len(self.pending)} pending, {len(self.dead)} dead-lettered")
+
+    def _save(self):
+        try:
+            write_file(self.path, {"pending": self.pending, "dead": self.dead}, self.serializer)
+        except Exception:
+            logger.exception(f"Failed to write retry outbox {self.path}")
+
+    # ------------------- Queueing -------------------
+    def backoff(self, attempts: int) -> float:
+        """Exponential backoff with jitter: min(max_delay, base * 2^(attempts-1)) scaled by a random 0.5-1.0."""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.5, 1.0)
+
+    def fail(self, reminders, missed, exc, delivered=()):
+        """Record a failed delivery (`delivered`: legs that did go out): schedule a retry, or dead-letter it."""
+        # Copies: a recurring reminder's live record moves on to its next occurrence
+        entry = {
+            "reminders": [dict(r) for r in reminders], "missed": missed, "delivered": sorted(delivered),
+            "attempts": 0, "next_try": 0.0, "last_error": ""
+        }
+        self._record_failure(entry, exc)
+        self._save()
+
+    def _record_failure(self, entry, exc):
+        if isinstance(exc, DeliveryError) and len(exc.failures) > 1:
+            # One entry per failed leg, each skipping the other legs, so e.g. a closed DM
+            # is dead-lettered while the channel post is still retried
+            for leg, leg_exc in exc.failures.items():
+                skip = set(entry["delivered"]) | (set(exc.failures) - {leg})
+                self._record_failure(dict(entry, delivered=sorted(skip)), DeliveryError({leg: leg_exc}))
+            return
+        entry["attempts"] += 1
+        entry["last_error"] = f"{type(exc).__name__}: {exc}"[:300]
+        if self._is_permanent(exc) or entry["attempts"] >= self.max_attempts:
+            entry["dead_at"] = time.time()
+            self.dead.append(entry)
+            del self.dead[:-MAX_DEAD_LETTERS]
+            logger.warning(f"Dead-lettered {len(entry['reminders'])} reminder(s) after {entry['attempts']} attempt(s): {entry['last_error']}")
+            return
+        entry["next_try"] = time.time() + self.backoff(entry["attempts"])
+        self.pending.append(entry)
+        self._wake.set()
+
+    def requeue_dead(self) -> int:
+        """Give every dead letter a fresh set of attempts."""
+        count = len(self.dead)
+        for entry in self.dead:
+            entry.pop("dead_at", None)
+            entry["attempts"] = 0
+            entry["next_try"] = 0.0
+            self.pending.append(entry)
+        self.dead = []
+        self._save()
+        self._wake.set()
+        return count
+
+    def clear_dead(self) -> int:
+        count = len(self.dead)
+        self.dead = []
+        self._save()
+        return count
+
+    # ------------------- Retry Task -------------------
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="retry_outbox")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            now = time.time()
+            # Entries stay in pending until their retry finishes, so a shutdown mid-retry loses nothing
+            for entry in [e for e in self.pending if e["next_try"] <= now]:
+                delivered = set(entry.get("delivered", []))
+                try:
+                    await self._deliver(entry["reminders"], entry["missed"], delivered)
+                except asyncio.CancelledError:
+                    entry["delivered"] = sorted(delivered)
+                    self._save()
+                    raise
+                except Exception as e:
+                    entry["delivered"] = sorted(delivered)
+                    self.pending.remove(entry)
+                    self._record_failure(entry, e)
+                else:
+                    self.pending.remove(entry)
+                    self.retried += len(entry["reminders"])
+                self._save()
+
+            next_try = min((e["next_try"] for e in self.pending), default=None)
+            delay = None if next_try is None else max(0.0, next_try - time.time())
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,112 @@
+# utility/util_ratelimit.py
+import asyncio
+import time
+
+# (requests, per seconds) for each route family. Kept a little under Discord's
+# published limits so our own pacing kicks in before discord.py hits a 429.
+ROUTE_LIMITS = {
+    "global": (45, 1.0),           # all REST calls from the bot
+    "dm_create": (5, 5.0),         # opening a DM channel (user.send on an uncached DM)
+    "channel_send": (5, 5.0),      # messages into one channel, thread or DM
+    "thread_create": (5, 10.0),    # new threads in one forum
+    "campaign_dm": (3, 5.0),       # bulk DMs (support invites, welcome DMs); see LOW_PRIORITY
+}
+
+# Low-priority routes also spend tokens from a shared route, but only while that
+# route keeps `reserve` tokens free, so bulk DM campaigns never starve the DM
+# creation reminders need: route -> (shared route, reserve)
+LOW_PRIORITY = {
+    "campaign_dm": ("dm_create", 2),
+}
+
+# Idle per-channel buckets are pruned once there are more than this many
+MAX_BUCKETS = 2048
+
+
+class TokenBucket:
+    """Classic token bucket: `capacity` tokens, refilled continuously over `period` seconds."""
+
+    def __init__(self, capacity: int, period: float):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now, reserve: int = 0) -> float:
+        """Seconds until one token is available with `reserve` more left over (0 if that is now)."""
+        self._refill(now)
+        needed = 1 + reserve
+        if self.tokens >= needed:
+            return 0.0
+        return (needed - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+    def idle(self, now) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+class RateLimiter:
+    """
+    Proactive pacing for outgoing Discord calls.
+    acquire("channel_send", channel_id) waits until both the global bucket and
+    that channel's bucket have a token, so bursts are spread out instead of
+    stalling the whole client on a 429. A low-priority route (see LOW_PRIORITY)
+    additionally waits until its shared route has a token beyond its reserve.
+    """
+
+    def __init__(self, limits=None, low_priority=None):
+        self.limits = limits or ROUTE_LIMITS
+        self.low_priority = LOW_PRIORITY if low_priority is None else low_priority
+        self._buckets = {}  # (route, key) -> TokenBucket
+        self.waiting = 0
+        self.throttled = 0
+        self.throttled_seconds = 0.0
+
+    def _bucket(self, route, key=None):
+        bucket = self._buckets.get((route, key))
+        if bucket is None:
+            if len(self._buckets) >= MAX_BUCKETS:
+                self._prune()
+            bucket = self._buckets[(route, key)] = TokenBucket(*self.limits[route])
+        return bucket
+
+    def _prune(self):
+        now = time.monotonic()
+        for bucket_key, bucket in list(self._buckets.items()):
+            if bucket_key[0] != "global" and bucket.idle(now):
+                del self._buckets[bucket_key]
+
+    async def acquire(self, route, key=None):
+        """Wait for a token on the global bucket and on (route, key)."""
+        buckets = [(self._bucket("global"), 0)]
+        if route != "global":
+            buckets.append((self._bucket(route, key), 0))
+        if route in self.low_priority:
+            shared, reserve = self.low_priority[route]
+            buckets.append((self._bucket(shared), reserve))
+
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            while True:
+                now = time.monotonic()
+                delay = max(b.delay(now, reserve) for b, reserve in buckets)
+                if delay <= 0:
+                    for b, _ in buckets:
+                        b.take()
+                    break
+                await asyncio.sleep(delay)
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - started
+        if waited > 0.001:
+            self.throttled += 1
+            self.throttled_seconds += waited
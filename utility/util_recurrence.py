@@ -0,0 +1,148 @@
+# utility/util_recurrence.py
+import math
+import re
+from datetime import datetime, timedelta
+
+# Shortest allowed repeat interval, so a typo can't turn into a spam loop
+MIN_INTERVAL_SECONDS = 5 * 60
+
+ALIASES = {
+    "hourly": {"every": 3600},
+    "daily": {"every": 86400},
+    "weekly": {"every": 7 * 86400},
+}
+
+UNIT_SECONDS = {"m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+# Longest possible length of each month (February counts leap years)
+MONTH_DAYS = {1: 31, 2: 29, 3: 31, 4: 30, 5: 31, 6: 30, 7: 31, 8: 31, 9: 30, 10: 31, 11: 30, 12: 31}
+
+# (low, high) for the five cron fields: minute hour day-of-month month day-of-week (0 and 7 = Sunday)
+CRON_FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+
+def _parse_interval(text):
+    parts = re.findall(r"(\d+)\s*([mhdw])", text)
+    if not parts or re.sub(r"(\d+)\s*([mhdw])|\s", "", text):
+        return None
+    return sum(int(n) * UNIT_SECONDS[unit] for n, unit in parts)
+
+
+def _parse_cron_field(field, low, high):
+    values = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+            if step < 1:
+                raise ValueError
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(x) for x in part.split("-", 1))
+        else:
+            start = end = int(part)
+        if start < low or end > high or start > end:
+            raise ValueError
+        values.update(range(start, end + 1, step))
+    return values
+
+
+def parse_cron(expr):
+    """Five-field cron expression -> list of allowed value sets. Raises ValueError."""
+    fields = expr.split()
+    if len(fields) != 5:
+        raise ValueError
+    sets = [_parse_cron_field(f, low, high) for f, (low, high) in zip(fields, CRON_FIELDS)]
+    sets[4] = {0 if d == 7 else d for d in sets[4]}
+    return sets
+
+
+def parse_recurrence(text: str):
+    """
+    User input -> stored rule. Accepts intervals ("30m", "1h30m", "2d", "1w"),
+    "hourly"/"daily"/"weekly", or a cron rule ("cron 0 9 * * 1-5").
+    Raises ValueError with a message fit for the user.
+    """
+    text = text.strip().lower()
+    if text in ALIASES:
+        return dict(ALIASES[text])
+    if text.startswith("cron"):
+        expr = text[4:].strip(" :")
+        try:
+            minutes, hours, days, months, weekdays = parse_cron(expr)
+        except ValueError:
+            raise ValueError(f"`{expr}` is not a valid cron rule (use `minute hour day month weekday`).")
+        dow_any = weekdays == set(range(0, 7))
+        if dow_any and not any(day <= MONTH_DAYS[month] for day in days for month in months):
+            raise ValueError(f"Cron rule `{expr}` never matches a real date.")
+        return {"cron": expr}
+    seconds = _parse_interval(text)
+    if seconds is None:
+        raise ValueError(f"Couldn't understand repeat `{text}`. Try `30m`, `2h`, `1d`, `1w`, `daily` or `cron 0 9 * * 1-5`.")
+    if seconds < MIN_INTERVAL_SECONDS:
+        raise ValueError(f"Repeat interval must be at least {MIN_INTERVAL_SECONDS // 60} minutes.")
+    return {"every": seconds}
+
+
+def describe(rule) -> str:
+    if "cron" in rule:
+        return f"cron `{rule['cron']}`"
+    seconds = rule["every"]
+    for unit, size in (("w", UNIT_SECONDS["w"]), ("d", UNIT_SECONDS["d"]), ("h", UNIT_SECONDS["h"])):
+        if seconds % size == 0:
+            return f"every {seconds // size}{unit}"
+    return f"every {seconds // 60}m"
+
+
+def _next_cron(sets, after: datetime, tz):
+    """First minute strictly after `after` (local wall-clock time in tz) that matches the cron sets."""
+    minutes, hours, days, months, weekdays = sets
+    dom_any = days == set(range(1, 32))
+    dow_any = weekdays == set(range(0, 7))
+    t = after.astimezone(tz).replace(tzinfo=None, second=0, microsecond=0) + timedelta(minutes=1)
+    # Each step jumps at least to the next minute/hour/day/month boundary, so this is bounded
+    for _ in range(100000):
+        if t.month not in months:
+            t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            continue
+        dom_ok = t.day in days
+        dow_ok = (t.isoweekday() % 7) in weekdays
+        # Standard cron: if both day fields are restricted, either may match
+        day_ok = (dom_ok or dow_ok) if not (dom_any or dow_any) else (dom_ok and dow_ok)
+        if not day_ok:
+            t = t.replace(hour=0, minute=0) + timedelta(days=1)
+            continue
+        if t.hour not in hours:
+            t = t.replace(minute=0) + timedelta(hours=1)
+            continue
+        if t.minute not in minutes:
+            t += timedelta(minutes=1)
+            continue
+        return tz.localize(t)
+    raise ValueError("cron rule never matches")
+
+
+def next_occurrence(rule, previous: datetime, now: datetime, tz):
+    """
+    The next due time after a delivered occurrence. Only one occurrence is ever
+    computed; if the bot was down across several, they are skipped, not replayed.
+    """
+    if "cron" in rule:
+        return _next_cron(parse_cron(rule["cron"]), max(previous, now), tz)
+    every = rule["every"]
+    steps = max(1, math.ceil((now - previous).total_seconds() / every))
+    # Step in local wall-clock time so "daily" stays at the same hour across DST changes
+    local = previous.astimezone(tz).replace(tzinfo=None)
+    return tz.localize(local + timedelta(seconds=every * steps))
+
+
+def first_due(rule, minutes: int, now: datetime, tz):
+    """
+    When a new reminder first fires. Cron rules start at their first match after
+    now (`minutes` is ignored); one-shots and interval repeats start `minutes` from now.
+    """
+    if rule and "cron" in rule:
+        return next_occurrence(rule, now, now, tz)
+    return now + timedelta(minutes=minutes)
@@ -0,0 +1,65 @@
+# utility/util_scheduler.py
+import asyncio
+import heapq
+import itertools
+import time
+
+
+class ReminderScheduler:
+    """
+    Min-heap of reminders keyed by due time (UTC epoch seconds).
+    The reminder loop sleeps until the earliest entry is due and is woken early
+    when something sooner is pushed. Cancelled entries are dropped lazily on pop.
+    """
+
+    def __init__(self):
+        self._heap = []  # [due_ts, seq, reminder, alive]
+        self._entries = {}  # reminder id -> heap entry
+        self._counter = itertools.count()
+        self._wake = asyncio.Event()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def push(self, reminder, due_ts: float):
+        self.discard(reminder)
+        entry = [due_ts, next(self._counter), reminder, True]
+        self._entries[reminder["id"]] = entry
+        heapq.heappush(self._heap, entry)
+        if self._heap[0] is entry:
+            # New earliest reminder: cut the current sleep short
+            self._wake.set()
+
+    def discard(self, reminder):
+        entry = self._entries.pop(reminder["id"], None)
+        if entry:
+            entry[3] = False
+
+    def next_due(self):
+        """Due time of the earliest live entry, or None if nothing is scheduled."""
+        while self._heap and not self._heap[0][3]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float = None):
+        """Remove and return every live reminder due at or before `now`, oldest first."""
+        now = time.time() if now is None else now
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due_ts, _, reminder, alive = heapq.heappop(self._heap)
+            if alive:
+                del self._entries[reminder["id"]]
+                due.append(reminder)
+        return due
+
+    async def wait(self, max_sleep: float = None):
+        """Sleep until the next reminder is due, something earlier is pushed, or max_sleep passes."""
+        next_due = self.next_due()
+        delay = None if next_due is None else max(0.0, next_due - time.time())
+        if max_sleep is not None:
+            delay = max_sleep if delay is None else min(delay, max_sleep)
+        self._wake.clear()
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
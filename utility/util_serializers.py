@@ -0,0 +1,89 @@
+# utility/util_serializers.py
+import json
+import logging
+import os
+import zlib
+
+try:
+    import orjson
+except ImportError:  # optional speedup, not a hard dependency
+    orjson = None
+
+logger = logging.getLogger("bot")
+
+# Binary snapshots start with this header so load() can tell them apart from JSON
+ZLIB_MAGIC = b"RBZ1"
+
+
+class JsonSerializer:
+    """Stdlib JSON. indent=4 is the original human-friendly layout; None is compact."""
+
+    def __init__(self, name, indent=None):
+        self.name = name
+        self.indent = indent
+
+    def dumps(self, obj) -> bytes:
+        if self.indent is None:
+            return json.dumps(obj, separators=(",", ":"), default=str).encode("utf-8")
+        return json.dumps(obj, indent=self.indent, default=str).encode("utf-8")
+
+
+class OrjsonSerializer:
+    """Compact JSON through orjson (only when it is installed)."""
+
+    name = "orjson"
+
+    def dumps(self, obj) -> bytes:
+        return orjson.dumps(obj, default=str)
+
+
+class ZlibSerializer:
+    """Compact binary snapshots: zlib-compressed compact JSON behind a magic header."""
+
+    name = "zlib"
+
+    def __init__(self, level=1):
+        self.level = level
+        self._json = OrjsonSerializer() if orjson else JsonSerializer("json-compact")
+
+    def dumps(self, obj) -> bytes:
+        return ZLIB_MAGIC + zlib.compress(self._json.dumps(obj), self.level)
+
+
+SERIALIZERS = {
+    "json": JsonSerializer("json", indent=4),
+    "json-compact": JsonSerializer("json-compact"),
+    "orjson": OrjsonSerializer(),
+    "zlib": ZlibSerializer(),
+}
+
+
+def get_serializer(name: str):
+    if name == "orjson" and orjson is None:
+        logger.warning("orjson is not installed; falling back to compact stdlib JSON.")
+        name = "json-compact"
+    if name not in SERIALIZERS:
+        raise ValueError(f"Unknown storage serializer: {name}")
+    return SERIALIZERS[name]
+
+
+def loads(raw: bytes):
+    """Decode any format written by the serializers above (detected from the content)."""
+    if raw.startswith(ZLIB_MAGIC):
+        raw = zlib.decompress(raw[len(ZLIB_MAGIC):])
+    if orjson:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def read_file(path: str):
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def write_file(path: str, obj, serializer):
+    """Atomically replace `path` (temp file + rename)."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(serializer.dumps(obj))
+    os.replace(tmp_path, path)
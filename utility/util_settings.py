@@ -0,0 +1,83 @@
+# utility/util_settings.py
+import json
+import logging
+import os
+
+# Settings live in one module so cogs can read them without importing bot.py
+# (which runs as __main__; importing it as "bot" would build a second bot)
+SETTINGS_FILE = "settings.json"
+
+DEFAULT_SETTINGS = {
+    "token": "YOUR_BOT_TOKEN_HERE",
+    "test_guild_id": None,
+    "backend_guild_id": 1424002405913202700,  # Default backend guild ID
+    "backend_log_channel_id": None,
+    "support_invite": "https://discord.gg/YOUR_DEFAULT_INVITE",
+    "check_interval_seconds": 60,
+    "log_level": "INFO",
+    "auto_restart": True,
+    "storage_engine": "journal",
+    "journal_max_ops": 1000,
+    "journal_max_bytes": 1048576,
+    "storage_flush_window_ms": 250,
+    "storage_serializer": "json-compact",
+    "delivery_workers": 8,
+    "retry_max_attempts": 5,
+    "retry_base_seconds": 30,
+    "retry_max_seconds": 3600,
+    "catchup_per_second": 5,
+    "missed_max_age_hours": 24,
+    "missed_stale_policy": "summarize",
+    "forum_thread_policy": "day",
+    "delivery_slo_seconds": 60,
+    "broadcast_concurrency": 10,
+    "dm_campaign_concurrency": 5,
+    "audit_flush_seconds": 5,
+    "backend_log_flush_seconds": 5,
+    "backend_log_max_entries": 50
+}
+
+_last_settings_mtime = None
+_settings_cache = None
+
+
+def load_settings(force=False):
+    """
+    Load or create settings.json with defaults.
+    Auto-fills missing keys and updates cached settings.
+    """
+    global _last_settings_mtime, _settings_cache
+
+    if not os.path.exists(SETTINGS_FILE):
+        with open(SETTINGS_FILE, "w", encoding="utf-8") as f:
+            json.dump(DEFAULT_SETTINGS, f, indent=4)
+        logging.warning(f"No {SETTINGS_FILE} found. Created default settings. Edit token before running.")
+        return DEFAULT_SETTINGS.copy()
+
+    mtime = os.path.getmtime(SETTINGS_FILE)
+    if not force and _last_settings_mtime == mtime and _settings_cache:
+        return _settings_cache
+
+    with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
+        settings = json.load(f)
+
+    # Fill missing keys
+    changed = False
+    for key, value in DEFAULT_SETTINGS.items():
+        if key not in settings:
+            settings[key] = value
+            changed = True
+    if changed:
+        with open(SETTINGS_FILE, "w", encoding="utf-8") as f:
+            json.dump(settings, f, indent=4)
+        logging.info("Updated settings.json with missing default keys.")
+
+    _last_settings_mtime = mtime
+    _settings_cache = settings
+
+    # Update log level dynamically (the "bot" logger has its own level, see setup_logger)
+    log_level = getattr(logging, settings.get("log_level", "INFO").upper(), logging.INFO)
+    logging.getLogger().setLevel(log_level)
+    logging.getLogger("bot").setLevel(log_level)
+
+    return settings
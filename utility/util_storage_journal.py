@@ -0,0 +1,218 @@
+# utility/util_storage_journal.py
+import json
+import logging
+import os
+import threading
+
+from utility.util_serializers import get_serializer, read_file, write_file
+
+logger = logging.getLogger("bot")
+
+
+class ReminderIndex:
+    """
+    reminder id -> position in data["reminders"], built once per replay so each
+    remove/update op is O(1). Removals swap the last reminder into the gap, the
+    same way ReminderStore does; list order carries no meaning.
+    """
+
+    def __init__(self, data):
+        self.reminders = data.setdefault("reminders", [])
+        self._pos = {r.get("id"): i for i, r in enumerate(self.reminders) if r.get("id") is not None}
+
+    def add(self, reminder):
+        self.reminders.append(reminder)
+        if reminder.get("id") is not None:
+            self._pos[reminder["id"]] = len(self.reminders) - 1
+
+    def find(self, reminder):
+        """Index of a reminder, matched by id (or whole-dict equality for legacy reminders)."""
+        if reminder.get("id") is not None:
+            return self._pos.get(reminder["id"])
+        for i, r in enumerate(self.reminders):
+            if r == reminder:
+                return i
+        return None
+
+    def replace(self, index, reminder):
+        self.reminders[index] = reminder
+
+    def remove(self, index):
+        reminders = self.reminders
+        removed = reminders[index]
+        last = reminders.pop()
+        if index < len(reminders):
+            reminders[index] = last
+            if last.get("id") is not None:
+                self._pos[last["id"]] = index
+        if removed.get("id") is not None:
+            self._pos.pop(removed["id"], None)
+
+
+def apply_op(data, op, index=None):
+    """
+    Replay one storage op onto an in-memory data dict (mirrors the helpers in storage.py).
+    Pass the same ReminderIndex for every op of a replay; without one it is built per call.
+    """
+    kind = op["op"]
+    if kind in ("add_reminder", "remove_reminder", "update_reminder"):
+        index = index or ReminderIndex(data)
+        if kind == "add_reminder":
+            index.add(op["reminder"])
+            return
+        pos = index.find(op["reminder"])
+        if pos is None:
+            return
+        if kind == "remove_reminder":
+            index.remove(pos)
+        else:
+            index.replace(pos, op["reminder"])
+    elif kind == "set_guild_field":
+        data.setdefault("guilds", {}).setdefault(op["guild_id"], {})[op["key"]] = op["value"]
+    elif kind == "add_guild_item":
+        items = data.setdefault("guilds", {}).setdefault(op["guild_id"], {}).setdefault(op["key"], [])
+        if op["value"] not in items:
+            items.append(op["value"])
+    elif kind == "remove_guild_item":
+        items = data.setdefault("guilds", {}).setdefault(op["guild_id"], {}).setdefault(op["key"], [])
+        if op["value"] in items:
+            items.remove(op["value"])
+    else:
+        logger.warning(f"Journal replay ignoring unknown storage op: {kind}")
+
+
+def read_snapshot(path):
+    """Load a snapshot and return (data, seq of the last op folded into it)."""
+    data = read_file(path)
+    seq = data.pop("journal_seq", 0)
+    return data, seq
+
+
+def write_snapshot(path, data, seq, serializer):
+    """Atomically replace the snapshot (temp file + rename)."""
+    write_file(path, {**data, "journal_seq": seq}, serializer)
+
+
+def replay_journal(path, data, after_seq):
+    """Apply every op in a journal file newer than `after_seq`. Returns the last seq seen."""
+    last_seq = after_seq
+    if not os.path.exists(path):
+        return last_seq
+    index = ReminderIndex(data)
+    with open(path, "r") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                op = json.loads(line)
+            except json.JSONDecodeError:
+                # A torn final line from a crash mid-append; everything before it is intact
+                logger.warning(f"Skipping unreadable journal line {line_no} in {path}")
+                continue
+            if op["seq"] <= last_seq:
+                continue
+            apply_op(data, op, index)
+            last_seq = op["seq"]
+    return last_seq
+
+
+class JournalEngine:
+    """
+    data.json as a compacted snapshot plus an append-only JSONL journal of ops.
+    Each mutation appends a single line; the journal is folded back into the
+    snapshot on a worker thread once it passes max_ops or max_bytes.
+    """
+
+    name = "journal"
+
+    def __init__(self, path: str, max_ops: int = 1000, max_bytes: int = 1024 * 1024, serializer=None):
+        self.path = path
+        self.serializer = serializer or get_serializer("json")
+        self.journal_path = f"{path}.journal"
+        self.compacting_path = f"{path}.journal.compacting"
+        self.max_ops = max_ops
+        self.max_bytes = max_bytes
+        self.seq = 0
+        self.ops_since_compact = 0
+        self._loaded = False
+        self._compactor = None
+
+        if not os.path.exists(self.path):
+            write_snapshot(self.path, {"reminders": [], "guilds": {}}, 0, self.serializer)
+        self._journal = open(self.journal_path, "a")
+
+    # ------------------- Load -------------------
+    def load(self):
+        data, seq = read_snapshot(self.path)
+        # A rotated journal left behind by an interrupted compaction still holds live ops
+        seq = replay_journal(self.compacting_path, data, seq)
+        seq = replay_journal(self.journal_path, data, seq)
+        self.seq = seq
+        self._loaded = True
+        return data
+
+    # ------------------- Save -------------------
+    def save(self, data):
+        """Write a full snapshot and drop the journal."""
+        self._wait_for_compaction()
+        write_snapshot(self.path, data, self.seq, self.serializer)
+        self._journal.close()
+        self._journal = open(self.journal_path, "w")
+        if os.path.exists(self.compacting_path):
+            os.remove(self.compacting_path)
+        self.ops_since_compact = 0
+
+    def write(self, data, ops):
+        if not self._loaded:
+            # seq numbers must continue from what's on disk, or replay would skip these ops
+            self.load()
+        lines = []
+        for op in ops:
+            self.seq += 1
+            lines.append(json.dumps({"seq": self.seq, **op}, default=str))
+        self._journal.write("\n".join(lines) + "\n")
+        self._journal.flush()
+        self.ops_since_compact += len(ops)
+
+        if self.ops_since_compact >= self.max_ops or self._journal.tell() >= self.max_bytes:
+            self.compact()
+
+    def close(self):
+        self._wait_for_compaction()
+        self._journal.close()
+
+    # ------------------- Compaction -------------------
+    def compact(self):
+        """Rotate the journal and fold it into the snapshot on a background thread."""
+        if self._compactor and self._compactor.is_alive():
+            return
+        if os.path.exists(self.compacting_path):
+            # Leftover from a crash: fold only that this time. ops_since_compact stays
+            # over the limit, so the live journal is rotated on the next write.
+            self._start_compactor()
+            return
+        self._journal.close()
+        os.replace(self.journal_path, self.compacting_path)
+        self._journal = open(self.journal_path, "a")
+        self.ops_since_compact = 0
+        self._start_compactor()
+
+    def _start_compactor(self):
+        self._compactor = threading.Thread(target=self._compact_worker, name="journal_compactor", daemon=True)
+        self._compactor.start()
+
+    def _compact_worker(self):
+        # Works purely from files on disk, so it never touches the live data dict
+        try:
+            data, seq = read_snapshot(self.path)
+            seq = replay_journal(self.compacting_path, data, seq)
+            write_snapshot(self.path, data, seq, self.serializer)
+            os.remove(self.compacting_path)
+            logger.info(f"Compacted journal into {self.path} (seq {seq})")
+        except Exception:
+            logger.exception("Journal compaction failed; ops stay in the rotated journal until the next run")
+
+    def _wait_for_compaction(self):
+        if self._compactor and self._compactor.is_alive():
+            self._compactor.join()
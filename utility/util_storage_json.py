@@ -0,0 +1,33 @@
+# utility/util_storage_json.py
+import os
+
+from utility.util_serializers import get_serializer, read_file, write_file
+
+
+class JsonEngine:
+    """Original storage layout: everything lives in one JSON document."""
+
+    name = "json"
+
+    def __init__(self, path: str, serializer=None):
+        self.path = path
+        self.serializer = serializer or get_serializer("json")
+        if not os.path.exists(self.path):
+            self.save({"reminders": [], "guilds": {}})
+
+    def load(self):
+        data = read_file(self.path)
+        # Bookkeeping key written by the journal engine's snapshots
+        data.pop("journal_seq", None)
+        return data
+
+    def save(self, data):
+        # Temp file + rename so a crash mid-write never leaves a truncated data.json
+        write_file(self.path, data, self.serializer)
+
+    def write(self, data, ops):
+        """A single JSON file can't be patched in place, so every change rewrites it."""
+        self.save(data)
+
+    def close(self):
+        pass
@@ -0,0 +1,185 @@
+# utility/util_storage_sharded.py
+import logging
+import os
+
+from utility.util_serializers import get_serializer, read_file, write_file
+
+logger = logging.getLogger("bot")
+
+
+def _read_shard(path, default):
+    if not os.path.exists(path):
+        return default
+    return read_file(path)
+
+
+class LazyGuilds(dict):
+    """
+    data["guilds"] for the sharded engine: each guild's settings shard is read
+    the first time that guild is looked up, not at startup.
+    """
+
+    def __init__(self, loader, guild_ids):
+        super().__init__()
+        self._loader = loader
+        self._unloaded = set(guild_ids)
+
+    def _ensure(self, guild_id):
+        if guild_id in self._unloaded:
+            self._unloaded.discard(guild_id)
+            dict.__setitem__(self, guild_id, self._loader(guild_id))
+
+    def _ensure_all(self):
+        for guild_id in list(self._unloaded):
+            self._ensure(guild_id)
+
+    def loaded_items(self):
+        """Only the guilds that have been touched so far (no shard reads)."""
+        return dict.items(self)
+
+    def __getitem__(self, guild_id):
+        self._ensure(guild_id)
+        return super().__getitem__(guild_id)
+
+    def get(self, guild_id, default=None):
+        self._ensure(guild_id)
+        return super().get(guild_id, default)
+
+    def setdefault(self, guild_id, default=None):
+        self._ensure(guild_id)
+        return super().setdefault(guild_id, default)
+
+    def __contains__(self, guild_id):
+        return guild_id in self._unloaded or super().__contains__(guild_id)
+
+    def __len__(self):
+        return len(self._unloaded) + super().__len__()
+
+    def __iter__(self):
+        self._ensure_all()
+        return super().__iter__()
+
+    def keys(self):
+        self._ensure_all()
+        return super().keys()
+
+    def values(self):
+        self._ensure_all()
+        return super().values()
+
+    def items(self):
+        self._ensure_all()
+        return super().items()
+
+
+class ShardedEngine:
+    """
+    One file per guild instead of one data.json for everyone:
+      <root>/guilds/<guild_id>.json     guild settings (admins, defaults, update channels), loaded lazily
+      <root>/reminders/<guild_id>.json  that guild's pending reminders, loaded at startup
+    A mutation rewrites only the shard(s) of the guild it touched.
+    """
+
+    name = "sharded"
+
+    def __init__(self, root: str, serializer=None):
+        self.root = root
+        self.serializer = serializer or get_serializer("json")
+        self.guild_dir = os.path.join(root, "guilds")
+        self.reminder_dir = os.path.join(root, "reminders")
+        os.makedirs(self.guild_dir, exist_ok=True)
+        os.makedirs(self.reminder_dir, exist_ok=True)
+        self._reminders = {}  # shard key -> {reminder id: reminder}
+
+    # ------------------- Paths -------------------
+    @staticmethod
+    def _shard_key(guild_id):
+        return str(guild_id)
+
+    def _guild_path(self, guild_id):
+        return os.path.join(self.guild_dir, f"{guild_id}.json")
+
+    def _reminder_path(self, key):
+        return os.path.join(self.reminder_dir, f"{key}.json")
+
+    @staticmethod
+    def _list_shards(directory):
+        return [name[:-5] for name in os.listdir(directory) if name.endswith(".json")]
+
+    # ------------------- Load -------------------
+    def load(self):
+        self._reminders = {}
+        reminders = []
+        # Only guilds with pending reminders have a reminder shard
+        for key in self._list_shards(self.reminder_dir):
+            shard = _read_shard(self._reminder_path(key), [])
+            self._reminders[key] = {r.get("id", id(r)): r for r in shard}
+            reminders.extend(shard)
+        guilds = LazyGuilds(self._load_guild, self._list_shards(self.guild_dir))
+        return {"reminders": reminders, "guilds": guilds}
+
+    def _load_guild(self, guild_id):
+        return _read_shard(self._guild_path(guild_id), {})
+
+    # ------------------- Save -------------------
+    def save(self, data):
+        """Rewrite every reminder shard, plus every guild shard that is loaded in memory."""
+        self._reminders = {}
+        for r in data.get("reminders", []):
+            self._reminders.setdefault(self._shard_key(r.get("guild_id")), {})[r.get("id", id(r))] = r
+        for key in set(self._list_shards(self.reminder_dir)) - set(self._reminders):
+            os.remove(self._reminder_path(key))
+        for key in self._reminders:
+            self._write_reminder_shard(key)
+
+        guilds = data.get("guilds", {})
+        items = guilds.loaded_items() if isinstance(guilds, LazyGuilds) else guilds.items()
+        for guild_id, gdata in items:
+            write_file(self._guild_path(guild_id), gdata, self.serializer)
+
+    def write(self, data, ops):
+        dirty_reminders = set()
+        dirty_guilds = set()
+        for op in ops:
+            kind = op["op"]
+            if kind in ("add_reminder", "update_reminder", "remove_reminder"):
+                r = op["reminder"]
+                key = self._shard_key(r.get("guild_id"))
+                shard = self._reminders.setdefault(key, {})
+                if kind == "remove_reminder":
+                    shard.pop(r.get("id", id(r)), None)
+                else:
+                    shard[r.get("id", id(r))] = r
+                dirty_reminders.add(key)
+            elif kind in ("set_guild_field", "add_guild_item", "remove_guild_item"):
+                dirty_guilds.add(op["guild_id"])
+            else:
+                logger.warning(f"Sharded engine ignoring unknown storage op: {kind}")
+
+        for key in dirty_reminders:
+            self._write_reminder_shard(key)
+        for guild_id in dirty_guilds:
+            write_file(self._guild_path(guild_id), data.get("guilds", {}).get(guild_id, {}), self.serializer)
+
+    def _write_reminder_shard(self, key):
+        shard = self._reminders.get(key)
+        if shard:
+            write_file(self._reminder_path(key), list(shard.values()), self.serializer)
+        else:
+            self._reminders.pop(key, None)
+            if os.path.exists(self._reminder_path(key)):
+                os.remove(self._reminder_path(key))
+
+    def close(self):
+        pass
+
+
+# ------------------- JSON Migration -------------------
+def migrate_json(json_path: str, root: str, serializer=None):
+    """One-shot split of an existing data.json into per-guild shards. Returns the reminder count."""
+    data = read_file(json_path)
+    data.pop("journal_seq", None)
+    ShardedEngine(root, serializer).save(data)
+    count = len(data.get("reminders", []))
+    logger.info(f"Split {json_path} into {len(data.get('guilds', {}))} guild shards under {root} ({count} reminders)")
+    return count
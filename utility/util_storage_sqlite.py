@@ -0,0 +1,210 @@
+# utility/util_storage_sqlite.py
+import json
+import logging
+import os
+import sqlite3
+import sys
+
+from utility.util_serializers import read_file
+
+logger = logging.getLogger("bot")
+
+# Per-guild lists that are stored as rows in guild_admins, keyed by kind
+ADMIN_KINDS = ("admins", "admin_roles", "user_managers", "user_manager_roles")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reminders (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    reminder_id INTEGER,
+    guild_id INTEGER,
+    user_id INTEGER NOT NULL,
+    time TEXT NOT NULL,
+    message TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reminders_guild_user ON reminders (guild_id, user_id);
+
+CREATE TABLE IF NOT EXISTS guild_settings (
+    guild_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT,
+    PRIMARY KEY (guild_id, key)
+);
+
+CREATE TABLE IF NOT EXISTS guild_admins (
+    guild_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    target_id TEXT NOT NULL,
+    PRIMARY KEY (guild_id, kind, target_id)
+);
+
+CREATE TABLE IF NOT EXISTS update_channels (
+    guild_id TEXT NOT NULL,
+    channel_id TEXT NOT NULL,
+    PRIMARY KEY (guild_id, channel_id)
+);
+"""
+
+
+class SqliteEngine:
+    """
+    Row-per-record storage on top of stdlib sqlite3 (WAL mode).
+    Every mutation touches only the rows it changes instead of rewriting the whole store.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._upgrade_schema()
+        self.conn.commit()
+
+    def _upgrade_schema(self):
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(reminders)")}
+        if "reminder_id" not in columns:
+            # Databases created before reminders had stable IDs
+            self.conn.execute("ALTER TABLE reminders ADD COLUMN reminder_id INTEGER")
+        self.conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_reminders_reminder_id ON reminders (reminder_id)")
+        # Due times are looked up through the in-memory scheduler, never by SQL
+        self.conn.execute("DROP INDEX IF EXISTS idx_reminders_time")
+
+    # ------------------- Load -------------------
+    def load(self):
+        data = {"reminders": [], "guilds": {}}
+        for (payload,) in self.conn.execute("SELECT payload FROM reminders ORDER BY id"):
+            data["reminders"].append(json.loads(payload))
+
+        guilds = data["guilds"]
+        for guild_id, key, value in self.conn.execute("SELECT guild_id, key, value FROM guild_settings"):
+            guilds.setdefault(guild_id, {})[key] = json.loads(value)
+        for guild_id, kind, target_id in self.conn.execute("SELECT guild_id, kind, target_id FROM guild_admins ORDER BY rowid"):
+            guilds.setdefault(guild_id, {}).setdefault(kind, []).append(target_id)
+        for guild_id, channel_id in self.conn.execute("SELECT guild_id, channel_id FROM update_channels ORDER BY rowid"):
+            guilds.setdefault(guild_id, {}).setdefault("update_channels", []).append(channel_id)
+        return data
+
+    # ------------------- Save -------------------
+    def save(self, data):
+        """Replace the whole store with `data` in one transaction."""
+        with self.conn:
+            self.conn.execute("DELETE FROM reminders")
+            self.conn.execute("DELETE FROM guild_settings")
+            self.conn.execute("DELETE FROM guild_admins")
+            self.conn.execute("DELETE FROM update_channels")
+            for r in data.get("reminders", []):
+                self._insert_reminder(r)
+            for guild_id, gdata in data.get("guilds", {}).items():
+                for key, value in gdata.items():
+                    if key in ADMIN_KINDS or key == "update_channels":
+                        for item in value:
+                            self._add_guild_item(guild_id, key, item)
+                    else:
+                        self._set_guild_field(guild_id, key, value)
+
+    def write(self, data, ops):
+        """Apply a batch of storage ops as row-level changes in one transaction."""
+        with self.conn:
+            for op in ops:
+                kind = op["op"]
+                if kind == "add_reminder":
+                    self._insert_reminder(op["reminder"])
+                elif kind == "remove_reminder":
+                    self._delete_reminder(op["reminder"])
+                elif kind == "update_reminder":
+                    self._update_reminder(op["reminder"])
+                elif kind == "set_guild_field":
+                    self._set_guild_field(op["guild_id"], op["key"], op["value"])
+                elif kind == "add_guild_item":
+                    self._add_guild_item(op["guild_id"], op["key"], op["value"])
+                elif kind == "remove_guild_item":
+                    self._remove_guild_item(op["guild_id"], op["key"], op["value"])
+                else:
+                    logger.warning(f"SQLite engine ignoring unknown storage op: {kind}")
+
+    def close(self):
+        self.conn.close()
+
+    # ------------------- Row Helpers -------------------
+    def _insert_reminder(self, r):
+        self.conn.execute(
+            "INSERT INTO reminders (reminder_id, guild_id, user_id, time, message, payload) VALUES (?, ?, ?, ?, ?, ?)",
+            (r.get("id"), r.get("guild_id"), r["user_id"], str(r["time"]), r["message"], json.dumps(r, default=str))
+        )
+
+    def _update_reminder(self, r):
+        self.conn.execute(
+            "UPDATE reminders SET time = ?, message = ?, payload = ? WHERE reminder_id = ?",
+            (str(r["time"]), r["message"], json.dumps(r, default=str), r["id"])
+        )
+
+    def _delete_reminder(self, r):
+        if r.get("id") is not None:
+            self.conn.execute("DELETE FROM reminders WHERE reminder_id = ?", (r["id"],))
+            return
+        self.conn.execute(
+            "DELETE FROM reminders WHERE id = ("
+            "SELECT id FROM reminders WHERE guild_id IS ? AND user_id = ? AND time = ? AND message = ? LIMIT 1)",
+            (r.get("guild_id"), r["user_id"], str(r["time"]), r["message"])
+        )
+
+    def _set_guild_field(self, guild_id, key, value):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO guild_settings (guild_id, key, value) VALUES (?, ?, ?)",
+            (str(guild_id), key, json.dumps(value))
+        )
+
+    def _add_guild_item(self, guild_id, key, item):
+        if key == "update_channels":
+            self.conn.execute(
+                "INSERT OR IGNORE INTO update_channels (guild_id, channel_id) VALUES (?, ?)",
+                (str(guild_id), str(item))
+            )
+        else:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO guild_admins (guild_id, kind, target_id) VALUES (?, ?, ?)",
+                (str(guild_id), key, str(item))
+            )
+
+    def _remove_guild_item(self, guild_id, key, item):
+        if key == "update_channels":
+            self.conn.execute(
+                "DELETE FROM update_channels WHERE guild_id = ? AND channel_id = ?",
+                (str(guild_id), str(item))
+            )
+        else:
+            self.conn.execute(
+                "DELETE FROM guild_admins WHERE guild_id = ? AND kind = ? AND target_id = ?",
+                (str(guild_id), key, str(item))
+            )
+
+
+# ------------------- JSON Migration -------------------
+def migrate_json(json_path: str, db_path: str):
+    """One-shot import of an existing data.json into a SQLite database. Returns the reminder count."""
+    data = read_file(json_path)
+    data.pop("journal_seq", None)
+    engine = SqliteEngine(db_path)
+    try:
+        engine.save(data)
+    finally:
+        engine.close()
+    count = len(data.get("reminders", []))
+    logger.info(f"Migrated {count} reminders and {len(data.get('guilds', {}))} guilds from {json_path} to {db_path}")
+    return count
+
+
+if __name__ == "__main__":
+    # Usage: python -m utility.util_storage_sqlite [data.json] [data.db]
+    src = sys.argv[1] if len(sys.argv) > 1 else "data.json"
+    dst = sys.argv[2] if len(sys.argv) > 2 else "data.db"
+    if not os.path.exists(src):
+        print(f"❌ {src} not found.")
+        sys.exit(1)
+    if os.path.exists(dst):
+        print(f"❌ {dst} already exists, refusing to overwrite it.")
+        sys.exit(1)
+    print(f"✅ Migrated {migrate_json(src, dst)} reminders from {src} to {dst}")